@@ -0,0 +1,103 @@
+"""
+Connection pool scaling benchmark.
+
+Starts 1, 2, 4 and 8 stand-in robots (tools/stand_in_robot.py, each on its
+own loopback address), connects one RobotConnection per robot through a
+ConnectionPool and drives the first robot with joystick frames at 50 Hz.
+Reports this process's CPU use, thread count, how busy the pool thread
+is and the heartbeat round trips of all robots. The stand-ins run in
+their own processes and are not counted.
+
+Needs Linux (all of 127.0.0.0/8 local) and NT3 port 1735 free on
+127.0.0.10-17. Run from the repository root:
+    python benchmarks/connection_pool_benchmark.py
+"""
+
+import math
+import os
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from network import robot_connection
+from network.robot_connection import RobotConnection
+from network.connection_pool import ConnectionPool
+
+
+ROBOT_COUNTS = (1, 2, 4, 8)
+DURATION = 5.0
+JOYSTICK_RATE = 50
+
+
+def start_stand_ins(count):
+    """Start one stand-in robot per address; return (processes, addresses)."""
+    addresses = [f"127.0.0.{10 + i}" for i in range(count)]
+    processes = [subprocess.Popen([sys.executable, os.path.join(ROOT, "tools", "stand_in_robot.py"),
+                                   "--address", address],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                 for address in addresses]
+    return processes, addresses
+
+
+def run(count):
+    """Connect `count` robots, drive one for DURATION seconds and measure."""
+    processes, addresses = start_stand_ins(count)
+    pool = ConnectionPool()
+    try:
+        time.sleep(1.5)
+        for i, address in enumerate(addresses):
+            pool.add(RobotConnection(team_number=9000 + i, robot_address=address, name=f"bench{i}",
+                                     heartbeat_timeout=0))
+        pool.start()
+        for robot in pool.connections:
+            robot.connect()
+        deadline = time.monotonic() + 10.0
+        while not all(r.connected for r in pool.connections) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if not all(r.connected for r in pool.connections):
+            raise RuntimeError(f"only {pool.get_stats()['connected']} of {count} robots connected")
+        driven = pool.connections[0]
+        driven.set_enabled(True)
+        time.sleep(1.0)
+        
+        busy_before = pool.poll_time
+        cpu_before = time.process_time()
+        start = time.monotonic()
+        next_tick = start
+        while time.monotonic() - start < DURATION:
+            now = time.monotonic()
+            axes = [[math.sin(3.0 * now + i) for i in range(6)]]
+            driven.send_joystick_data(axes, [[int(now * 4) % 2] * 12], now, now)
+            next_tick += 1.0 / JOYSTICK_RATE
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+        elapsed = time.monotonic() - start
+        cpu = 100.0 * (time.process_time() - cpu_before) / elapsed
+        busy = 100.0 * (pool.poll_time - busy_before) / elapsed
+        threads = threading.active_count()
+        
+        rtts = [r.get_heartbeat_stats()["rtt_mean_ms"] for r in pool.connections]
+        rtts = [rtt for rtt in rtts if rtt is not None]
+        loss = max(r.get_heartbeat_stats()["loss_percent"] for r in pool.connections)
+        return cpu, busy, threads, sum(rtts) / len(rtts), max(rtts), loss
+    finally:
+        pool.stop()
+        for process in processes:
+            process.kill()
+            process.wait()
+
+
+def main():
+    robot_connection.print = lambda *args, **kwargs: None  # Quiet connect messages
+    print(f"{DURATION:g} s per run, first robot driven at {JOYSTICK_RATE} Hz, 10 Hz heartbeats each")
+    print(f"{'robots':>6} {'cpu %':>6} {'pool %':>7} {'threads':>8} {'rtt ms':>7} {'max rtt':>8} {'loss %':>7}")
+    for count in ROBOT_COUNTS:
+        cpu, busy, threads, rtt, worst, loss = run(count)
+        print(f"{count:>6} {cpu:>6.1f} {busy:>7.2f} {threads:>8} {rtt:>7.2f} {worst:>8.2f} {loss:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+E-stop and fast disable timing, keypress to flush.
+
+Connects a RobotConnection to a robot served from this process (an NT3
+server on 127.0.0.32, or a UDP responder on 127.0.0.33 for the udp
+transport) and shows it in an offscreen DriverStationWindow. While
+joystick frames go out at 100 Hz, Enter (disable) and Space (e-stop) key
+events are posted to the window. For each press it records:
+  key -> flush   from posting the key event to the flushed disable
+  press -> flush from the key filter seeing the press to the flush
+  key -> robot   from posting the key event to the robot reading it
+For comparison the old path, set_enabled(False), is timed to the robot.
+
+Exits with status 1 if any press-to-flush time exceeds --limit-ms.
+Needs Linux (all of 127.0.0.0/8 local) and ports 1735 and 1110/1150 free.
+Run from the repository root:
+    python benchmarks/estop_latency_benchmark.py [--limit-ms 5]
+"""
+
+import argparse
+import math
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+from threading import Thread, Event
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ["HOME"] = tempfile.mkdtemp(prefix="ds-estop-")  # Default config, no geometry
+
+from networktables import NetworkTablesInstance
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QKeyEvent
+from PyQt5.QtCore import QEvent, Qt
+from network import robot_connection, ds_protocol
+from network.robot_connection import RobotConnection
+from controllers.controller_manager import create_controller
+from gui.main_window import DriverStationWindow
+from utils.config import Config
+
+
+DISABLES = 40  # Enter presses per transport
+ESTOPS = 5  # Space presses per transport (each needs a reconnect)
+OLD_PATH = 20  # set_enabled(False) calls per transport
+JOYSTICK_RATE = 100
+
+
+class NtRobot:
+    """NT3 server that timestamps each Enabled = False it receives."""
+    
+    address = "127.0.0.32"
+    
+    def __init__(self):
+        self.nt = NetworkTablesInstance.create()
+        self.nt.startServer(persistFilename=os.path.join(tempfile.gettempdir(), "estop-benchmark.ini"),
+                            listenAddress=self.address)
+        self.disabled_at = None
+        self.disabled = Event()
+        self.nt.getTable("DriverStation").addEntryListener(self._on_enabled, immediateNotify=False,
+                                                           key="Enabled")
+    
+    def _on_enabled(self, table, key, value, is_new):
+        if not value:
+            self.disabled_at = time.monotonic()
+            self.disabled.set()
+    
+    def stop(self):
+        self.nt.stopServer()
+
+
+class UdpRobot:
+    """UDP responder that answers control packets and timestamps disables."""
+    
+    address = "127.0.0.33"
+    
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((self.address, ds_protocol.ROBOT_PORT))
+        self.sock.settimeout(0.1)
+        self.disabled_at = None
+        self.disabled = Event()
+        self.running = True
+        self.thread = Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def _run(self):
+        was_enabled = False
+        while self.running:
+            try:
+                packet, (host, _) = self.sock.recvfrom(1500)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            now = time.monotonic()
+            sequence, enabled, mode, estop, _, _, _, _ = ds_protocol.decode_control(packet)
+            if was_enabled and not enabled:
+                self.disabled_at = now
+                self.disabled.set()
+            was_enabled = enabled
+            reply = ds_protocol.encode_status(sequence, enabled and not estop, mode, 12.5, estop=estop)
+            self.sock.sendto(reply, (host, ds_protocol.DS_PORT))
+    
+    def stop(self):
+        self.running = False
+        self.thread.join(timeout=1.0)
+        self.sock.close()
+
+
+def wait_until(app, check, timeout=5.0):
+    """Process Qt events until check() is true."""
+    deadline = time.monotonic() + timeout
+    while not check():
+        if time.monotonic() > deadline:
+            raise RuntimeError("timed out")
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def percentiles(samples):
+    """(p50, p99, max) of a list of seconds, in ms."""
+    ordered = sorted(1000.0 * s for s in samples)
+    if not ordered:
+        return (math.nan,) * 3
+    return (ordered[len(ordered) // 2], ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))],
+            ordered[-1])
+
+
+def send_joysticks(robot, running):
+    """Move both sticks at JOYSTICK_RATE while the robot is enabled."""
+    period = 1.0 / JOYSTICK_RATE
+    while running.is_set():
+        now = time.monotonic()
+        robot.send_joystick_data([[math.sin(5.0 * now + i) for i in range(6)]], [[False] * 12], now, now)
+        time.sleep(period)
+
+
+def run(app, transport):
+    """Time disables, e-stops and the old path on one transport."""
+    fake = UdpRobot() if transport == "udp" else NtRobot()
+    robot = RobotConnection(robot_address=fake.address, transport=transport, heartbeat_timeout=0,
+                            rate_control=False)
+    window = DriverStationWindow(robot, create_controller(Config()), Config())
+    window.show()
+    
+    # Note when the key filter saw each press
+    presses = []
+    
+    def on_stop(pressed, estop):
+        presses.append(pressed)
+        window.stop_robots(pressed, estop)
+    
+    window.stop_keys.on_stop = on_stop
+    
+    running = Event()
+    running.set()
+    sender = Thread(target=send_joysticks, args=(robot, running), daemon=True)
+    sender.start()
+    results = {"key": [], "press": [], "robot": [], "old": []}
+    
+    def trial(key):
+        """Enable, let frames flow, stop; return once the robot has seen it."""
+        wait_until(app, robot.is_connected)
+        if not robot.set_enabled(True):
+            raise RuntimeError("robot did not enable")
+        time.sleep(random.uniform(0.03, 0.08))  # Land anywhere in the flush/packet cycle
+        fake.disabled.clear()
+        count = len(presses)
+        posted = time.monotonic()
+        if key is None:
+            robot.set_enabled(False)
+        else:
+            app.postEvent(window, QKeyEvent(QEvent.KeyPress, key, Qt.NoModifier))
+            wait_until(app, lambda: len(presses) > count)
+        if not fake.disabled.wait(1.0):
+            raise RuntimeError("robot never saw the disable")
+        if key is None:
+            results["old"].append(fake.disabled_at - posted)
+            return
+        press_to_flush = robot.stop_times[-1]
+        results["press"].append(press_to_flush)
+        results["key"].append(presses[-1] + press_to_flush - posted)
+        results["robot"].append(fake.disabled_at - posted)
+    
+    try:
+        robot.connect()
+        for _ in range(DISABLES):
+            trial(Qt.Key_Return)
+        for _ in range(OLD_PATH):
+            trial(None)
+        for _ in range(ESTOPS):
+            trial(Qt.Key_Space)
+            if robot.enabled or not robot.estopped or robot.set_enabled(True):
+                raise RuntimeError("e-stop did not latch")
+            robot.disconnect()
+            robot.connect()
+    finally:
+        running.clear()
+        sender.join()
+        window.close()
+        robot.disconnect()
+        fake.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="E-stop keypress-to-flush timing")
+    parser.add_argument("--limit-ms", type=float, default=5.0,
+                        help="fail if any press-to-flush time is above this")
+    args = parser.parse_args()
+    
+    robot_connection.print = lambda *args, **kwargs: None  # Quiet connect and stop messages
+    app = QApplication(sys.argv)
+    print(f"{DISABLES} disables and {ESTOPS} e-stops per transport, joysticks at {JOYSTICK_RATE} Hz; "
+          f"p50 / p99 / max in ms")
+    print(f"{'transport':<14} {'key->flush':>22} {'press->flush':>22} {'key->robot':>22} "
+          f"{'set_enabled->robot':>22}")
+    worst = 0.0
+    for transport in ("networktables", "udp"):
+        results = run(app, transport)
+        columns = [percentiles(results[name]) for name in ("key", "press", "robot", "old")]
+        print(f"{transport:<14} " + " ".join(f"{a:>6.2f} / {b:>5.2f} / {c:>6.2f}" for a, b, c in columns))
+        worst = max(worst, columns[1][2])
+    
+    if worst > args.limit_ms:
+        print(f"FAIL: press to flush took up to {worst:.2f} ms (limit {args.limit_ms:g} ms)")
+        sys.exit(1)
+    print(f"OK: press to flush at most {worst:.2f} ms (limit {args.limit_ms:g} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Startup time and memory, headless vs. GUI.
+
+Starts the driver station several times each way with a fresh default
+config (no robot, no auto-connect, no recording):
+  headless  python headless.py, quit over stdin once it is ready
+  gui       python main.py on the offscreen Qt platform, closed as soon as
+            its event loop would start
+and reports the time until "Ready" is printed, peak resident memory of
+the process and the number of modules it imported.
+
+Run from the repository root:
+    python benchmarks/headless_startup_benchmark.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+RUNS = 5
+
+# Stops main.py where it would enter the Qt event loop
+GUI_LAUNCHER = """
+import sys
+sys.path.insert(0, {root!r})
+sys.argv = ["main.py"]
+from PyQt5.QtWidgets import QApplication
+QApplication.exec_ = lambda self: print("Modules:", len(sys.modules), flush=True) or 0
+import main
+main.main()
+"""
+
+# Runs headless.py the same way, reporting its modules when asked to quit
+HEADLESS_LAUNCHER = """
+import sys, runpy
+sys.path.insert(0, {root!r})
+sys.argv = ["headless.py", "--no-socket", "--status-interval", "0"]
+from core import headless
+execute = headless.HeadlessDriverStation.execute
+def report(self, line):
+    if line.strip() == "quit":
+        print("Modules:", len(sys.modules), flush=True)
+    return execute(self, line)
+headless.HeadlessDriverStation.execute = report
+runpy.run_path({script!r}, run_name="__main__")
+"""
+
+
+def measure(launcher, stdin_after_ready=None):
+    """Run one launcher; return (seconds to Ready, peak RSS in MB, modules)."""
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", SDL_VIDEODRIVER="dummy",
+               PYGAME_HIDE_SUPPORT_PROMPT="1")
+    start = time.monotonic()
+    process = subprocess.Popen([sys.executable, "-c", launcher], cwd=ROOT, env=env,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, text=True)
+    ready = None
+    modules = None
+    for line in process.stdout:
+        if ready is None and "Ready" in line:
+            ready = time.monotonic() - start
+            if stdin_after_ready:
+                process.stdin.write(stdin_after_ready)
+                process.stdin.flush()
+        if line.startswith("Modules:"):
+            modules = int(line.split()[1])
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if ready is None:
+        raise RuntimeError("driver station did not get ready")
+    # ru_maxrss is in kB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return ready, usage.ru_maxrss / scale, modules
+
+
+def main():
+    home = tempfile.mkdtemp(prefix="ds-startup-")
+    with open(os.path.join(home, ".frc_driverstation_config.json"), "w") as f:
+        json.dump({"connect_on_startup": False, "record_sessions": False}, f)
+    os.environ["HOME"] = home
+    
+    builds = {
+        "headless": (HEADLESS_LAUNCHER.format(root=ROOT, script=os.path.join(ROOT, "headless.py")),
+                     "quit\n"),
+        "gui": (GUI_LAUNCHER.format(root=ROOT), None),
+    }
+    print(f"{RUNS} runs each, median (min-max)")
+    print(f"{'build':<10} {'ready ms':>20} {'peak RSS MB':>20} {'modules':>8}")
+    for name, (launcher, stdin) in builds.items():
+        results = [measure(launcher, stdin) for _ in range(RUNS)]
+        ready = sorted(1000.0 * r[0] for r in results)
+        rss = sorted(r[1] for r in results)
+        modules = results[-1][2]
+        print(f"{name:<10} {ready[RUNS // 2]:>8.0f} ({ready[0]:>4.0f}-{ready[-1]:>4.0f}) "
+              f"{rss[RUNS // 2]:>8.1f} ({rss[0]:>4.1f}-{rss[-1]:>4.1f}) {modules:>8}")
+
+
+if __name__ == "__main__":
+    main()
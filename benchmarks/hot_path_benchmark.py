@@ -0,0 +1,363 @@
+"""
+Hot path benchmark suite: controllers to robot to window, without either.
+
+For each control rate (50, 100, 200 Hz) and each number of controllers
+(1 to 6) it runs the whole in-process pipeline:
+  scripted controllers (tools/fake_joysticks.py) -> ControllerManager
+  input thread -> RobotConnection.send_joystick_data and the ControlLoop
+  -> an in-process NetworkTables backend (tools/fake_networktables.py),
+with a robot-side heartbeat echo and 50 Hz telemetry, shown in a
+DriverStationWindow on the offscreen Qt platform. The controllers move
+at the control rate, which is also the input publish limit, unless
+--input-rate sets a rate of their own. Reports:
+  input us    input thread CPU per published frame (_input_loop)
+  loop us     control loop thread CPU per tick
+  ctrl us     DriverStationWindow.update_controller CPU per call
+  telem us    DriverStationWindow.update_telemetry CPU per call
+  gui %       GUI thread CPU
+  alloc       net memory blocks per sampling tick (worst after warm-up)
+  writes/s    Joystick/Packed writes reaching the robot
+  p50 / p99   ms from a controller moving to the robot seeing it
+
+--save keeps the results as JSON, along with the host and CPU they were
+measured on; --baseline compares against results saved earlier and exits
+with status 1 if any CPU, allocation or latency figure got worse by more
+than --tolerance (a fraction) and by more than its noise floor. The
+figures only compare on the same machine, so save a baseline on yours
+first; a baseline from another host or CPU gets a warning.
+Run from the repository root:
+    python benchmarks/hot_path_benchmark.py --save benchmarks/hot_path_baseline.json
+    python benchmarks/hot_path_benchmark.py --baseline benchmarks/hot_path_baseline.json
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from threading import Thread, Event
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ["HOME"] = tempfile.mkdtemp(prefix="ds-hot-path-")  # Default config, no geometry
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QEventLoop, QTimer
+from controllers import controller_manager
+from controllers.controller_manager import ControllerManager
+from core.control_loop import ControlLoop
+from gui.main_window import DriverStationWindow
+from network import robot_connection
+from network.heartbeat import HeartbeatEcho
+from network.robot_connection import RobotConnection
+from tools.fake_joysticks import FakePygame
+from tools.fake_networktables import FakeNetworkTables
+from utils.config import Config
+
+
+RATES = (50, 100, 200)
+CONTROLLERS = range(1, controller_manager.MAX_SLOTS + 1)
+WARMUP = 0.5  # Seconds before measuring
+TELEMETRY_RATE = 50
+
+# Figures where lower is better, checked against the baseline, with the
+# smallest change that is more than run-to-run noise
+CHECKED = {
+    "input_us": 100.0,
+    "loop_us": 30.0,
+    "ctrl_us": 30.0,
+    "telem_us": 150.0,
+    "gui_percent": 2.0,
+    "alloc_blocks": 10,
+    "latency_p50_ms": 1.0,
+    "latency_p99_ms": 2.0,
+}
+
+
+def thread_cpu(thread):
+    """CPU seconds used so far by a running thread (Linux and macOS)."""
+    return time.clock_gettime(time.pthread_getcpuclockid(thread.ident))
+
+
+class CallTimer:
+    """Wraps a method on a class and adds up the CPU time of its calls."""
+    
+    def __init__(self, cls, name):
+        self.cls = cls
+        self.name = name
+        self.original = getattr(cls, name)
+        self.calls = 0
+        self.cpu = 0.0
+        timer = self
+        
+        def timed(*args, **kwargs):
+            started = time.thread_time()
+            try:
+                return timer.original(*args, **kwargs)
+            finally:
+                timer.cpu += time.thread_time() - started
+                timer.calls += 1
+        
+        setattr(cls, name, timed)
+    
+    def reset(self):
+        self.calls = 0
+        self.cpu = 0.0
+    
+    def per_call_us(self):
+        return 1e6 * self.cpu / self.calls if self.calls else 0.0
+    
+    def restore(self):
+        setattr(self.cls, self.name, self.original)
+
+
+class FakeRobot:
+    """Robot side: echoes heartbeats, sends telemetry, timestamps frames."""
+    
+    def __init__(self, nt, joysticks):
+        self.nt = nt
+        self.joysticks = joysticks
+        self.latencies = []
+        self.measuring = False
+        self.running = Event()
+        ds_table = nt.getTable("DriverStation")
+        self.echo = HeartbeatEcho(ds_table, nt.flush)
+        ds_table.addEntryListener(self._on_frame, immediateNotify=False, key="Joystick/Packed")
+        self.thread = Thread(target=self._send_telemetry, daemon=True)
+    
+    def start(self):
+        self.running.set()
+        self.thread.start()
+    
+    def stop(self):
+        self.running.clear()
+        self.thread.join()
+    
+    def _on_frame(self, table, key, value, is_new):
+        """Match slot 0's button counter to the tick that set it."""
+        if not self.measuring or len(value) < 3:
+            return
+        num_axes = int(value[2])
+        emitted = self.joysticks.emitted(value[4 + num_axes])
+        if emitted is not None:
+            self.latencies.append(time.monotonic() - emitted)
+    
+    def _send_telemetry(self):
+        table = self.nt.getTable("SmartDashboard")
+        period = 1.0 / TELEMETRY_RATE
+        while self.running.is_set():
+            now = time.monotonic()
+            table.putNumber("BatteryVoltage", round(12.0 + 0.5 * math.sin(now), 2))
+            table.putNumber("RoboRIO/CPU", round(40.0 + 10.0 * math.sin(3.0 * now), 1))
+            table.putNumber("RoboRIO/RAM", round(50.0 + math.sin(0.5 * now), 1))
+            time.sleep(period)
+
+
+def wait_until(app, check, timeout=5.0):
+    """Process Qt events until check() is true."""
+    deadline = time.monotonic() + timeout
+    while not check():
+        if time.monotonic() > deadline:
+            raise RuntimeError("timed out")
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def run_events(seconds):
+    """Run the Qt event loop for a while, as app.exec_() would."""
+    loop = QEventLoop()
+    QTimer.singleShot(int(1000 * seconds), loop.quit)
+    loop.exec_()
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    if not ordered:
+        return math.nan
+    return ordered[min(len(ordered) - 1, int(p / 100.0 * len(ordered)))]
+
+
+def run(app, rate, controllers, duration, timers, input_rate=None):
+    """Measure one rate and controller count."""
+    joysticks = FakePygame(controllers=controllers, rate=input_rate or rate)
+    nt = FakeNetworkTables()
+    fake = FakeRobot(nt, joysticks)
+    robot = RobotConnection(robot_address="fake-robot", nt_backend=nt, rate_control=False,
+                            joystick_mode="packed")
+    controller = ControllerManager(max_rate=rate, event_thread="input", backend=joysticks)
+    loop = ControlLoop(robot, controller, rate=rate)
+    controller.on_input_changed = lambda frame: robot.send_joystick_data(
+        frame.axes, frame.buttons, frame.captured, frame.shaped)
+    window = DriverStationWindow(robot, controller, Config(), loop)
+    window.show()
+    
+    controller.start()
+    loop.start()
+    fake.start()
+    try:
+        robot.connect()
+        wait_until(app, robot.is_connected)
+        if not robot.set_enabled(True):
+            raise RuntimeError("robot did not enable")
+        run_events(WARMUP)
+        
+        # Measure from here
+        for timer in timers.values():
+            timer.reset()
+        ds_table = nt.getTable("DriverStation")
+        writes = ds_table.write_counts.get("Joystick/Packed", 0)
+        frames = controller.ticks
+        loop_ticks = loop.get_stats()["ticks"]
+        input_cpu = thread_cpu(controller.thread)
+        loop_cpu = thread_cpu(loop.thread)
+        gui_cpu = time.thread_time()
+        fake.measuring = True
+        started = time.monotonic()
+        
+        run_events(duration)
+        
+        elapsed = time.monotonic() - started
+        fake.measuring = False
+        input_cpu = thread_cpu(controller.thread) - input_cpu
+        loop_cpu = thread_cpu(loop.thread) - loop_cpu
+        gui_cpu = time.thread_time() - gui_cpu
+        frames = controller.ticks - frames
+        loop_ticks = loop.get_stats()["ticks"] - loop_ticks
+        writes = ds_table.write_counts.get("Joystick/Packed", 0) - writes
+    finally:
+        window.close()  # Stops the controller
+        loop.stop()
+        robot.disconnect()
+        fake.stop()
+    
+    return {
+        "input_us": 1e6 * input_cpu / max(1, frames),
+        "loop_us": 1e6 * loop_cpu / max(1, loop_ticks),
+        "ctrl_us": timers["update_controller"].per_call_us(),
+        "telem_us": timers["update_telemetry"].per_call_us(),
+        "gui_percent": 100.0 * gui_cpu / elapsed,
+        "alloc_blocks": controller.alloc_blocks_max,
+        "writes_per_second": writes / elapsed,
+        "latency_p50_ms": 1000.0 * percentile(fake.latencies, 50),
+        "latency_p99_ms": 1000.0 * percentile(fake.latencies, 99),
+    }
+
+
+def cpu_model():
+    """Name of the CPU, as the OS reports it."""
+    try:
+        if sys.platform.startswith("linux"):
+            with open("/proc/cpuinfo") as f:
+                for line in f:
+                    if line.startswith("model name"):
+                        return line.split(":", 1)[1].strip()
+        elif sys.platform == "darwin":
+            return subprocess.run(["sysctl", "-n", "machdep.cpu.brand_string"],
+                                  capture_output=True, text=True).stdout.strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def host_info():
+    """The machine results are measured on; saved with them."""
+    return {
+        "host": platform.node(),
+        "system": platform.platform(),
+        "cpu": cpu_model(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+    }
+
+
+def host_mismatch(saved, current):
+    """Lines describing how the baseline's machine differs from this one."""
+    if not saved:
+        return ["the baseline does not say which machine it was measured on"]
+    return [f"{key}: {saved.get(key)} (baseline) vs {current[key]} (here)"
+            for key in ("host", "cpu", "cpus") if saved.get(key) != current[key]]
+
+
+def compare(results, baseline, tolerance):
+    """Lines for figures worse than the baseline by more than tolerance."""
+    regressions = []
+    for case, figures in results.items():
+        for name, noise in CHECKED.items():
+            before = baseline.get(case, {}).get(name)
+            now = figures[name]
+            if not before or math.isnan(now):
+                continue
+            if now > before * (1.0 + tolerance) and now - before > noise:
+                regressions.append(f"{case} {name}: {before:.2f} -> {now:.2f} "
+                                   f"(+{100.0 * (now / before - 1.0):.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot path benchmark suite")
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds measured per case")
+    parser.add_argument("--rates", type=int, nargs="+", default=RATES)
+    parser.add_argument("--controllers", type=int, nargs="+", default=list(CONTROLLERS))
+    parser.add_argument("--input-rate", type=float, default=None,
+                        help="controller updates/s (default: the control rate)")
+    parser.add_argument("--save", metavar="FILE", help="save the results as JSON")
+    parser.add_argument("--baseline", metavar="FILE", help="compare with results saved by --save")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed fraction worse than the baseline (default 0.25)")
+    args = parser.parse_args()
+    
+    # Quiet connect, attach and enable messages
+    robot_connection.print = lambda *args, **kwargs: None
+    controller_manager.print = lambda *args, **kwargs: None
+    app = QApplication(sys.argv)
+    timers = {name: CallTimer(DriverStationWindow, name)
+              for name in ("update_controller", "update_telemetry")}
+    
+    print(f"{args.duration:g} s per case after {WARMUP:g} s warm-up; CPU per call or tick")
+    print(f"{'case':<10} {'input us':>9} {'loop us':>8} {'ctrl us':>8} {'telem us':>9} {'gui %':>6} "
+          f"{'alloc':>6} {'writes/s':>9} {'p50 ms':>7} {'p99 ms':>7}")
+    results = {}
+    for rate in args.rates:
+        for controllers in args.controllers:
+            case = f"{rate}Hz/{controllers}"
+            r = run(app, rate, controllers, args.duration, timers, args.input_rate)
+            results[case] = r
+            print(f"{case:<10} {r['input_us']:>9.1f} {r['loop_us']:>8.1f} {r['ctrl_us']:>8.1f} "
+                  f"{r['telem_us']:>9.1f} {r['gui_percent']:>6.1f} {r['alloc_blocks']:>6} "
+                  f"{r['writes_per_second']:>9.1f} {r['latency_p50_ms']:>7.2f} "
+                  f"{r['latency_p99_ms']:>7.2f}")
+    for timer in timers.values():
+        timer.restore()
+    
+    host = host_info()
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"host": host, "results": results}, f, indent=2)
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            saved = json.load(f)
+        # Files saved before the host was recorded hold only the results
+        baseline = saved["results"] if "results" in saved else saved
+        mismatch = host_mismatch(saved.get("host"), host)
+        if mismatch:
+            print(f"WARNING: {args.baseline} may be from another machine; CPU and latency "
+                  f"figures only compare on the same one, so save a baseline here with --save")
+            for line in mismatch:
+                print("  " + line)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"FAIL: {len(regressions)} figures more than {100.0 * args.tolerance:.0f}% "
+                  f"worse than {args.baseline}")
+            for line in regressions:
+                print("  " + line)
+            sys.exit(1)
+        print(f"OK: nothing more than {100.0 * args.tolerance:.0f}% worse than {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
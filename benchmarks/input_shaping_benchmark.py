@@ -0,0 +1,69 @@
+"""
+Input shaping benchmark.
+
+Times InputShaper.apply on a full frame with 1 to 6 controllers using a
+profile with two radial sticks, two triggers, inversion, calibration and
+an expo curve, and compares it with the 20 ms control loop budget.
+
+Run from the repository root:
+    python benchmarks/input_shaping_benchmark.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+from controllers.controller_manager import MAX_SLOTS, MAX_AXES
+from controllers.input_shaping import InputShaper, find_profile
+
+
+FRAMES = 20000
+REPEATS = 5
+BUDGET = 0.020  # 50 Hz control loop
+
+PROFILE = {
+    "sticks": [[0, 1], [2, 3]],
+    "triggers": [4, 5],
+    "invert": [1, 3],
+    "curve": "expo",
+    "expo": 0.4,
+    "center": [0.02, -0.01, 0.0, 0.03],
+    "min": [-0.98, -1.0, -0.97, -1.0],
+    "max": [1.0, 0.99, 1.0, 0.96],
+}
+
+
+def run(controllers):
+    """Best time per shaped frame over REPEATS runs of FRAMES frames."""
+    shaper = InputShaper(MAX_SLOTS, MAX_AXES, [0.1] * MAX_SLOTS)
+    for slot in range(controllers):
+        shaper.set_profile(slot, find_profile({"default": PROFILE}, None, None))
+    
+    rng = np.random.default_rng(2026)
+    raw = rng.uniform(-1.0, 1.0, size=(64, MAX_SLOTS, MAX_AXES))
+    frame = np.zeros((MAX_SLOTS, MAX_AXES))
+    
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for i in range(FRAMES):
+            frame[:] = raw[i & 63]
+            shaper.apply(frame)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / FRAMES
+
+
+def main():
+    run(MAX_SLOTS)  # Warm up
+    print(f"{'controllers':>11} {'us/frame':>9} {'% of 20 ms':>11}")
+    for controllers in range(1, MAX_SLOTS + 1):
+        per_frame = run(controllers)
+        print(f"{controllers:>11} {per_frame * 1e6:>9.1f} {100.0 * per_frame / BUDGET:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
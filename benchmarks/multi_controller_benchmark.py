@@ -0,0 +1,117 @@
+"""
+Multi-controller sampling benchmark.
+
+Attaches 1 to 6 simulated controllers to a ControllerManager and times one
+control tick: sampling every slot into the frame buffer, reading the frame
+and publishing it as a single packed NetworkTables write.
+
+Run from the repository root:
+    python benchmarks/multi_controller_benchmark.py
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pygame
+from controllers import controller_manager
+from network.joystick_publisher import JoystickPublisher
+
+
+TICKS = 5000
+REPEATS = 7
+
+
+class SimulatedJoystick:
+    """Stands in for pygame.joystick.Joystick with moving sticks."""
+    
+    def __init__(self, device_index):
+        self.device_index = device_index
+        self.phase = 0
+    
+    def init(self):
+        pass
+    
+    def quit(self):
+        pass
+    
+    def get_instance_id(self):
+        return 100 + self.device_index
+    
+    def get_guid(self):
+        return f"simulated-{self.device_index}"
+    
+    def get_name(self):
+        return f"Simulated Pad {self.device_index}"
+    
+    def get_numaxes(self):
+        return 6
+    
+    def get_numbuttons(self):
+        return 16
+    
+    def get_axis(self, i):
+        self.phase += 1
+        return ((self.phase * 7 + i) % 200 - 100) / 100.0
+    
+    def get_button(self, i):
+        return (self.phase >> i) & 1
+
+
+class CountingTable:
+    """Stands in for a NetworkTable and counts writes."""
+    
+    def __init__(self):
+        self.writes = 0
+    
+    def putNumberArray(self, key, values):
+        self.writes += 1
+    
+    def putNumber(self, key, value):
+        self.writes += 1
+    
+    def putBoolean(self, key, value):
+        self.writes += 1
+
+
+def run(controllers):
+    """Best time per control tick over REPEATS runs of TICKS ticks."""
+    manager = controller_manager.ControllerManager(max_rate=None, event_thread="input",
+                                                   backend=pygame)
+    for device_index in range(controllers):
+        manager._handle_event(pygame.event.Event(pygame.JOYDEVICEADDED, device_index=device_index))
+    
+    publisher = JoystickPublisher("packed")
+    table = CountingTable()
+    
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(TICKS):
+            manager._sample()
+            frame = manager.get_frame()
+            publisher.publish(table, frame.axes, frame.buttons)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    
+    return best / TICKS * 1e6, table.writes / (TICKS * REPEATS)
+
+
+def main():
+    pygame.joystick.Joystick = SimulatedJoystick
+    controller_manager.print = lambda *args, **kwargs: None  # Quiet attach messages
+    
+    print(f"{'controllers':>11} {'us/tick':>9} {'added us':>9} {'writes/tick':>12}")
+    previous = None
+    for controllers in range(1, controller_manager.MAX_SLOTS + 1):
+        per_tick, writes = run(controllers)
+        added = per_tick - previous if previous is not None else per_tick
+        previous = per_tick
+        print(f"{controllers:>11} {per_tick:>9.1f} {added:>9.1f} {writes:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
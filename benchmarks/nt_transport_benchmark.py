@@ -0,0 +1,124 @@
+"""
+NetworkTables 3 vs 4 joystick transport benchmark.
+
+Runs a local NT4 server (pyntcore, which also accepts NT3 clients), connects
+a RobotConnection to it with each NetworkTables version and sends moving
+joystick frames at 50, 100 and 200 Hz. The server side counts the frames
+that arrive and how long each took from send_joystick_data() to the
+server's value listener.
+
+Needs pyntcore and the default ports 1735/5810 free. Run from the
+repository root:
+    python benchmarks/nt_transport_benchmark.py
+"""
+
+import math
+import os
+import sys
+import tempfile
+import time
+from threading import Lock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+import ntcore
+from network import robot_connection
+from network.robot_connection import RobotConnection
+
+
+RATES = (50, 100, 200)
+DURATION = 3.0
+CONTROLLERS = 2
+
+
+class ServerProbe:
+    """NT4 server that timestamps every joystick frame it receives."""
+    
+    def __init__(self):
+        self.instance = ntcore.NetworkTableInstance.create()
+        self.instance.startServer(os.path.join(tempfile.gettempdir(), "nt-transport-benchmark.json"))
+        self._lock = Lock()
+        self.received = {}  # frame counter -> receive time
+        topic = self.instance.getTopic("/DriverStation/Joystick/Packed")
+        self._subscriber = topic.genericSubscribe(ntcore.PubSubOptions(sendAll=True, periodic=0.001))
+        self.instance.addListener(self._subscriber, ntcore.EventFlags.kValueAll, self._on_value)
+    
+    def _on_value(self, event):
+        now = time.monotonic()
+        counter = int(event.data.value.value()[0])
+        with self._lock:
+            self.received.setdefault(counter, now)
+    
+    def reset(self):
+        with self._lock:
+            self.received = {}
+    
+    def close(self):
+        ntcore.NetworkTableInstance.destroy(self.instance)
+
+
+def run(probe, nt_version, rate):
+    """Send frames for DURATION seconds; return (sent/s, received/s, latency ms array)."""
+    robot = RobotConnection(robot_address="127.0.0.1", nt_version=nt_version, rate_control=False,
+                            heartbeat_timeout=0, joystick_mode="packed")
+    robot.connect()
+    deadline = time.monotonic() + 5.0
+    while not robot.connected and time.monotonic() < deadline:
+        time.sleep(0.05)
+    if not robot.connected:
+        raise RuntimeError(f"NT{nt_version} client did not connect")
+    robot.set_enabled(True)
+    time.sleep(0.5)
+    probe.reset()
+    
+    sent_at = {}
+    period = 1.0 / rate
+    start = time.monotonic()
+    next_tick = start
+    while time.monotonic() - start < DURATION:
+        now = time.monotonic()
+        axes = [[math.sin(3.0 * now + slot + i) for i in range(6)] for slot in range(CONTROLLERS)]
+        buttons = [[int(now * 4) % 2] * 12 for _ in range(CONTROLLERS)]
+        counter = robot.joystick_publisher.frame_counter
+        robot.send_joystick_data(axes, buttons, now, now)
+        if robot.joystick_publisher.frame_counter != counter:
+            sent_at[robot.joystick_publisher.frame_counter] = now
+        next_tick += period
+        time.sleep(max(0.0, next_tick - time.monotonic()))
+    time.sleep(0.5)
+    
+    with probe._lock:
+        received = dict(probe.received)
+    latencies = np.array([1000.0 * (received[c] - t) for c, t in sent_at.items() if c in received])
+    robot.disconnect()
+    time.sleep(0.5)
+    return len(sent_at) / DURATION, len(latencies) / DURATION, latencies
+
+
+def main():
+    robot_connection.print = lambda *args, **kwargs: None  # Quiet connect messages
+    probe = ServerProbe()
+    time.sleep(0.5)
+    
+    print(f"{CONTROLLERS} controllers, {DURATION:g} s per run")
+    print(f"{'version':>7} {'rate':>5} {'sent/s':>8} {'recv/s':>8} {'lost %':>7} "
+          f"{'p50 ms':>7} {'p95 ms':>7} {'max ms':>7}")
+    try:
+        for nt_version in (3, 4):
+            for rate in RATES:
+                sent, received, latencies = run(probe, nt_version, rate)
+                lost = 100.0 * (1.0 - received / sent) if sent else 0.0
+                if len(latencies):
+                    p50, p95 = np.percentile(latencies, (50, 95))
+                    worst = latencies.max()
+                else:
+                    p50 = p95 = worst = float("nan")
+                print(f"{'NT' + str(nt_version):>7} {rate:>5} {sent:>8.1f} {received:>8.1f} {lost:>7.1f} "
+                      f"{p50:>7.2f} {p95:>7.2f} {worst:>7.2f}")
+    finally:
+        probe.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Control loop timing with a stalled GUI thread.
+
+Runs the 50 Hz control loop connected to a stand-in robot twice: in this
+process (as the window normally does) and in a control worker process
+(config "control_worker"). Meanwhile the main thread stands in for a busy
+GUI and repeatedly sorts a large list, which holds the GIL for the whole
+call. Reports the loop's tick rate, jitter and overruns for each run;
+the worker's figures come from the shared state block.
+
+Needs Linux (all of 127.0.0.0/8 local) and NT3 port 1735 free on
+127.0.0.31. Run from the repository root:
+    python benchmarks/process_isolation_benchmark.py
+"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+ADDRESS = "127.0.0.31"
+DURATION = 6.0
+STALL_ITEMS = 2000000  # List length sorted per stall (about 0.3-1 s with the GIL held)
+STALL_GAP = 0.2  # Seconds between stalls
+
+
+def write_config(home):
+    """Config for the worker process: fixed stand-in address, no recording."""
+    with open(os.path.join(home, ".frc_driverstation_config.json"), "w") as f:
+        json.dump({"robot_address": ADDRESS, "record_sessions": False, "heartbeat_timeout": 0,
+                   "control_loop_rate": 50.0}, f)
+
+
+def stall(duration, data):
+    """Keep the main thread busy in GIL-holding calls; return the stall times."""
+    stalls = []
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        started = time.monotonic()
+        sorted(data)
+        stalls.append(time.monotonic() - started)
+        time.sleep(STALL_GAP)
+    return stalls
+
+
+def wait_for(check, timeout=10.0):
+    """Poll check() until it is true or the timeout passes."""
+    deadline = time.monotonic() + timeout
+    while not check():
+        if time.monotonic() > deadline:
+            raise RuntimeError("timed out waiting for the robot")
+        time.sleep(0.05)
+
+
+def run_in_process(data):
+    """Control loop and robot connection in this process."""
+    from utils.config import Config
+    from controllers.controller_manager import create_controller
+    from core.control_loop import ControlLoop
+    from network.robot_connection import create_robot
+    
+    config = Config()
+    robot = create_robot(config)
+    controller = create_controller(config)
+    controller.start()
+    loop = ControlLoop(robot, controller, rate=config.get('control_loop_rate'))
+    loop.start()
+    try:
+        robot.connect()
+        wait_for(robot.is_connected)
+        time.sleep(1.0)
+        loop.stats.reset()
+        start = time.monotonic()
+        stalls = stall(DURATION, data)
+        elapsed = time.monotonic() - start
+        return loop.get_stats(), elapsed, stalls
+    finally:
+        robot.disconnect()
+        loop.stop()
+        controller.stop()
+
+
+def run_worker(data):
+    """Control loop and robot connection in a control worker process."""
+    from core.control_worker import ControlWorker
+    
+    worker = ControlWorker()
+    worker.start()
+    
+    def connected():
+        snapshot = worker.read()
+        return snapshot is not None and snapshot.connected
+    
+    try:
+        worker.send("connect", 2026)
+        wait_for(connected)
+        time.sleep(1.0)
+        worker.send("reset_loop_stats")
+        time.sleep(0.1)
+        start = time.monotonic()
+        stalls = stall(DURATION, data)
+        elapsed = time.monotonic() - start
+        return worker.read()._asdict(), elapsed, stalls
+    finally:
+        worker.send("disconnect")
+        worker.stop()
+
+
+def main():
+    home = tempfile.mkdtemp(prefix="ds-bench-")
+    write_config(home)
+    os.environ["HOME"] = home  # Read by the config in both processes
+    stand_in = subprocess.Popen([sys.executable, os.path.join(ROOT, "tools", "stand_in_robot.py"),
+                                 "--address", ADDRESS],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    data = [random.random() for _ in range(STALL_ITEMS)]
+    try:
+        time.sleep(1.5)
+        results = [("in process", run_in_process(data)), ("worker", run_worker(data))]
+    finally:
+        stand_in.kill()
+        stand_in.wait()
+    
+    print(f"{DURATION:g} s per run, 50 Hz control loop, main thread sorting {STALL_ITEMS} floats "
+          f"every {STALL_GAP:g} s")
+    print(f"{'control loop':<12} {'stall ms':>9} {'ticks/s':>8} {'jitter ms':>10} {'max ms':>8} "
+          f"{'overruns':>9} {'skipped':>8}")
+    for name, (stats, elapsed, stalls) in results:
+        print(f"{name:<12} {1000.0 * sum(stalls) / len(stalls):>9.0f} {stats['ticks'] / elapsed:>8.1f} "
+              f"{stats['jitter_mean_ms']:>10.2f} {stats['jitter_max_ms']:>8.1f} "
+              f"{stats['overruns']:>9} {stats['skipped_ticks']:>8}")
+
+
+if __name__ == "__main__":
+    main()
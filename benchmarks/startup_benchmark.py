@@ -0,0 +1,119 @@
+"""
+Startup time to the window and to the first control frame.
+
+Starts main.py several times on the offscreen Qt platform with
+--startup-report, auto-connecting to a stand-in robot on 127.0.0.34, and
+closes it once the report is written. Reports the median time of each
+startup phase and import, measured from launching the process (the
+"process" row is the interpreter's own startup before main.py runs).
+
+--save keeps the medians as JSON; --baseline compares against medians
+saved earlier, e.g. by the previous release.
+Needs Linux (all of 127.0.0.0/8 local) and NT3 port 1735 free on
+127.0.0.34. Run from the repository root:
+    python benchmarks/startup_benchmark.py [--save FILE] [--baseline FILE]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+ADDRESS = "127.0.0.34"
+RUNS = 5
+
+# Closes the window once main.py has written its startup report
+LAUNCHER = """
+import os, sys
+sys.path.insert(0, {root!r})
+sys.argv = ["main.py", "--startup-report", {report!r}]
+import main
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+exec_ = QApplication.exec_
+def run(self):
+    timer = QTimer()
+    timer.timeout.connect(lambda: os.path.exists({report!r}) and self.closeAllWindows())
+    timer.start(10)
+    return exec_()
+QApplication.exec_ = run
+main.main()
+"""
+
+
+def measure(home):
+    """Run main.py once; return {phase or import label: ms since launch}."""
+    report = os.path.join(home, "startup.json")
+    if os.path.exists(report):
+        os.remove(report)
+    env = dict(os.environ, HOME=home, QT_QPA_PLATFORM="offscreen", SDL_VIDEODRIVER="dummy",
+               PYGAME_HIDE_SUPPORT_PROMPT="1")
+    launched = time.monotonic()
+    subprocess.run([sys.executable, "-c", LAUNCHER.format(root=ROOT, report=report)], cwd=ROOT,
+                   env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=30)
+    with open(report) as f:
+        data = json.load(f)
+    
+    offset = 1000.0 * (data["started"] - launched)
+    results = {"process": offset}
+    for phase, ms in data["phases"].items():
+        results[phase] = offset + ms
+    for entry in data["imports"]:
+        results["import " + entry["label"]] = entry["ms"]
+    return results
+
+
+def median(values):
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Driver station startup timing")
+    parser.add_argument("--save", metavar="FILE", help="save the medians as JSON")
+    parser.add_argument("--baseline", metavar="FILE", help="compare with medians saved by --save")
+    args = parser.parse_args()
+    
+    home = tempfile.mkdtemp(prefix="ds-startup-")
+    with open(os.path.join(home, ".frc_driverstation_config.json"), "w") as f:
+        json.dump({"robot_address": ADDRESS, "connect_on_startup": True, "record_sessions": False,
+                   "heartbeat_timeout": 0}, f)
+    stand_in = subprocess.Popen([sys.executable, os.path.join(ROOT, "tools", "stand_in_robot.py"),
+                                 "--address", ADDRESS],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        time.sleep(1.5)
+        runs = [measure(home) for _ in range(RUNS)]
+    finally:
+        stand_in.kill()
+        stand_in.wait()
+    
+    names = []
+    for run in runs:
+        names += [name for name in run if name not in names]
+    medians = {name: median([run[name] for run in runs if name in run]) for name in names}
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    
+    print(f"{RUNS} runs, median ms (phases since launch, imports as spent)")
+    print(f"{'':<26} {'now':>8} {'baseline':>9} {'change':>8}")
+    for name in names:
+        line = f"{name:<26} {medians[name]:>8.1f}"
+        if name in baseline:
+            line += f" {baseline[name]:>9.1f} {medians[name] - baseline[name]:>+8.1f}"
+        print(line)
+    
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(medians, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
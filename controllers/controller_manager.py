@@ -3,38 +3,167 @@ Controller manager for PS5 and Xbox controller support.
 Uses pygame for cross-platform joystick input.
 """
 
-import pygame
-from threading import Thread
+import numpy as np
+from array import array
+from collections import namedtuple, deque
+from threading import Thread, Event
+import sys
 import time
+from controllers.controller_registry import ControllerRegistry
+from controllers.input_shaping import InputShaper, find_profile
+from utils.startup import startup
+
+
+# Fixed frame capacity; extra axes/buttons on exotic devices are ignored
+MAX_SLOTS = 6
+MAX_AXES = 16
+MAX_BUTTONS = 32
+
+# A consistent snapshot of one sampled frame. axes and buttons hold one
+# list per controller slot, up to the highest attached slot (empty lists
+# for empty slots). timestamp is when it was sampled, captured when the
+# first input event it reflects arrived and shaped when shaping finished
+# (all time.monotonic()).
+ControllerFrame = namedtuple("ControllerFrame",
+                             ["sequence", "timestamp", "axes", "buttons", "captured", "shaped"],
+                             defaults=(0.0, 0.0))
+
+# pygame takes about 150 ms to import, so it is loaded by the thread that
+# starts the event queue (see load_pygame) instead of with this module
+pygame = None
+
+
+def load_pygame():
+    """Import pygame on first use and return it."""
+    global pygame
+    if pygame is None:
+        with startup.importing("pygame"):
+            import pygame as module
+        pygame = module
+    return pygame
+
+
+def default_event_thread():
+    """Thread that should own the pygame event queue on this platform."""
+    # macOS only delivers window system events to the main thread
+    return "main" if sys.platform == "darwin" else "input"
 
 
 class ControllerManager:
-    """Manages game controller input."""
+    """Manages game controller input.
+    
+    Up to MAX_SLOTS controllers are used at once, each in the slot the
+    registry gave it (slot_assignments maps device GUIDs to the slots the
+    user chose, see assign_slot). All attached slots are sampled together
+    into one frame, which is then shaped in a single batch using each
+    controller's profile (see controllers/input_shaping.py).
+    """
     
-    def __init__(self, deadzone=0.1):
+    def __init__(self, deadzone=0.1, max_rate=100.0, event_thread=None, slot_deadzones=None,
+                 profiles=None, estop_button=None, slot_assignments=None, backend=None):
         self.deadzone = deadzone
-        self.joystick = None
-        self.selected_controller_index = 0
+        self.estop_button = tuple(estop_button) if estop_button else None  # (slot, button)
+        deadzones = [deadzone] * MAX_SLOTS
+        for slot, value in enumerate((slot_deadzones or [])[:MAX_SLOTS]):
+            if value is not None:
+                deadzones[slot] = value
+        self.profiles = profiles or {}
+        self.shaper = InputShaper(MAX_SLOTS, MAX_AXES, deadzones)
+        self.registry = ControllerRegistry(max_slots=MAX_SLOTS, assigned_slots=slot_assignments)
+        self._slot_moves = deque()  # (slot, new slot) asked for by assign_slot
         self.running = False
+        
+        # Joystick backend: pygame, loaded on start(), or a stand-in with the
+        # same calls (e.g. the scripted one in tools/fake_joysticks.py)
+        self.pygame = None
+        self._input_events = ()  # Joystick events that change a controller's state
+        if backend is not None:
+            self._use_backend(backend)
         self.thread = None
         
-        # Controller state
-        self.axes = []
-        self.buttons = []
+        # Attached controllers by slot (owned by the event thread)
+        self._joysticks = [None] * MAX_SLOTS
+        self._num_axes = array('i', [0] * MAX_SLOTS)
+        self._num_buttons = array('i', [0] * MAX_SLOTS)
+        self._slot_count = 0  # Highest attached slot + 1
+        self._instance_slots = {}  # pygame instance id -> slot
         self.controller_name = "No Controller"
         
+        # Controller state, double-buffered: the input thread fills the back
+        # buffer in place and publishes it by bumping the sequence number.
+        # Frame N lives in buffer N & 1; slot S uses a fixed region of it.
+        self._sequence = array('Q', [0])
+        self._timestamps = array('d', [0.0, 0.0])
+        self._captured = array('d', [0.0, 0.0])
+        self._shaped = array('d', [0.0, 0.0])
+        self._slot_counts = array('i', [0, 0])
+        self._axis_counts = (array('i', [0] * MAX_SLOTS), array('i', [0] * MAX_SLOTS))
+        self._button_counts = (array('i', [0] * MAX_SLOTS), array('i', [0] * MAX_SLOTS))
+        self._axes = (array('d', [0.0] * (MAX_SLOTS * MAX_AXES)),
+                      array('d', [0.0] * (MAX_SLOTS * MAX_AXES)))
+        self._buttons = (array('B', [0] * (MAX_SLOTS * MAX_BUTTONS)),
+                         array('B', [0] * (MAX_SLOTS * MAX_BUTTONS)))
+        
+        # (slots, axes) NumPy views of the axis buffers for shaping
+        self._axis_views = tuple(np.frombuffer(axes, dtype=np.float64).reshape(MAX_SLOTS, MAX_AXES)
+                                 for axes in self._axes)
+        
+        # Sampler statistics: net allocated blocks per tick should stay at zero
+        self.ticks = 0
+        self.alloc_blocks_last_tick = 0
+        self.alloc_blocks_max = 0
+        
+        # Event handling: input changes are published as soon as they
+        # arrive, but no more often than max_rate frames per second
+        self.event_thread = event_thread or default_event_thread()
+        self.min_interval = 1.0 / max_rate if max_rate else 0.0
+        self._dirty = False
+        self._capture_time = 0.0  # Arrival of the first event not yet published
+        self._last_publish = 0.0
+        self._ready = Event()
+        
         # Callbacks
-        self.on_controller_changed = None
+        self.on_controller_changed = None  # Called with (connected, name) per device
+        self.on_input_changed = None  # Called with each new ControllerFrame
+        self.on_controllers_changed = None  # Called when devices are added or removed
+        self.on_estop = None  # Called with the press time when the e-stop button goes down
+        self.on_slots_assigned = None  # Called with the GUID -> slot assignments after a move
+    
+    def _use_backend(self, backend):
+        """Take the joystick backend into use."""
+        self.pygame = backend
+        self.registry.pygame = backend
+        self._input_events = (backend.JOYAXISMOTION, backend.JOYBUTTONDOWN, backend.JOYBUTTONUP)
+    
+    def _init_pygame(self):
+        """Import pygame and initialize only the modules joystick events need.
         
-        # Initialize pygame joystick module
-        pygame.init()
+        The display module provides the event queue; it has to be started
+        on the thread that will pump events.
+        """
+        if self.pygame is None:
+            self._use_backend(load_pygame())
+        pygame = self.pygame
+        pygame.display.init()
         pygame.joystick.init()
+        startup.mark("controllers_ready")
+        self._ready.set()
     
-    def start(self):
-        """Start controller input thread."""
+    def start(self, wait=True):
+        """Start controller input.
+        
+        With wait False the input thread imports pygame and opens the
+        controllers in the background; controllers show up through
+        on_controllers_changed as they are found.
+        """
         self.running = True
-        self.thread = Thread(target=self._input_loop, daemon=True)
-        self.thread.start()
+        if self.event_thread == "main":
+            self._init_pygame()
+        else:
+            self.thread = Thread(target=self._input_loop, daemon=True)
+            self.thread.start()
+            if wait:
+                self._ready.wait(timeout=2.0)
     
     def stop(self):
         """Stop controller input thread."""
@@ -43,103 +172,309 @@ class ControllerManager:
             self.thread.join(timeout=1.0)
     
     def _input_loop(self):
-        """Background thread to read controller input."""
+        """Background thread that owns the pygame event queue."""
+        self._init_pygame()
+        pygame = self.pygame
+        
         while self.running:
             try:
-                # Check for controller connection/disconnection
-                # Note: pygame.event.pump() is not called here to avoid threading issues on macOS
-                # where event handling must happen on the main thread
-                
-                controller_count = pygame.joystick.get_count()
-                
-                if controller_count > 0 and self.selected_controller_index < controller_count:
-                    if self.joystick is None:
-                        # Controller connected
-                        self.joystick = pygame.joystick.Joystick(self.selected_controller_index)
-                        self.joystick.init()
-                        self.controller_name = self.joystick.get_name()
-                        print(f"Controller connected: {self.controller_name}")
-                        
-                        if self.on_controller_changed:
-                            self.on_controller_changed(True, self.controller_name)
-                    
-                    # Read controller state
-                    num_axes = self.joystick.get_numaxes()
-                    num_buttons = self.joystick.get_numbuttons()
-                    
-                    # Read axes
-                    self.axes = []
-                    for i in range(num_axes):
-                        value = self.joystick.get_axis(i)
-                        # Apply deadzone
-                        if abs(value) < self.deadzone:
-                            value = 0.0
-                        self.axes.append(value)
-                    
-                    # Read buttons
-                    self.buttons = []
-                    for i in range(num_buttons):
-                        self.buttons.append(self.joystick.get_button(i))
-                
+                # Sleep until an event arrives or a coalesced frame is due
+                if self._dirty:
+                    wait = self.min_interval - (time.monotonic() - self._last_publish)
                 else:
-                    if self.joystick is not None:
-                        # Controller disconnected
-                        self.joystick.quit()
-                        self.joystick = None
-                        self.controller_name = "No Controller"
-                        self.axes = []
-                        self.buttons = []
-                        print("Controller disconnected")
-                        
-                        if self.on_controller_changed:
-                            self.on_controller_changed(False, self.controller_name)
+                    wait = 0.1
                 
-                time.sleep(0.02)  # 50Hz update rate
+                event = pygame.event.wait(max(1, int(wait * 1000)))
+                if event.type != pygame.NOEVENT:
+                    self._handle_event(event)
+                    for event in pygame.event.get():
+                        self._handle_event(event)
+                
+                self._apply_slot_moves()
+                self._flush()
                 
             except Exception as e:
                 print(f"Controller error: {e}")
                 time.sleep(0.1)
+        
+        for entry in self.registry.snapshot:
+            self._detach(entry)
+        self.registry.clear()
+    
+    def pump_events(self):
+        """Process pending events when the main thread owns the event queue.
+        
+        Call this periodically from the GUI thread on platforms where
+        event_thread is "main"; it does nothing otherwise.
+        """
+        if self.event_thread != "main" or not self._ready.is_set():
+            return
+        try:
+            for event in self.pygame.event.get():
+                self._handle_event(event)
+            self._apply_slot_moves()
+            self._flush()
+        except Exception as e:
+            print(f"Controller error: {e}")
+    
+    def _handle_event(self, event):
+        """Apply one pygame event."""
+        event_type = event.type
+        pygame = self.pygame
+        if event_type in self._input_events:
+            slot = self._instance_slots.get(event.instance_id)
+            if slot is not None:
+                if (event_type == pygame.JOYBUTTONDOWN and self.on_estop and
+                        (slot, event.button) == self.estop_button):
+                    # Straight to the robot, ahead of frame coalescing
+                    self.on_estop(time.monotonic())
+                self._mark_dirty()
+        elif event_type == pygame.JOYDEVICEADDED:
+            entry = self.registry.device_added(event.device_index)
+            if entry is not None and entry.instance_id not in self._instance_slots:
+                self._attach(entry)
+                self._controllers_changed()
+        elif event_type == pygame.JOYDEVICEREMOVED:
+            entry = self.registry.device_removed(event.instance_id)
+            if entry is not None:
+                self._detach(entry)
+                self._controllers_changed()
+    
+    def assign_slot(self, slot, new_slot):
+        """Move the controller in a slot to another slot for good.
+        
+        A controller already in new_slot swaps places with it. The new
+        slots are kept for the devices' GUIDs and reported through
+        on_slots_assigned, so they survive replugging and restarts.
+        Devices of the same model share a GUID; of two identical pads the
+        first one attached takes the assigned slot.
+        
+        Safe to call from any thread; the move is made by the event thread.
+        """
+        self._slot_moves.append((slot, new_slot))
+    
+    def _apply_slot_moves(self):
+        """Make the moves asked for by assign_slot (event thread)."""
+        while self._slot_moves:
+            slot, new_slot = self._slot_moves.popleft()
+            entry = self.registry.by_slot(slot)
+            if entry is None:
+                continue
+            moves = self.registry.move(entry.instance_id, new_slot)
+            if not moves:
+                continue
+            
+            # The moved device keeps its new slot; a swapped device of another
+            # kind keeps the slot it was given in exchange
+            assigned = self.registry.assigned_slots
+            (_, moved), *swapped = moves
+            assigned[moved.guid] = moved.slot
+            for _, new in swapped:
+                if new.guid != moved.guid:
+                    assigned[new.guid] = new.slot
+            
+            for old, _ in moves:
+                self._detach(old)
+            for _, new in moves:
+                self._attach(new)
+            self._controllers_changed()
+            if self.on_slots_assigned:
+                self.on_slots_assigned(dict(assigned))
+    
+    def _controllers_changed(self):
+        """Tell listeners the set of attached controllers changed."""
+        if self.on_controllers_changed:
+            self.on_controllers_changed()
+    
+    def _attach(self, entry):
+        """Start sampling a controller the registry just opened."""
+        slot = entry.slot
+        joystick = entry.joystick
+        self._joysticks[slot] = joystick
+        self._num_axes[slot] = min(joystick.get_numaxes(), MAX_AXES)
+        self._num_buttons[slot] = min(joystick.get_numbuttons(), MAX_BUTTONS)
+        self._instance_slots[entry.instance_id] = slot
+        self.shaper.set_profile(slot, find_profile(self.profiles, entry.guid, entry.name))
+        self._update_slots()
+        print(f"Controller connected in slot {slot}: {entry.name}")
+        
+        if self.on_controller_changed:
+            self.on_controller_changed(True, entry.name)
+    
+    def _detach(self, entry):
+        """Stop sampling a removed controller; its slot is published empty."""
+        slot = self._instance_slots.pop(entry.instance_id, None)
+        if slot is None:
+            return
+        self._joysticks[slot] = None
+        self._num_axes[slot] = 0
+        self._num_buttons[slot] = 0
+        self.shaper.reset_slot(slot)
+        self._update_slots()
+        print(f"Controller disconnected from slot {slot}: {entry.name}")
+        
+        if self.on_controller_changed:
+            self.on_controller_changed(False, entry.name)
+    
+    def _update_slots(self):
+        """Recompute the slot count and display name after a change."""
+        slots = sorted(self._instance_slots.values())
+        self._slot_count = slots[-1] + 1 if slots else 0
+        names = [entry.name for entry in self.registry.snapshot]
+        self.controller_name = ", ".join(names) if names else "No Controller"
+        self._mark_dirty()
+    
+    def _mark_dirty(self):
+        """Note that input changed, remembering when the change arrived."""
+        if not self._dirty:
+            self._capture_time = time.monotonic()
+            self._dirty = True
+    
+    def _flush(self):
+        """Publish a frame if input changed and the rate limit allows it."""
+        if not self._dirty:
+            return
+        now = time.monotonic()
+        if now - self._last_publish < self.min_interval:
+            return
+        
+        self._dirty = False
+        self._last_publish = now
+        blocks_before = sys.getallocatedblocks()
+        self._sample()
+        self._count_allocations(blocks_before)
+        
+        if self.on_input_changed:
+            self.on_input_changed(self.get_frame())
+    
+    def _sample(self):
+        """Fill the back buffer from every attached controller and publish it.
+        
+        Runs on the thread that owns the event queue and only writes into
+        preallocated arrays, so each extra controller costs only its own
+        get_axis/get_button calls. Raw axes are shaped in one batch at the end.
+        """
+        buffer = (self._sequence[0] + 1) & 1
+        axes = self._axes[buffer]
+        buttons = self._buttons[buffer]
+        axis_counts = self._axis_counts[buffer]
+        button_counts = self._button_counts[buffer]
+        slot_count = self._slot_count
+        
+        self._timestamps[buffer] = time.monotonic()
+        for slot in range(slot_count):
+            joystick = self._joysticks[slot]
+            if joystick is None:
+                axis_counts[slot] = 0
+                button_counts[slot] = 0
+                continue
+            
+            num_axes = self._num_axes[slot]
+            num_buttons = self._num_buttons[slot]
+            base = slot * MAX_AXES
+            for i in range(num_axes):
+                axes[base + i] = joystick.get_axis(i)
+            base = slot * MAX_BUTTONS
+            for i in range(num_buttons):
+                buttons[base + i] = joystick.get_button(i)
+            
+            axis_counts[slot] = num_axes
+            button_counts[slot] = num_buttons
+        
+        self.shaper.apply(self._axis_views[buffer])
+        self._captured[buffer] = self._capture_time
+        self._shaped[buffer] = time.monotonic()
+        self._slot_counts[buffer] = slot_count
+        self._sequence[0] += 1  # Publish
     
-    def get_axes(self):
-        """Get current axis values."""
-        return self.axes
+    def _count_allocations(self, blocks_before):
+        """Record the net memory blocks allocated by one sampling tick."""
+        delta = sys.getallocatedblocks() - blocks_before
+        self.ticks += 1
+        self.alloc_blocks_last_tick = delta
+        if self.ticks > 50 and delta > self.alloc_blocks_max:
+            # Ignore warm-up ticks (first use of each code path)
+            self.alloc_blocks_max = delta
+    
+    def get_frame(self):
+        """Get the latest frame as a consistent ControllerFrame.
+        
+        Lock-free: if the input thread published twice while copying (and
+        could be overwriting this buffer), the copy is retried.
+        """
+        while True:
+            sequence = self._sequence[0]
+            buffer = sequence & 1
+            timestamp = self._timestamps[buffer]
+            captured = self._captured[buffer]
+            shaped = self._shaped[buffer]
+            all_axes = self._axes[buffer]
+            all_buttons = self._buttons[buffer]
+            axis_counts = self._axis_counts[buffer]
+            button_counts = self._button_counts[buffer]
+            slots = range(self._slot_counts[buffer])
+            axes = [all_axes[s * MAX_AXES:s * MAX_AXES + axis_counts[s]].tolist() for s in slots]
+            buttons = [all_buttons[s * MAX_BUTTONS:s * MAX_BUTTONS + button_counts[s]].tolist()
+                       for s in slots]
+            if self._sequence[0] == sequence:
+                return ControllerFrame(sequence, timestamp, axes, buttons, captured, shaped)
     
-    def get_buttons(self):
-        """Get current button states."""
-        return self.buttons
+    def get_axes(self, slot=0):
+        """Get current axis values of one slot."""
+        axes = self.get_frame().axes
+        return axes[slot] if slot < len(axes) else []
+    
+    def get_buttons(self, slot=0):
+        """Get current button states of one slot."""
+        buttons = self.get_frame().buttons
+        return buttons[slot] if slot < len(buttons) else []
+    
+    def get_sampler_stats(self):
+        """Get sampling loop statistics."""
+        return {
+            "ticks": self.ticks,
+            "sequence": self._sequence[0],
+            "alloc_blocks_last_tick": self.alloc_blocks_last_tick,
+            "alloc_blocks_max": self.alloc_blocks_max,
+        }
     
     def is_connected(self):
-        """Check if a controller is connected."""
-        return self.joystick is not None
+        """Check if any controller is connected."""
+        return bool(self.registry.snapshot)
     
     def get_controller_name(self):
-        """Get the name of the connected controller."""
+        """Get the names of the connected controllers."""
         return self.controller_name
     
-    def set_deadzone(self, deadzone):
-        """Set joystick deadzone."""
-        self.deadzone = deadzone
+    def set_deadzone(self, deadzone, slot=None):
+        """Set the joystick deadzone of one slot, or of all slots."""
+        if slot is None:
+            self.deadzone = deadzone
+            for i in range(MAX_SLOTS):
+                self.shaper.set_deadzone(i, deadzone)
+        else:
+            self.shaper.set_deadzone(slot, deadzone)
     
     def get_available_controllers(self):
-        """Get list of available USB controllers."""
-        # Note: pygame.event.pump() is not called here to avoid threading issues on macOS
-        controllers = []
-        count = pygame.joystick.get_count()
-        for i in range(count):
-            try:
-                js = pygame.joystick.Joystick(i)
-                js.init()
-                controllers.append((i, js.get_name()))
-            except Exception as e:
-                print(f"Error reading controller {i}: {e}")
-        return controllers
-    
-    def select_controller(self, index):
-        """Select a specific controller by index."""
-        if self.joystick is not None:
-            self.joystick.quit()
-            self.joystick = None
-        self.selected_controller_index = index
-        self.controller_name = "No Controller"
-        self.axes = []
-        self.buttons = []
+        """Get (slot, name) for each attached controller.
+        
+        Reads the registry snapshot, so it never touches pygame.
+        """
+        return [(entry.slot, entry.name) for entry in self.registry.snapshot]
+
+
+def create_controller(config):
+    """Create a controller manager from the config."""
+    controller = ControllerManager(
+        deadzone=config.get('controller_deadzone', 0.1),
+        slot_deadzones=config.get('controller_deadzones', []),
+        profiles=config.get('controller_profiles', {}),
+        max_rate=config.get('controller_max_rate', 100.0),
+        event_thread=config.get('controller_event_thread'),
+        estop_button=config.get('controller_estop_button'),
+        slot_assignments=config.get('controller_slots', {}),
+    )
+    
+    # Keep slots chosen in the window for the next run
+    controller.on_slots_assigned = lambda assignments: config.set('controller_slots', assignments)
+    return controller
@@ -0,0 +1,143 @@
+"""
+Registry of attached controllers.
+Keeps opened pygame joysticks keyed by instance ID and gives each one a
+slot number that stays the same when the device is unplugged and plugged
+back in. Slots chosen by the user are kept per device GUID (the
+controller_slots setting), so the driver and operator pads land in the
+same slots on every run.
+"""
+
+from collections import namedtuple
+
+
+# One attached controller
+RegisteredController = namedtuple("RegisteredController",
+                                  ["slot", "instance_id", "guid", "name", "joystick"])
+
+
+class ControllerRegistry:
+    """Opened controllers, updated only from device added/removed events.
+    
+    Must be changed on the thread that owns the pygame event queue. Other
+    threads read the immutable snapshot, so listing controllers costs
+    nothing and never touches pygame.
+    """
+    
+    def __init__(self, max_slots=6, assigned_slots=None):
+        self.max_slots = max_slots
+        self.assigned_slots = dict(assigned_slots or {})  # guid -> slot chosen by the user
+        self.pygame = None  # Joystick backend, set by the controller manager
+        self.version = 0
+        self.snapshot = ()  # RegisteredController tuples sorted by slot
+        
+        self._by_instance = {}
+        self._remembered_slots = {}  # guid -> slots used by devices with that guid
+    
+    def device_added(self, device_index):
+        """Open a newly attached device. Returns its entry, or None."""
+        joystick = self.pygame.joystick.Joystick(device_index)
+        joystick.init()
+        instance_id = joystick.get_instance_id()
+        if instance_id in self._by_instance:
+            return self._by_instance[instance_id]
+        
+        guid = joystick.get_guid()
+        slot = self._assign_slot(guid)
+        if slot is None:
+            print(f"No free controller slot for {joystick.get_name()}")
+            joystick.quit()
+            return None
+        
+        entry = RegisteredController(slot, instance_id, guid, joystick.get_name(), joystick)
+        self._by_instance[instance_id] = entry
+        self._changed()
+        return entry
+    
+    def device_removed(self, instance_id):
+        """Forget a detached device. Returns its entry, or None."""
+        entry = self._by_instance.pop(instance_id, None)
+        if entry is None:
+            return None
+        try:
+            entry.joystick.quit()
+        except self.pygame.error:
+            pass
+        self._changed()
+        return entry
+    
+    def _assign_slot(self, guid):
+        """Pick the slot assigned to this kind of device, else the one it had
+        before, else the lowest free one not reserved for another device."""
+        used = {entry.slot for entry in self._by_instance.values()}
+        remembered = self._remembered_slots.setdefault(guid, [])
+        assigned = self.assigned_slots.get(guid)
+        if assigned is not None and 0 <= assigned < self.max_slots and assigned not in used:
+            if assigned not in remembered:
+                remembered.append(assigned)
+            return assigned
+        for slot in remembered:
+            if slot not in used:
+                return slot
+        
+        for slot in range(self.max_slots):
+            taken_by_other = (
+                any(slot in slots for other, slots in self._remembered_slots.items() if other != guid) or
+                any(slot == assigned for other, assigned in self.assigned_slots.items() if other != guid))
+            if slot not in used and not taken_by_other:
+                remembered.append(slot)
+                return slot
+        
+        # Every slot is reserved for some device; reuse any free one
+        for slot in range(self.max_slots):
+            if slot not in used:
+                remembered.append(slot)
+                return slot
+        return None
+    
+    def move(self, instance_id, slot):
+        """Move a device to another slot, swapping with the device there.
+        
+        The slots are remembered for the devices' GUIDs (assigned_slots is
+        updated by the caller). Returns (old entry, new entry) pairs for
+        the devices that moved.
+        """
+        entry = self._by_instance.get(instance_id)
+        if entry is None or entry.slot == slot or not 0 <= slot < self.max_slots:
+            return []
+        moves = [(entry, entry._replace(slot=slot))]
+        other = self.by_slot(slot)
+        if other is not None:
+            moves.append((other, other._replace(slot=entry.slot)))
+        
+        for old, new in moves:
+            self._by_instance[old.instance_id] = new
+            remembered = self._remembered_slots.setdefault(old.guid, [])
+            if old.slot in remembered:
+                remembered.remove(old.slot)
+        for old, new in moves:
+            remembered = self._remembered_slots[new.guid]
+            if new.slot not in remembered:
+                remembered.append(new.slot)
+        self._changed()
+        return moves
+    
+    def _changed(self):
+        """Rebuild the snapshot after a change."""
+        self.snapshot = tuple(sorted(self._by_instance.values(), key=lambda entry: entry.slot))
+        self.version += 1
+    
+    def by_slot(self, slot):
+        """Get the controller in a slot, or None."""
+        for entry in self.snapshot:
+            if entry.slot == slot:
+                return entry
+        return None
+    
+    def by_instance(self, instance_id):
+        """Get the controller with a pygame instance ID, or None."""
+        return self._by_instance.get(instance_id)
+    
+    def clear(self):
+        """Release every device (slot memory is kept)."""
+        for instance_id in list(self._by_instance):
+            self.device_removed(instance_id)
@@ -0,0 +1,232 @@
+"""
+Controller input shaping.
+Turns raw axis values into driver-friendly ones with one NumPy pass over
+every controller slot: calibration, inversion, trigger remapping, radial
+deadzones on stick pairs, scaled deadzones on single axes and response
+curves.
+"""
+
+import numpy as np
+
+
+CURVES = ("linear", "expo", "cubic")
+
+# Used for anything a controller's profile does not set
+DEFAULT_PROFILE = {
+    "sticks": [[0, 1]],  # Axis pairs that get a radial deadzone
+    "triggers": [],  # Axes remapped from -1..1 to 0..1
+    "invert": [],  # Axes whose sign is flipped
+    "curve": "linear",  # "linear", "expo" or "cubic"
+    "expo": 0.3,  # Blend towards cubic for the "expo" curve
+    "deadzone": None,  # None uses the slot deadzone
+    "center": [],  # Calibration: resting value per axis
+    "min": [],  # Calibration: lowest value per axis
+    "max": [],  # Calibration: highest value per axis
+}
+
+
+def find_profile(profiles, guid, name):
+    """Pick the profile for a device: by GUID, then by name, then "default"."""
+    profile = dict(DEFAULT_PROFILE)
+    for key in (guid, name, "default"):
+        if key in profiles:
+            profile.update(profiles[key])
+            break
+    return profile
+
+
+def save_profile(config, key, profile):
+    """Store a profile in the config, keyed by device GUID or name."""
+    profiles = dict(config.get("controller_profiles") or {})
+    profiles[key] = profile
+    config.set("controller_profiles", profiles)
+
+
+def _per_axis(values, count, default):
+    """Expand a per-axis list from a profile to a full row."""
+    row = [default] * count
+    for i, value in enumerate((values or [])[:count]):
+        if value is not None:
+            row[i] = value
+    return row
+
+
+class InputShaper:
+    """Per-slot shaping parameters and the batch that applies them.
+    
+    Parameters are (slots, axes) arrays, so a frame is shaped with the same
+    fixed number of NumPy operations however many controllers are attached.
+    apply() works in place and only writes into preallocated arrays.
+    """
+    
+    def __init__(self, slots, axes, deadzones):
+        shape = (slots, axes)
+        self.slots = slots
+        self.axes = axes
+        self.slot_deadzones = list(deadzones)
+        self.profiles = [None] * slots
+        
+        self.deadzone = np.zeros(shape)
+        self.live_range = np.ones(shape)  # 1 - deadzone
+        self.center = np.zeros(shape)
+        self.pos_scale = np.ones(shape)
+        self.neg_scale = np.ones(shape)
+        self.sign = np.ones(shape)
+        self.expo = np.zeros(shape)  # 0 = linear, 1 = cubic
+        self.trigger = np.zeros(shape, dtype=bool)
+        self.single = np.ones(shape, dtype=bool)  # Not part of a stick pair
+        
+        # Scratch space for apply()
+        self._a = np.zeros(shape)
+        self._b = np.zeros(shape)
+        self._mask = np.zeros(shape, dtype=bool)
+        
+        # Stick pairs of every slot, as flat indices into a frame
+        self._pairs = [[] for _ in range(slots)]
+        self._build_pairs()
+        
+        for slot in range(slots):
+            self.reset_slot(slot)
+    
+    def set_profile(self, slot, profile):
+        """Load a profile (see DEFAULT_PROFILE) into a slot."""
+        count = self.axes
+        self.profiles[slot] = profile
+        
+        deadzone = profile.get("deadzone")
+        if deadzone is None:
+            deadzone = self.slot_deadzones[slot]
+        deadzone = min(max(0.0, deadzone), 0.99)
+        self.deadzone[slot] = deadzone
+        self.live_range[slot] = 1.0 - deadzone
+        
+        center = np.array(_per_axis(profile.get("center"), count, 0.0))
+        low = np.array(_per_axis(profile.get("min"), count, -1.0))
+        high = np.array(_per_axis(profile.get("max"), count, 1.0))
+        self.center[slot] = center
+        self.pos_scale[slot] = 1.0 / np.maximum(high - center, 1e-6)
+        self.neg_scale[slot] = 1.0 / np.maximum(center - low, 1e-6)
+        
+        self.sign[slot] = 1.0
+        for axis in profile.get("invert") or []:
+            if 0 <= axis < count:
+                self.sign[slot, axis] = -1.0
+        
+        self.trigger[slot] = False
+        for axis in profile.get("triggers") or []:
+            if 0 <= axis < count:
+                self.trigger[slot, axis] = True
+        
+        curve = profile.get("curve", "linear")
+        if curve not in CURVES:
+            print(f"Unknown response curve '{curve}', using linear")
+            curve = "linear"
+        self.expo[slot] = {"linear": 0.0, "cubic": 1.0}.get(curve, profile.get("expo", 0.3))
+        
+        self.single[slot] = True
+        pairs = []
+        for pair in profile.get("sticks") or []:
+            x, y = pair
+            if 0 <= x < count and 0 <= y < count and x != y:
+                self.single[slot, x] = False
+                self.single[slot, y] = False
+                pairs.append((x, y))
+        self._pairs[slot] = pairs
+        self._build_pairs()
+    
+    def reset_slot(self, slot):
+        """Make a slot pass values through unchanged (empty slots)."""
+        self.set_profile(slot, {"sticks": [], "deadzone": 0.0})
+        self.profiles[slot] = None
+    
+    def set_deadzone(self, slot, deadzone):
+        """Change the deadzone a slot uses when its profile has none."""
+        self.slot_deadzones[slot] = deadzone
+        if self.profiles[slot] is not None:
+            self.set_profile(slot, self.profiles[slot])
+    
+    def _build_pairs(self):
+        """Gather every slot's stick pairs into flat index arrays."""
+        xs, ys, deadzones, expos = [], [], [], []
+        for slot, pairs in enumerate(self._pairs):
+            for x, y in pairs:
+                xs.append(slot * self.axes + x)
+                ys.append(slot * self.axes + y)
+                deadzones.append(self.deadzone[slot, x])
+                expos.append(self.expo[slot, x])
+        
+        # Swapped in as one tuple so apply() never sees a half-built set
+        count = len(xs)
+        deadzones = np.array(deadzones)
+        self._sticks = (np.array(xs, dtype=np.intp), np.array(ys, dtype=np.intp),
+                        deadzones, 1.0 - deadzones, np.array(expos),
+                        np.zeros(count), np.zeros(count), np.zeros(count),
+                        np.zeros(count), np.zeros(count), np.zeros(count),
+                        np.zeros(count, dtype=bool))
+    
+    def apply(self, values):
+        """Shape a (slots, axes) float64 frame in place."""
+        a = self._a
+        b = self._b
+        mask = self._mask
+        
+        # Calibration: offset from center, scaled separately on each side
+        np.subtract(values, self.center, out=values)
+        np.multiply(values, self.neg_scale, out=a)
+        np.multiply(values, self.pos_scale, out=values)
+        np.less(a, 0.0, out=mask)
+        np.copyto(values, a, where=mask)
+        np.clip(values, -1.0, 1.0, out=values)
+        
+        # Inversion
+        np.multiply(values, self.sign, out=values)
+        
+        # Triggers rest at -1; remap them to 0..1
+        np.add(values, 1.0, out=a)
+        np.multiply(a, 0.5, out=a)
+        np.copyto(values, a, where=self.trigger)
+        
+        # Single axes: scaled deadzone, then the response curve
+        np.abs(values, out=a)
+        np.subtract(a, self.deadzone, out=a)
+        np.maximum(a, 0.0, out=a)
+        np.divide(a, self.live_range, out=a)
+        self._curve(a, b, self.expo)
+        np.copysign(a, values, out=a)
+        np.copyto(values, a, where=self.single)
+        
+        sticks = self._sticks
+        if len(sticks[0]):
+            self._apply_sticks(values.reshape(-1), sticks)
+    
+    def _apply_sticks(self, flat, sticks):
+        """Radial scaled deadzone and curve on the magnitude of each stick."""
+        px, py, deadzone, live_range, expo, x, y, magnitude, scaled, cubed, factor, nonzero = sticks
+        
+        np.take(flat, px, out=x)
+        np.take(flat, py, out=y)
+        np.hypot(x, y, out=magnitude)
+        
+        np.subtract(magnitude, deadzone, out=scaled)
+        np.maximum(scaled, 0.0, out=scaled)
+        np.divide(scaled, live_range, out=scaled)
+        np.minimum(scaled, 1.0, out=scaled)
+        self._curve(scaled, cubed, expo)
+        
+        # Rescale each stick along its own direction
+        np.greater(magnitude, 0.0, out=nonzero)
+        factor.fill(0.0)
+        np.divide(scaled, magnitude, out=factor, where=nonzero)
+        np.multiply(x, factor, out=x)
+        np.multiply(y, factor, out=y)
+        np.put(flat, px, x)
+        np.put(flat, py, y)
+    
+    @staticmethod
+    def _curve(values, scratch, expo):
+        """values = (1 - expo) * values + expo * values^3, in place."""
+        np.multiply(values, values, out=scratch)
+        np.multiply(scratch, values, out=scratch)
+        np.subtract(scratch, values, out=scratch)
+        np.multiply(scratch, expo, out=scratch)
+        np.add(values, scratch, out=values)
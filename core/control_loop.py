@@ -0,0 +1,158 @@
+"""
+Real-time control loop.
+Reads the latest controller frame and sends it to the robot on its own
+thread, at a fixed rate scheduled against absolute monotonic deadlines.
+"""
+
+import time
+from threading import Thread, Lock
+
+
+MAX_RATE = 200.0
+
+# Histogram bucket upper edges in milliseconds (the last bucket is open)
+HISTOGRAM_EDGES_MS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0)
+
+
+def _bucket_labels():
+    """Readable label for each histogram bucket."""
+    labels = [f"<{edge:g}ms" for edge in HISTOGRAM_EDGES_MS]
+    labels.append(f">={HISTOGRAM_EDGES_MS[-1]:g}ms")
+    return labels
+
+
+class LoopStats:
+    """Tick jitter and overrun histograms for a ControlLoop.
+    
+    Jitter is how late a tick woke up after its deadline. An overrun is a
+    tick that finished after the next deadline; its histogram records by
+    how much.
+    """
+    
+    def __init__(self):
+        self._lock = Lock()
+        self.labels = _bucket_labels()
+        self.reset()
+    
+    def reset(self):
+        """Clear all counters."""
+        with self._lock:
+            self.ticks = 0
+            self.overruns = 0
+            self.skipped_ticks = 0
+            self.jitter_max = 0.0
+            self.jitter_total = 0.0
+            self.tick_time_max = 0.0
+            self.jitter_histogram = [0] * len(self.labels)
+            self.overrun_histogram = [0] * len(self.labels)
+    
+    @staticmethod
+    def _bucket(seconds):
+        """Histogram bucket for a duration."""
+        ms = seconds * 1000.0
+        for i, edge in enumerate(HISTOGRAM_EDGES_MS):
+            if ms < edge:
+                return i
+        return len(HISTOGRAM_EDGES_MS)
+    
+    def add(self, jitter, tick_time, overrun, skipped):
+        """Account for one tick."""
+        with self._lock:
+            self.ticks += 1
+            self.jitter_total += jitter
+            self.jitter_max = max(self.jitter_max, jitter)
+            self.tick_time_max = max(self.tick_time_max, tick_time)
+            self.jitter_histogram[self._bucket(jitter)] += 1
+            if overrun > 0:
+                self.overruns += 1
+                self.skipped_ticks += skipped
+                self.overrun_histogram[self._bucket(overrun)] += 1
+    
+    def snapshot(self):
+        """Get the counters and histograms as a dictionary."""
+        with self._lock:
+            return {
+                "ticks": self.ticks,
+                "overruns": self.overruns,
+                "skipped_ticks": self.skipped_ticks,
+                "jitter_mean_ms": 1000.0 * self.jitter_total / self.ticks if self.ticks else 0.0,
+                "jitter_max_ms": 1000.0 * self.jitter_max,
+                "tick_time_max_ms": 1000.0 * self.tick_time_max,
+                "labels": list(self.labels),
+                "jitter_histogram": list(self.jitter_histogram),
+                "overrun_histogram": list(self.overrun_histogram),
+            }
+
+
+class ControlLoop:
+    """Sends controller frames to the robot at a fixed rate.
+    
+    Each deadline is the previous one plus the period, so a late tick does
+    not push the following ones back. If a tick runs past several
+    deadlines, the missed ones are skipped rather than run back to back.
+    """
+    
+    def __init__(self, robot_connection, controller_manager, rate=50.0):
+        self.robot = robot_connection
+        self.controller = controller_manager
+        self.rate = min(max(1.0, rate), MAX_RATE)
+        self.period = 1.0 / self.rate
+        self.stats = LoopStats()
+        self.running = False
+        self.thread = None
+    
+    def start(self):
+        """Start the loop thread."""
+        if self.running:
+            return
+        self.running = True
+        self.thread = Thread(target=self._run, name="control-loop", daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """Stop the loop thread."""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+    
+    def _run(self):
+        """Loop body: sleep until the deadline, tick, schedule the next one."""
+        period = self.period
+        deadline = time.monotonic() + period
+        
+        while self.running:
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            
+            woke = time.monotonic()
+            jitter = max(0.0, woke - deadline)
+            try:
+                self._tick()
+            except Exception as e:
+                print(f"Control loop error: {e}")
+            finished = time.monotonic()
+            
+            deadline += period
+            overrun = finished - deadline
+            skipped = 0
+            if overrun > 0:
+                # Resynchronize on the period grid instead of catching up
+                skipped = int(overrun / period) + 1
+                deadline += skipped * period
+            self.stats.add(jitter, finished - woke, overrun, skipped)
+    
+    def _tick(self):
+        """Read the latest frame and send it."""
+        robot = self.robot
+        if not (robot.connected and robot.enabled and self.controller.is_connected()):
+            return
+        frame = self.controller.get_frame()
+        robot.send_joystick_data(frame.axes, frame.buttons, frame.captured, frame.shaped)
+    
+    def get_stats(self):
+        """Get rate, jitter and overrun statistics."""
+        stats = self.stats.snapshot()
+        stats["rate"] = self.rate
+        return stats
@@ -0,0 +1,497 @@
+"""
+Control worker process.
+Runs controller sampling, the control loop and the robot connection in a
+process of their own, so a stalled GUI (a heavy repaint, a garbage
+collection, a modal dialog) cannot delay joystick frames. The GUI reads
+frames and telemetry from a SharedState block and sends connect, enable
+and mode commands over a pipe; rare events (state changes, statistics)
+come back over the same pipe.
+"""
+
+import gc
+import multiprocessing
+import time
+from threading import Thread, Lock
+from controllers.controller_manager import ControllerFrame
+from core.shared_state import SharedState, MAX_TELEMETRY
+from network.connection_state import ConnectionState
+from network.robot_connection import RobotConnection
+
+
+WRITE_RATE = 100.0  # Shared state snapshots/s written by the worker
+SYNC_RATE = 50.0  # Shared state reads/s in the GUI process
+STATS_INTERVAL = 1.0
+
+
+def run_worker(shm_name, conn):
+    """Worker process entry point: build the control core and serve commands."""
+    from utils.config import Config
+    from controllers.controller_manager import create_controller
+    from core.control_loop import ControlLoop
+    from network.robot_connection import create_robot
+    
+    config = Config()
+    shared = SharedState(shm_name)  # Created (and removed) by the GUI process
+    
+    send_lock = Lock()
+    
+    def send(*message):
+        with send_lock:
+            try:
+                conn.send(message)
+            except (OSError, EOFError):
+                pass
+    
+    robot = create_robot(config)
+    controller = create_controller(config)
+    controller.start()
+    control_loop = ControlLoop(robot, controller, rate=config.get('control_loop_rate', 50.0))
+    control_loop.start()
+    
+    def on_input_changed(frame):
+        robot.send_joystick_data(frame.axes, frame.buttons, frame.captured, frame.shaped)
+    
+    controller.on_input_changed = on_input_changed
+    robot.on_state_changed = lambda state: send("state", state, robot.backoff_delay,
+                                                robot.last_reconnect_time, robot.get_robot_address())
+    # Stop times travel with the state change they caused
+    robot.on_robot_state_changed = lambda enabled, mode: send("robot_state", enabled, mode, robot.estopped,
+                                                              robot.get_stop_stats())
+    controller.on_estop = robot.stop_now
+    robot.on_heartbeat_stale = lambda age: send("heartbeat_stale", age)
+    # The GUI process owns the config file; it saves the address cache
+    robot.discovery.on_cache_changed = lambda cache: send("config", "robot_address_cache", cache)
+    controller.on_controllers_changed = lambda: send("controllers", controller.get_available_controllers(),
+                                                     controller.get_controller_name())
+    controller.on_slots_assigned = lambda assignments: send("config", "controller_slots", assignments)
+    
+    recorder = None
+    if config.get('record_sessions'):
+        from recording.recorder import create_recorder
+        try:
+            recorder = create_recorder(config)
+            recorder.start()
+            robot.recorder = recorder
+            robot.rate_controller.recorder = recorder
+            recorder.record_state(robot.enabled, robot.mode)
+        except Exception as e:
+            print(f"Session recording disabled: {e}")
+            recorder = None
+    
+    running = [True]
+    
+    def write_loop():
+        """Publish a snapshot of frames and telemetry every period."""
+        period = 1.0 / WRITE_RATE
+        keys = robot.telemetry_keys[:MAX_TELEMETRY]
+        while running[0]:
+            frame = controller.get_frame()
+            heartbeat = robot.heartbeat
+            age = heartbeat.get_age()
+            telemetry = []
+            for key in keys:
+                timestamp = robot.telemetry.get_timestamp(key)
+                telemetry.append(None if timestamp is None else (robot.telemetry.get(key), timestamp))
+            shared.write(robot.state, robot.is_connected(), robot.enabled, robot.mode, heartbeat.stale,
+                         controller.is_connected(), control_loop.stats.snapshot(),
+                         None if heartbeat.last_rtt is None else 1000.0 * heartbeat.last_rtt,
+                         None if age is None else 1000.0 * age,
+                         frame.axes, frame.buttons, telemetry)
+            time.sleep(period)
+    
+    writer = Thread(target=write_loop, name="shared-state-writer", daemon=True)
+    writer.start()
+    
+    # Everything built so far lives until exit; keep the collector off it
+    gc.collect()
+    gc.freeze()
+    
+    send("controllers", controller.get_available_controllers(), controller.get_controller_name())
+    next_stats = time.monotonic()
+    try:
+        while True:
+            timeout = 0.005 if controller.event_thread == "main" else 0.1
+            if conn.poll(timeout):
+                command, *args = conn.recv()
+                if command == "quit":
+                    break
+                handle_command(robot, controller, control_loop, command, args, send)
+            if controller.event_thread == "main":
+                controller.pump_events()
+            
+            now = time.monotonic()
+            if now >= next_stats:
+                next_stats = now + STATS_INTERVAL
+                send("stats", {
+                    "publish": robot.get_publish_stats(),
+                    "rate": robot.get_rate_stats(),
+                    "heartbeat": robot.get_heartbeat_stats(),
+                    "latency": robot.get_latency_stats(),
+                    "transport": robot.get_transport_stats(),
+                    "reconnect": robot.get_reconnect_stats(),
+                    "stop": robot.get_stop_stats(),
+                    "loop": control_loop.get_stats(),
+                })
+    except (EOFError, OSError):
+        print("Control worker: GUI process gone, disabling robot")
+    finally:
+        running[0] = False
+        if robot.state != ConnectionState.IDLE:
+            robot.disconnect()  # Disables the robot first
+        control_loop.stop()
+        controller.stop()
+        if recorder:
+            robot.recorder = None
+            robot.rate_controller.recorder = None
+            recorder.close()
+        writer.join(timeout=1.0)
+        shared.close()
+
+
+def handle_command(robot, controller, control_loop, command, args, send):
+    """Apply one command from the GUI to the worker's control core."""
+    if command == "connect":
+        robot.team_number = args[0]
+        robot.connect()
+    elif command == "disconnect":
+        robot.disconnect()
+    elif command == "enable":
+        if not robot.set_enabled(args[0]) and args[0]:
+            send("enable_refused", robot.heartbeat.stale)
+    elif command == "stop":
+        robot.stop_now(*args)
+    elif command == "mode":
+        robot.set_mode(args[0])
+    elif command == "export_latency":
+        path, context = args
+        try:
+            robot.latency.export(path, context)
+        except Exception as e:
+            print(f"Error exporting latency: {e}")
+    elif command == "reset_loop_stats":
+        control_loop.stats.reset()
+    elif command == "assign_slot":
+        controller.assign_slot(*args)
+    else:
+        print(f"Control worker: unknown command {command}")
+
+
+class ControlWorker:
+    """GUI-side handle of the worker process.
+    
+    Owns the shared state block and the command pipe; messages from the
+    worker are passed to on_message from a reader thread.
+    """
+    
+    def __init__(self):
+        context = multiprocessing.get_context("spawn")
+        self.shared = SharedState(create=True)
+        self._conn, child_conn = context.Pipe()
+        self.process = context.Process(target=run_worker, args=(self.shared.name, child_conn),
+                                       name="control-worker", daemon=True)
+        self._child_conn = child_conn
+        self._send_lock = Lock()
+        self._reader = None
+        self.stats = {}  # Latest statistics from the worker
+        
+        # Callbacks
+        self.on_message = None  # Called with each (message, *args) tuple from the reader thread
+    
+    def start(self):
+        """Start the worker process."""
+        self.process.start()
+        self._child_conn.close()
+        self._reader = Thread(target=self._read, name="control-worker-reader", daemon=True)
+        self._reader.start()
+    
+    def stop(self):
+        """Ask the worker to disable the robot and exit; kill it if it does not."""
+        self.send("quit")
+        self.process.join(timeout=3.0)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=1.0)
+        self._conn.close()
+        self.shared.close()
+    
+    def send(self, *command):
+        """Send a command tuple to the worker."""
+        with self._send_lock:
+            try:
+                self._conn.send(command)
+            except (OSError, EOFError) as e:
+                print(f"Control worker not reachable: {e}")
+    
+    def read(self):
+        """Get the latest SharedSnapshot (None before the worker's first write)."""
+        return self.shared.read()
+    
+    def _read(self):
+        """Pass worker messages on until the pipe closes."""
+        while True:
+            try:
+                message = self._conn.recv()
+            except (EOFError, OSError):
+                message = ("exited",)
+            if message[0] == "stats":
+                self.stats = message[1]
+            if self.on_message:
+                self.on_message(message)
+            if message[0] == "exited":
+                break
+
+
+class WorkerLatency:
+    """Stands in for the LatencyTracker, which lives in the worker."""
+    
+    def __init__(self, worker):
+        self.worker = worker
+    
+    def export(self, path, context=None):
+        """Have the worker write its latency samples to a file."""
+        self.worker.send("export_latency", path, context)
+
+
+class WorkerRobotConnection(RobotConnection):
+    """RobotConnection stand-in for the GUI process, backed by the worker.
+    
+    Commands go to the worker; state arrives as events and telemetry is
+    read from the shared state block.
+    """
+    
+    def __init__(self, worker, team_number=2026, telemetry_keys=(), history_capacity=131072,
+                 robot_address=None, transport="networktables"):
+        super().__init__(team_number=team_number, telemetry_keys=telemetry_keys,
+                         history_capacity=history_capacity, robot_address=robot_address)
+        self.worker = worker
+        self.transport = transport
+        self.latency = WorkerLatency(worker)
+        self._counts = [0] * MAX_TELEMETRY
+        self._syncing = False
+        self._sync_thread = None
+    
+    def start_sync(self):
+        """Start reading telemetry from the shared state block."""
+        self._syncing = True
+        self._sync_thread = Thread(target=self._sync, name="shared-state-reader", daemon=True)
+        self._sync_thread.start()
+    
+    def stop_sync(self):
+        """Stop reading the shared state block."""
+        self._syncing = False
+        if self._sync_thread:
+            self._sync_thread.join(timeout=1.0)
+            self._sync_thread = None
+    
+    def _sync(self):
+        """Feed changed telemetry values into the local store."""
+        keys = self.telemetry_keys[:MAX_TELEMETRY]
+        while self._syncing:
+            snapshot = self.worker.read()
+            if snapshot is not None:
+                self.heartbeat.stale = snapshot.stale
+                for i, key in enumerate(keys):
+                    entry = snapshot.telemetry[i]
+                    if entry is not None and entry[0] != self._counts[i]:
+                        self._counts[i] = entry[0]
+                        self.telemetry.update(key, entry[1], entry[2])
+            time.sleep(1.0 / SYNC_RATE)
+    
+    def on_worker_message(self, message):
+        """Apply an event from the worker (reader thread)."""
+        kind, *args = message
+        if kind == "state":
+            state, self.backoff_delay, self.last_reconnect_time, self.address = args
+            self.connected = state == ConnectionState.CONNECTED
+            self._set_state(state)
+        elif kind == "robot_state":
+            self.enabled, self.mode, self.estopped, self.worker.stats["stop"] = args
+            if self.on_robot_state_changed:
+                self.on_robot_state_changed(self.enabled, self.mode)
+        elif kind == "enable_refused":
+            # Let the window put its enable button back
+            self.heartbeat.stale = args[0]
+            if self.on_robot_state_changed:
+                self.on_robot_state_changed(self.enabled, self.mode)
+        elif kind == "heartbeat_stale":
+            self.heartbeat.stale = True
+            if self.on_heartbeat_stale:
+                self.on_heartbeat_stale(args[0])
+        elif kind == "exited":
+            print("Control worker exited")
+            self.connected = False
+            self.enabled = False
+            self._set_state(ConnectionState.IDLE)
+    
+    def get_robot_address(self):
+        """Get the address the worker connected to."""
+        return self.robot_address or self.address or super().get_robot_address()
+    
+    def connect(self):
+        """Have the worker connect."""
+        if self.state != ConnectionState.IDLE:
+            return False
+        self.estopped = False
+        self.worker.send("connect", self.team_number)
+        return True
+    
+    def disconnect(self):
+        """Have the worker disconnect (it disables the robot first)."""
+        self.worker.send("disconnect")
+    
+    def is_connected(self):
+        """Connected as last reported by the worker."""
+        return self.connected
+    
+    def set_enabled(self, enabled):
+        """Ask the worker to enable or disable the robot."""
+        if enabled and (not self.connected or self.heartbeat.stale or self.estopped):
+            return False
+        self.worker.send("enable", enabled)
+        return True
+    
+    def stop_now(self, pressed=None, estop=True):
+        """Have the worker stop the robot; the time to flush is measured there."""
+        self.enabled = False
+        if estop:
+            self.estopped = True
+        self.worker.send("stop", pressed or time.monotonic(), estop)
+        return None
+    
+    def set_mode(self, mode):
+        """Ask the worker to change the mode."""
+        if mode not in ["teleop", "auto", "test"]:
+            return False
+        self.worker.send("mode", mode)
+        return True
+    
+    def send_joystick_data(self, axes, buttons, captured=None, shaped=None):
+        """Joystick frames are sent by the worker."""
+    
+    def _stats(self, key, local):
+        """Latest worker statistics of one kind, else the (idle) local ones."""
+        stats = self.worker.stats.get(key)
+        return local() if stats is None else stats
+    
+    def get_latency_stats(self):
+        """Get the worker's capture-to-flush latency percentiles."""
+        return self._stats("latency", super().get_latency_stats)
+    
+    def get_heartbeat_stats(self):
+        """Get the worker's heartbeat RTT and loss."""
+        return self._stats("heartbeat", super().get_heartbeat_stats)
+    
+    def get_rate_stats(self):
+        """Get the worker's rate control level and decisions."""
+        return self._stats("rate", super().get_rate_stats)
+    
+    def get_transport_stats(self):
+        """Get the worker's UDP link statistics."""
+        return self.worker.stats.get("transport")
+    
+    def get_publish_stats(self):
+        """Get the worker's joystick write counts."""
+        return self._stats("publish", super().get_publish_stats)
+    
+    def get_reconnect_stats(self):
+        """Get the worker's time-to-reconnect figures."""
+        return self._stats("reconnect", super().get_reconnect_stats)
+    
+    def get_stop_stats(self):
+        """Get the worker's stop request-to-flush times."""
+        return self._stats("stop", super().get_stop_stats)
+
+
+class WorkerControllerManager:
+    """ControllerManager stand-in showing the worker's controllers."""
+    
+    def __init__(self, worker):
+        self.worker = worker
+        self.event_thread = "input"  # pygame events are pumped in the worker
+        self.controller_name = "No Controller"
+        self.available = []
+        self.on_controller_changed = None
+        self.on_input_changed = None
+        self.on_controllers_changed = None
+    
+    def start(self):
+        """The worker samples the controllers."""
+    
+    def stop(self):
+        """The worker stops with the control core."""
+    
+    def pump_events(self):
+        """Events are handled in the worker."""
+    
+    def on_worker_message(self, message):
+        """Apply a controller list from the worker (reader thread)."""
+        if message[0] != "controllers":
+            return
+        self.available, self.controller_name = message[1:]
+        if self.on_controllers_changed:
+            self.on_controllers_changed()
+    
+    def get_frame(self):
+        """Get the latest frame from the shared state block."""
+        snapshot = self.worker.read()
+        if snapshot is None:
+            return ControllerFrame(0, 0.0, [], [])
+        return ControllerFrame(snapshot.ticks, snapshot.written, snapshot.axes, snapshot.buttons)
+    
+    def get_axes(self, slot=0):
+        """Get the axis values of one slot."""
+        axes = self.get_frame().axes
+        return axes[slot] if slot < len(axes) else []
+    
+    def get_buttons(self, slot=0):
+        """Get the button states of one slot."""
+        buttons = self.get_frame().buttons
+        return buttons[slot] if slot < len(buttons) else []
+    
+    def is_connected(self):
+        """Whether the worker has a controller."""
+        snapshot = self.worker.read()
+        return bool(snapshot and snapshot.controller)
+    
+    def get_controller_name(self):
+        """Get the names of the worker's controllers."""
+        return self.controller_name
+    
+    def set_deadzone(self, deadzone, slot=None):
+        """Deadzones are applied in the worker (from the config)."""
+    
+    def get_available_controllers(self):
+        """Get (slot, name) for each controller attached to the worker."""
+        return self.available
+    
+    def assign_slot(self, slot, new_slot):
+        """Move a controller to another slot in the worker."""
+        self.worker.send("assign_slot", slot, new_slot)
+
+
+class WorkerControlLoop:
+    """ControlLoop stand-in reporting the worker's loop timing."""
+    
+    def __init__(self, worker, robot, rate=50.0):
+        self.worker = worker
+        self.robot = robot
+        self.rate = rate
+    
+    def start(self):
+        """The loop runs in the worker."""
+    
+    def stop(self):
+        """The loop stops with the worker."""
+    
+    def get_stats(self):
+        """Get the worker's loop statistics, tick counts from shared memory."""
+        stats = dict(self.worker.stats.get("loop") or {
+            "rate": self.rate, "ticks": 0, "overruns": 0, "skipped_ticks": 0,
+            "jitter_mean_ms": 0.0, "jitter_max_ms": 0.0, "tick_time_max_ms": 0.0,
+            "labels": [], "jitter_histogram": [], "overrun_histogram": []})
+        snapshot = self.worker.read()
+        if snapshot is not None:
+            for key in ("ticks", "overruns", "skipped_ticks", "jitter_mean_ms", "jitter_max_ms",
+                        "tick_time_max_ms"):
+                stats[key] = getattr(snapshot, key)
+        return stats
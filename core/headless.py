@@ -0,0 +1,359 @@
+"""
+Headless driver station core.
+Runs the controller manager, control loop, robot connection, session
+recorder and diagnostics without Qt. An asyncio event loop takes commands
+from stdin and a local control socket (one per line), pumps controller
+events where they must be handled on the main thread and prints a status
+line every few seconds. Joystick frames are still sent by the control
+loop thread, at a fixed rate.
+"""
+
+import asyncio
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from threading import Thread
+from network.connection_state import ConnectionState
+
+
+COMMANDS = {
+    "status": "robot, controller and control loop summary",
+    "stats": "all statistics (latency, heartbeat, rate control, ...)",
+    "connect [TEAM]": "connect, optionally to another team number",
+    "disconnect": "disable and disconnect",
+    "enable": "enable the robot",
+    "disable": "disable the robot (fast path)",
+    "estop": "e-stop the robot until the next connect",
+    "mode teleop|auto|test": "set the robot mode",
+    "slot FROM TO": "move the controller in slot FROM to slot TO (kept for its device)",
+    "export-latency PATH": "save latency samples as JSON",
+    "quit": "disable, disconnect and exit",
+}
+
+
+def socket_address(config):
+    """Control socket path, or (host, port) where Unix sockets are not available."""
+    if hasattr(socket, "AF_UNIX"):
+        return os.path.expanduser(config.get('headless_socket'))
+    return ("127.0.0.1", config.get('headless_port'))
+
+
+async def send_command(address, line, timeout=5.0):
+    """Send one command to a running headless driver station; return its reply."""
+    if isinstance(address, tuple):
+        reader, writer = await asyncio.open_connection(*address)
+    else:
+        reader, writer = await asyncio.open_unix_connection(address)
+    try:
+        writer.write(line.encode() + b"\n")
+        await writer.drain()
+        reply = await asyncio.wait_for(reader.readline(), timeout)
+        return json.loads(reply)
+    finally:
+        writer.close()
+
+
+class HeadlessDriverStation:
+    """The driver station without a window.
+    
+    execute() runs one text command and returns a JSON-friendly dict; it
+    is used for stdin and socket commands alike.
+    """
+    
+    def __init__(self, config, status_interval=5.0, started=None):
+        self.config = config
+        self.status_interval = status_interval
+        self.started = started or time.monotonic()  # For the time-to-ready report
+        self.robot = None
+        self.controller = None
+        self.control_loop = None
+        self.recorder = None
+        self.loop = None
+        self._done = None
+    
+    def start(self):
+        """Create the robot connection, controllers, control loop and recorder."""
+        # Imported here so that --send does not load pygame and NetworkTables
+        from controllers.controller_manager import create_controller
+        from core.control_loop import ControlLoop
+        from network.robot_connection import create_robot
+        
+        config = self.config
+        self.robot = create_robot(config)
+        self.controller = create_controller(config)
+        self.controller.start()
+        self.control_loop = ControlLoop(self.robot, self.controller,
+                                        rate=config.get('control_loop_rate', 50.0))
+        self.control_loop.start()
+        
+        robot = self.robot
+        self.controller.on_input_changed = lambda frame: robot.send_joystick_data(
+            frame.axes, frame.buttons, frame.captured, frame.shaped)
+        self.controller.on_estop = robot.stop_now
+        self.controller.on_controller_changed = lambda connected, name: self._log(
+            f"✓ Controller connected: {name}" if connected else "✗ Controller disconnected")
+        robot.on_robot_state_changed = lambda enabled, mode: self._log(
+            f"Robot {'ENABLED' if enabled else 'DISABLED'} ({mode})" +
+            (", E-STOPPED" if robot.estopped else ""))
+        
+        if config.get('record_sessions'):
+            from recording.recorder import create_recorder
+            try:
+                self.recorder = create_recorder(config)
+                self.recorder.start()
+                robot.recorder = self.recorder
+                robot.rate_controller.recorder = self.recorder
+                self.recorder.record_state(robot.enabled, robot.mode)
+                print(f"Recording to {self.recorder.path}")
+            except Exception as e:
+                print(f"Session recording disabled: {e}")
+                self.recorder = None
+    
+    def stop(self):
+        """Disable and disconnect, then stop everything in reverse order."""
+        if self.robot.state != ConnectionState.IDLE:
+            self.robot.disconnect()  # Disables the robot first
+        self.control_loop.stop()
+        self.controller.stop()
+        if self.recorder:
+            self.robot.recorder = None
+            self.robot.rate_controller.recorder = None
+            self.recorder.close()
+            self.recorder = None
+    
+    def _log(self, message):
+        """Print from any thread without interleaving with the event loop's output."""
+        loop = self.loop
+        try:
+            if loop is not None:
+                loop.call_soon_threadsafe(print, message)
+                return
+        except RuntimeError:
+            pass  # Closed while we were looking
+        print(message)
+    
+    async def run(self, control_address=None, use_stdin=True, connect=False):
+        """Serve commands until quit or SIGINT/SIGTERM."""
+        self.loop = asyncio.get_running_loop()
+        self._done = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self.loop.add_signal_handler(signum, self._done.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows: Ctrl+C arrives as KeyboardInterrupt instead
+        
+        server = None
+        if control_address is not None:
+            try:
+                server = await self._start_server(control_address)
+            except (OSError, RuntimeError) as e:
+                print(f"Control socket disabled: {e}")
+        
+        tasks = [asyncio.create_task(self._report())]
+        if self.controller.event_thread == "main":
+            tasks.append(asyncio.create_task(self._pump_events()))
+        if use_stdin:
+            Thread(target=self._read_stdin, name="stdin-commands", daemon=True).start()
+        
+        if connect:
+            self.robot.connect()
+        print(f"Driver Station Ready ({1000.0 * (time.monotonic() - self.started):.0f} ms), "
+              f"type 'help' for commands", flush=True)
+        
+        try:
+            await self._done.wait()
+        finally:
+            self.loop = None  # Later messages (the disconnect) are printed directly
+            for task in tasks:
+                task.cancel()
+            if server is not None:
+                server.close()
+                await server.wait_closed()
+                if not isinstance(control_address, tuple):
+                    try:
+                        os.unlink(control_address)
+                    except OSError:
+                        pass
+    
+    async def _start_server(self, address):
+        """Listen for commands on a Unix socket or a localhost TCP port."""
+        if isinstance(address, tuple):
+            server = await asyncio.start_server(self._serve_client, *address)
+        else:
+            if os.path.exists(address):
+                try:
+                    await send_command(address, "status", timeout=1.0)
+                    raise RuntimeError(f"another headless driver station is using {address}")
+                except (OSError, asyncio.TimeoutError, ValueError):
+                    os.unlink(address)  # Left over from a run that did not exit cleanly
+            server = await asyncio.start_unix_server(self._serve_client, address)
+            os.chmod(address, 0o600)
+        print(f"Control socket: {address}")
+        return server
+    
+    async def _serve_client(self, reader, writer):
+        """Answer each command line of one socket client with a JSON line."""
+        try:
+            while not self._done.is_set():
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = self.execute(line.decode(errors="replace"))
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+    
+    def _read_stdin(self):
+        """Reader thread: hand lines typed on stdin to the event loop.
+        
+        A daemon thread rather than an executor, so a pending readline()
+        does not hold up shutdown. End of input only stops reading.
+        """
+        for line in sys.stdin:
+            if line.strip():
+                self.loop.call_soon_threadsafe(self._run_typed, line)
+    
+    def _run_typed(self, line):
+        """Run a command typed on stdin and print the reply."""
+        print(format_reply(self.execute(line)), flush=True)
+    
+    async def _pump_events(self):
+        """Handle pygame events on this (main) thread where the platform needs it."""
+        while True:
+            self.controller.pump_events()
+            await asyncio.sleep(0.005)
+    
+    async def _report(self):
+        """Print a status line every status_interval seconds."""
+        if not self.status_interval:
+            return
+        while True:
+            await asyncio.sleep(self.status_interval)
+            print(status_line(self.status()), flush=True)
+    
+    def execute(self, line):
+        """Run one command line; return {"ok": bool, ...}."""
+        command, *args = line.split() or [""]
+        command = command.lower()
+        robot = self.robot
+        try:
+            if command == "help":
+                return {"ok": True, "commands": COMMANDS}
+            if command == "status":
+                return dict(ok=True, **self.status())
+            if command == "stats":
+                return dict(ok=True, **self.stats())
+            if command == "connect":
+                if args:
+                    robot.team_number = int(args[0])
+                return {"ok": robot.connect(), "state": robot.state}
+            if command == "disconnect":
+                robot.disconnect()
+                return {"ok": True, "state": robot.state}
+            if command == "enable":
+                ok = robot.set_enabled(True)
+                reason = None
+                if not ok:
+                    reason = ("not connected" if not robot.is_connected() else
+                              "e-stopped, connect again to clear" if robot.estopped else
+                              "robot is not answering heartbeats")
+                return {"ok": ok, "enabled": robot.enabled, "reason": reason}
+            if command in ("disable", "estop"):
+                elapsed = robot.stop_now(time.monotonic(), estop=command == "estop")
+                return {"ok": True, "enabled": robot.enabled, "estopped": robot.estopped,
+                        "flush_ms": None if elapsed is None else 1000.0 * elapsed}
+            if command == "mode":
+                return {"ok": bool(args) and robot.set_mode(args[0]), "mode": robot.mode}
+            if command == "slot":
+                slot, new_slot = int(args[0]), int(args[1])
+                if not self.controller.registry.by_slot(slot):
+                    return {"ok": False, "error": f"no controller in slot {slot}"}
+                self.controller.assign_slot(slot, new_slot)
+                return {"ok": True}
+            if command == "export-latency":
+                robot.latency.export(args[0], {"headless": True})
+                return {"ok": True, "path": args[0]}
+            if command == "quit":
+                self._done.set()
+                return {"ok": True}
+            return {"ok": False, "error": f"unknown command '{command}', try 'help'"}
+        except (IndexError, ValueError) as e:
+            return {"ok": False, "error": f"bad arguments for '{command}': {e}"}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+    
+    def status(self):
+        """Summary of the robot, controllers and control loop."""
+        robot = self.robot
+        heartbeat = robot.get_heartbeat_stats()
+        loop = self.control_loop.get_stats()
+        latency = robot.get_latency_stats()["total"]
+        return {
+            "state": robot.state,
+            "address": robot.get_robot_address(),
+            "team": robot.team_number,
+            "enabled": robot.enabled,
+            "estopped": robot.estopped,
+            "mode": robot.mode,
+            "battery": robot.get_battery_voltage() if robot.is_connected() else None,
+            "rtt_ms": heartbeat["rtt_mean_ms"],
+            "controllers": self.controller.get_available_controllers(),
+            "loop_rate": loop["rate"],
+            "loop_jitter_max_ms": loop["jitter_max_ms"],
+            "loop_overruns": loop["overruns"],
+            "latency_p99_ms": latency["p99_ms"],
+            "recording": str(self.recorder.path) if self.recorder else None,
+        }
+    
+    def stats(self):
+        """Every statistic the window would show."""
+        robot = self.robot
+        return {
+            "latency": robot.get_latency_stats(),
+            "heartbeat": robot.get_heartbeat_stats(),
+            "rate": robot.get_rate_stats(),
+            "publish": robot.get_publish_stats(),
+            "transport": robot.get_transport_stats(),
+            "reconnect": robot.get_reconnect_stats(),
+            "stop": robot.get_stop_stats(),
+            "loop": self.control_loop.get_stats(),
+            "sampler": self.controller.get_sampler_stats(),
+        }
+
+
+def status_line(status):
+    """One-line form of status() for the periodic report."""
+    parts = [f"{status['state']}"]
+    if status["state"] == ConnectionState.CONNECTED:
+        parts.append(("ENABLED " if status["enabled"] else "disabled ") + status["mode"])
+        if status["estopped"]:
+            parts.append("E-STOPPED")
+        if status["battery"] is not None:
+            parts.append(f"{status['battery']:.2f} V")
+        if status["rtt_ms"] is not None:
+            parts.append(f"RTT {status['rtt_ms']:.1f} ms")
+    parts.append(f"{len(status['controllers'])} controller(s)")
+    parts.append(f"loop jitter max {status['loop_jitter_max_ms']:.2f} ms, "
+                 f"{status['loop_overruns']} overruns")
+    if status["latency_p99_ms"] is not None:
+        parts.append(f"latency p99 {status['latency_p99_ms']:.1f} ms")
+    return " | ".join(parts)
+
+
+def format_reply(reply):
+    """Readable form of a command reply for the terminal."""
+    if "commands" in reply:
+        return "\n".join(f"  {name:<24} {text}" for name, text in reply["commands"].items())
+    if not reply.get("ok") and "error" in reply:
+        return f"Error: {reply['error']}"
+    fields = {key: value for key, value in reply.items() if key != "ok"}
+    if len(fields) > 3:
+        return json.dumps(fields, indent=2, default=str)
+    prefix = "ok" if reply.get("ok") else "failed"
+    return ", ".join([prefix] + [f"{key}: {value}" for key, value in fields.items()])
@@ -0,0 +1,84 @@
+"""
+End-to-end input latency tracking.
+Each joystick frame carries monotonic timestamps from the moment the input
+arrived until the NetworkTables flush that sent it; this keeps the stage
+durations over a rolling window and reports percentiles.
+"""
+
+import json
+import time
+from datetime import datetime
+import numpy as np
+from utils.ring_buffer import RingBuffer
+
+
+# Stage durations recorded for every sent frame
+STAGES = ("capture_to_shape", "shape_to_send", "send_to_flush", "total")
+
+STAGE_LABELS = {
+    "capture_to_shape": "Capture → shaped",
+    "shape_to_send": "Shaped → send",
+    "send_to_flush": "Send → NT flush",
+    "total": "Capture → NT flush",
+}
+
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyTracker:
+    """Rolling per-stage latency samples of sent joystick frames."""
+    
+    def __init__(self, window=10.0, capacity=8192):
+        self.window = window
+        self.frames = 0
+        self._buffers = {stage: RingBuffer(capacity) for stage in STAGES}
+    
+    def add(self, captured, shaped, sent, flushed):
+        """Record one frame's timestamps (all time.monotonic())."""
+        durations = (shaped - captured, sent - shaped, flushed - sent, flushed - captured)
+        for stage, duration in zip(STAGES, durations):
+            self._buffers[stage].append(flushed, duration)
+        self.frames += 1
+    
+    def clear(self):
+        """Drop all samples."""
+        for buffer in self._buffers.values():
+            buffer.clear()
+        self.frames = 0
+    
+    def samples(self, window=None):
+        """Stage durations in seconds from the last window seconds."""
+        start = time.monotonic() - (window or self.window)
+        return {stage: buffer.window(start)[1] for stage, buffer in self._buffers.items()}
+    
+    def snapshot(self, window=None):
+        """Get count, p50/p95/p99 and max in milliseconds for each stage."""
+        result = {}
+        for stage, values in self.samples(window).items():
+            stats = {"count": len(values)}
+            if len(values):
+                for p, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+                    stats[f"p{p}_ms"] = 1000.0 * float(value)
+                stats["max_ms"] = 1000.0 * float(values.max())
+            else:
+                for p in PERCENTILES:
+                    stats[f"p{p}_ms"] = None
+                stats["max_ms"] = None
+            result[stage] = stats
+        return result
+    
+    def export(self, path, context=None):
+        """Write the current window (summary and raw samples) to a JSON file.
+        
+        context is stored alongside, e.g. the settings being compared.
+        """
+        data = {
+            "exported": datetime.now().isoformat(timespec="seconds"),
+            "window_seconds": self.window,
+            "context": context or {},
+            "stages": self.snapshot(),
+            "samples_ms": {stage: (1000.0 * values).round(4).tolist()
+                           for stage, values in self.samples().items()},
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
@@ -0,0 +1,221 @@
+"""
+Shared-memory state block between the control worker and the GUI.
+One process writes, any number read, without locks: a sequence counter
+in front of the data is odd while a write is in progress, and readers
+retry until they see the same even value before and after their copy
+(a seqlock). Retries are bounded, so a writer that died mid-write cannot
+hang a reader.
+"""
+
+import math
+import struct
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+from network.connection_state import ConnectionState
+
+
+MAX_SLOTS = 6
+MAX_AXES = 12
+MAX_TELEMETRY = 32
+MAX_READ_RETRIES = 100  # A write takes microseconds; give up well after that
+
+STATES = ConnectionState.ALL
+MODES = ("teleop", "auto", "test")
+
+# Telemetry value types
+VALUE_NONE = 0
+VALUE_NUMBER = 1
+VALUE_BOOLEAN = 2
+
+SEQUENCE = struct.Struct("<I")
+
+# Written time, connection/robot flags, control loop timing, heartbeat
+HEADER = struct.Struct("<dBBBBBBxx QQQddd dd")
+SLOT = struct.Struct(f"<BBxxI{MAX_AXES}d")  # Axis count, button count, button mask, axes
+TELEMETRY = struct.Struct("<IBxxxdd")  # Update count, value type, value, timestamp
+
+SharedSnapshot = namedtuple("SharedSnapshot", "written state connected enabled mode stale "
+                                              "controller ticks overruns skipped_ticks "
+                                              "jitter_mean_ms jitter_max_ms tick_time_max_ms "
+                                              "rtt_ms age_ms axes buttons telemetry")
+
+
+def block_size():
+    """Bytes needed for the sequence counter and all fields."""
+    return (SEQUENCE.size + HEADER.size + MAX_SLOTS * SLOT.size + 1 +
+            MAX_TELEMETRY * TELEMETRY.size)
+
+
+class SharedState:
+    """A seqlocked state block in named shared memory.
+    
+    The GUI process creates it (create=True) and removes it when the
+    worker stops; the worker attaches by name and is its only writer, and
+    the GUI reads snapshots.
+    """
+    
+    def __init__(self, name=None, create=False):
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=block_size() if create else 0)
+        self.name = self.shm.name
+        self.owner = create
+        self._sequence = 0
+        self._telemetry_counts = [0] * MAX_TELEMETRY
+        self._telemetry_timestamps = [None] * MAX_TELEMETRY
+        self.retries = 0  # Reads that raced a write and had to start over
+        self.failed_reads = 0  # Reads that gave up and returned the last good snapshot
+        self.last_snapshot = None
+        self._stuck_sequence = None  # Odd sequence a failed read gave up on
+        if create:
+            self.shm.buf[:block_size()] = bytes(block_size())
+    
+    def close(self):
+        """Detach (and remove the block if this side created it)."""
+        try:
+            self.shm.close()
+        except BufferError:
+            # A view into the block is still alive; it is unmapped once that goes away
+            pass
+        finally:
+            if self.owner:
+                try:
+                    self.shm.unlink()
+                except FileNotFoundError:
+                    pass
+                self.owner = False
+    
+    def write(self, state, connected, enabled, mode, stale, controller, loop_stats, rtt_ms, age_ms,
+              axes, buttons, telemetry):
+        """Publish a new snapshot (worker side, single writer).
+        
+        telemetry is a list of (value, timestamp) or None per key, in the
+        order both sides subscribed them; a value counts as updated when
+        its timestamp changes.
+        """
+        buf = self.shm.buf
+        self._sequence += 1
+        SEQUENCE.pack_into(buf, 0, self._sequence)  # Odd: write in progress
+        
+        offset = SEQUENCE.size
+        HEADER.pack_into(buf, offset, time.monotonic(), STATES.index(state), connected, enabled,
+                         MODES.index(mode), stale, controller,
+                         loop_stats["ticks"], loop_stats["overruns"], loop_stats["skipped_ticks"],
+                         loop_stats["jitter_mean_ms"], loop_stats["jitter_max_ms"],
+                         loop_stats["tick_time_max_ms"],
+                         math.nan if rtt_ms is None else rtt_ms, math.nan if age_ms is None else age_ms)
+        offset += HEADER.size
+        
+        slots = min(len(axes), MAX_SLOTS)
+        for slot in range(slots):
+            slot_axes = list(axes[slot])[:MAX_AXES]
+            slot_buttons = list(buttons[slot])[:32]
+            mask = 0
+            for i, pressed in enumerate(slot_buttons):
+                if pressed:
+                    mask |= 1 << i
+            SLOT.pack_into(buf, offset, len(slot_axes), len(slot_buttons), mask,
+                           *(slot_axes + [0.0] * (MAX_AXES - len(slot_axes))))
+            offset += SLOT.size
+        offset += (MAX_SLOTS - slots) * SLOT.size
+        buf[offset] = slots
+        offset += 1
+        
+        for i, entry in enumerate(telemetry[:MAX_TELEMETRY]):
+            if entry is None:
+                offset += TELEMETRY.size
+                continue
+            value, timestamp = entry
+            if isinstance(value, bool):
+                kind, number = VALUE_BOOLEAN, float(value)
+            elif isinstance(value, (int, float)):
+                kind, number = VALUE_NUMBER, float(value)
+            else:
+                kind, number = VALUE_NONE, math.nan  # Strings and arrays stay in the worker
+            if timestamp != self._telemetry_timestamps[i]:
+                self._telemetry_timestamps[i] = timestamp
+                self._telemetry_counts[i] += 1
+            TELEMETRY.pack_into(buf, offset, self._telemetry_counts[i], kind, number, timestamp)
+            offset += TELEMETRY.size
+        
+        self._sequence += 1
+        SEQUENCE.pack_into(buf, 0, self._sequence)  # Even: consistent
+    
+    def read(self):
+        """Get a consistent SharedSnapshot, or None before the first write.
+        
+        If no consistent copy can be made in MAX_READ_RETRIES tries (the
+        writer was killed mid-write), the last good snapshot is returned
+        instead, or None if there was none. Later reads return it at once
+        while the sequence stays where that read gave up.
+        """
+        buf = self.shm.buf
+        for attempt in range(MAX_READ_RETRIES):
+            before = SEQUENCE.unpack_from(buf, 0)[0]
+            if before == 0:
+                return None
+            if before == self._stuck_sequence:
+                break
+            if before & 1:
+                self.retries += 1
+                time.sleep(0)
+                continue
+            data = bytes(buf[SEQUENCE.size:block_size()])
+            if SEQUENCE.unpack_from(buf, 0)[0] == before:
+                break
+            self.retries += 1
+        else:
+            if before & 1:
+                self._stuck_sequence = before
+            self.failed_reads += 1
+            return self.last_snapshot
+        if before == self._stuck_sequence:
+            self.failed_reads += 1
+            return self.last_snapshot
+        
+        self.last_snapshot = self._decode(data)
+        return self.last_snapshot
+    
+    def _decode(self, data):
+        """Build a SharedSnapshot from a consistent copy of the block."""
+        header = HEADER.unpack_from(data, 0)
+        offset = HEADER.size
+        slots = data[offset + MAX_SLOTS * SLOT.size]
+        axes = []
+        buttons = []
+        for slot in range(slots):
+            fields = SLOT.unpack_from(data, offset + slot * SLOT.size)
+            naxes, nbuttons, mask = fields[:3]
+            axes.append(list(fields[3:3 + naxes]))
+            buttons.append([bool(mask & (1 << i)) for i in range(nbuttons)])
+        offset += MAX_SLOTS * SLOT.size + 1
+        
+        telemetry = []
+        for i in range(MAX_TELEMETRY):
+            count, kind, number, timestamp = TELEMETRY.unpack_from(data, offset + i * TELEMETRY.size)
+            if kind == VALUE_NONE:
+                telemetry.append(None)
+            else:
+                value = bool(number) if kind == VALUE_BOOLEAN else number
+                telemetry.append((count, value, timestamp))
+        
+        rtt, age = header[13:15]
+        return SharedSnapshot(
+            written=header[0],
+            state=STATES[header[1]],
+            connected=bool(header[2]),
+            enabled=bool(header[3]),
+            mode=MODES[header[4]],
+            stale=bool(header[5]),
+            controller=bool(header[6]),
+            ticks=header[7],
+            overruns=header[8],
+            skipped_ticks=header[9],
+            jitter_mean_ms=header[10],
+            jitter_max_ms=header[11],
+            tick_time_max_ms=header[12],
+            rtt_ms=None if math.isnan(rtt) else rtt,
+            age_ms=None if math.isnan(age) else age,
+            axes=axes,
+            buttons=buttons,
+            telemetry=telemetry,
+        )
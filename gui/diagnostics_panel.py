@@ -0,0 +1,83 @@
+"""
+Diagnostics panel.
+Shows joystick input latency percentiles per stage and exports them.
+"""
+
+from PyQt5.QtWidgets import QGroupBox, QGridLayout, QLabel, QPushButton, QFileDialog
+from PyQt5.QtGui import QFont
+from core.latency import STAGES, STAGE_LABELS
+
+
+COLUMNS = ("p50_ms", "p95_ms", "p99_ms", "max_ms")
+
+
+class DiagnosticsPanel(QGroupBox):
+    """Latency table for the last few seconds of sent joystick frames."""
+    
+    def __init__(self, robot, controller, config, view, parent=None):
+        super().__init__("Input Latency", parent)
+        self.robot = robot
+        self.controller = controller
+        self.config = config
+        self.view = view
+        
+        group_font = QFont()
+        group_font.setPointSize(16)
+        group_font.setBold(True)
+        self.setFont(group_font)
+        
+        base_font = QFont()
+        base_font.setPointSize(12)
+        
+        layout = QGridLayout()
+        for column, title in enumerate(("Stage", "p50", "p95", "p99", "max", "frames")):
+            header = QLabel(title)
+            header.setFont(base_font)
+            layout.addWidget(header, 0, column)
+        
+        # One row of value labels per stage
+        self.cells = {}
+        for row, stage in enumerate(STAGES, start=1):
+            name = QLabel(STAGE_LABELS[stage])
+            name.setFont(base_font)
+            layout.addWidget(name, row, 0)
+            cells = []
+            for column in range(1, len(COLUMNS) + 2):
+                cell = QLabel("--")
+                cell.setFont(base_font)
+                layout.addWidget(cell, row, column)
+                cells.append(cell)
+            self.cells[stage] = cells
+        
+        self.export_btn = QPushButton("Export...")
+        self.export_btn.setFont(base_font)
+        self.export_btn.clicked.connect(self.on_export_clicked)
+        layout.addWidget(self.export_btn, len(STAGES) + 1, 0)
+        
+        self.setLayout(layout)
+    
+    def update_stats(self):
+        """Refresh the table from the robot's latency tracker."""
+        stats = self.robot.get_latency_stats()
+        for stage, cells in self.cells.items():
+            stage_stats = stats[stage]
+            for cell, column in zip(cells, COLUMNS):
+                value = stage_stats[column]
+                self.view.set_text(cell, "--" if value is None else f"{value:.2f} ms")
+            self.view.set_text(cells[-1], str(stage_stats["count"]))
+    
+    def on_export_clicked(self):
+        """Save the current window of latency samples as JSON."""
+        path, _ = QFileDialog.getSaveFileName(self, "Export Latency", "latency.json",
+                                              "JSON files (*.json)")
+        if not path:
+            return
+        context = {key: self.config.get(key) for key in (
+            "transport", "control_loop_rate", "controller_max_rate", "controller_event_thread",
+            "joystick_publish_mode", "joystick_quantization")}
+        context["controllers"] = len(self.controller.get_available_controllers())
+        try:
+            self.robot.latency.export(path, context)
+            self.window().statusBar().showMessage(f"Latency exported to {path}")
+        except Exception as e:
+            print(f"Error exporting latency: {e}")
@@ -4,25 +4,67 @@ Main GUI window for FRC Driver Station.
 
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                               QPushButton, QLabel, QComboBox, QSpinBox, QGroupBox,
-                              QGridLayout, QProgressBar, QMessageBox)
+                              QGridLayout, QProgressBar, QApplication)
 from PyQt5.QtCore import QTimer, Qt
 from PyQt5.QtGui import QFont, QPalette, QColor
+from gui.robot_signals import RobotSignals, ControllerSignals
+from gui.strip_chart import StripChart
+from gui.view_model import ViewModel, battery_style
+from gui.diagnostics_panel import DiagnosticsPanel
+from gui.stop_keys import StopKeyFilter
+from controllers.controller_manager import MAX_SLOTS
+from network.connection_state import ConnectionState
 import sys
+import time
 
 
 class DriverStationWindow(QMainWindow):
     """Main driver station window."""
     
-    def __init__(self, robot_connection, controller_manager, config):
+    def __init__(self, robot_connection, controller_manager, config, control_loop=None):
         super().__init__()
         
         self.robot = robot_connection
         self.controller = controller_manager
         self.config = config
+        self.control_loop = control_loop  # Sends joystick frames; the window only observes it
+        self.stop_targets = [robot_connection]  # Robots stopped by the e-stop button and keys
+        
+        # Widget updates go through the view model so unchanged values are skipped
+        self.view = ViewModel()
         
         self.setup_ui()
         self.setup_timers()
         
+        # Connection state changes arrive from the robot's supervisor thread
+        self.robot_signals = RobotSignals()
+        self.robot_signals.state_changed.connect(self.on_connection_state_changed, Qt.QueuedConnection)
+        self.robot.on_state_changed = self.robot_signals.state_changed.emit
+        
+        # Telemetry is pushed by NetworkTables listeners, one signal per batch of changes
+        self.robot_signals.telemetry_changed.connect(self.update_telemetry, Qt.QueuedConnection)
+        self.robot.telemetry.on_changed = self.robot_signals.telemetry_changed.emit
+        self.robot.telemetry.take_changed()
+        
+        # Enable/mode changes made outside the window (replay, automatic disables)
+        self.robot_signals.robot_state_changed.connect(self.on_robot_state_changed, Qt.QueuedConnection)
+        self.robot.on_robot_state_changed = self.robot_signals.robot_state_changed.emit
+        
+        # Automatic disables when the robot stops echoing heartbeats
+        self.robot_signals.heartbeat_stale.connect(self.on_heartbeat_stale, Qt.QueuedConnection)
+        self.robot.on_heartbeat_stale = self.robot_signals.heartbeat_stale.emit
+        
+        # Controller list changes arrive from the thread that owns pygame events
+        self.controller_signals = ControllerSignals()
+        self.controller_signals.controllers_changed.connect(self.update_controller_list, Qt.QueuedConnection)
+        self.controller.on_controllers_changed = self.controller_signals.controllers_changed.emit
+        self.update_controller_list()
+        
+        # Space e-stops and Enter disables, wherever the focus is
+        self.stop_keys = StopKeyFilter(self)
+        self.stop_keys.on_stop = self.stop_robots
+        QApplication.instance().installEventFilter(self.stop_keys)
+        
         # Restore window geometry
         geometry = self.config.get("window_geometry")
         if geometry:
@@ -50,6 +92,10 @@ class DriverStationWindow(QMainWindow):
         # Bottom row: Controller status
         main_layout.addWidget(self.create_controller_group())
         
+        # Input latency diagnostics
+        self.diagnostics_panel = DiagnosticsPanel(self.robot, self.controller, self.config, self.view)
+        main_layout.addWidget(self.diagnostics_panel)
+        
         # Status bar
         self.statusBar().showMessage("Ready")
     
@@ -91,10 +137,15 @@ class DriverStationWindow(QMainWindow):
         layout.addWidget(self.connect_btn)
         
         # Connection status
-        self.connection_status = QLabel("● Disconnected")
-        self.connection_status.setStyleSheet("color: red; font-size: 28px; font-weight: bold;")
+        self.connection_status = QLabel()
+        self.view.set_status(self.connection_status, "● Disconnected", "red")
         layout.addWidget(self.connection_status)
         
+        # Heartbeat round trip
+        self.heartbeat_label = QLabel("Heartbeat: --")
+        self.heartbeat_label.setFont(base_font)
+        layout.addWidget(self.heartbeat_label)
+        
         group.setLayout(layout)
         return group
     
@@ -201,6 +252,11 @@ class DriverStationWindow(QMainWindow):
         self.battery_bar.setMinimumHeight(40)
         layout.addWidget(self.battery_bar, 0, 2)
         
+        history = self.robot.telemetry.history
+        self.battery_chart = StripChart(history, "BatteryVoltage", 6.0, 13.5, color="#28a745",
+                                        thresholds=((11.5, "orange"), (10.0, "red")))
+        layout.addWidget(self.battery_chart, 0, 3)
+        
         # RoboRIO CPU
         cpu_label_text = QLabel("RoboRIO CPU:")
         cpu_label_text.setFont(base_font)
@@ -214,6 +270,9 @@ class DriverStationWindow(QMainWindow):
         self.cpu_bar.setMinimumHeight(40)
         layout.addWidget(self.cpu_bar, 1, 2)
         
+        self.cpu_chart = StripChart(history, "RoboRIO/CPU", 0.0, 100.0)
+        layout.addWidget(self.cpu_chart, 1, 3)
+        
         # RoboRIO RAM
         ram_label_text = QLabel("RoboRIO RAM:")
         ram_label_text.setFont(base_font)
@@ -227,6 +286,36 @@ class DriverStationWindow(QMainWindow):
         self.ram_bar.setMinimumHeight(40)
         layout.addWidget(self.ram_bar, 2, 2)
         
+        self.ram_chart = StripChart(history, "RoboRIO/RAM", 0.0, 100.0)
+        layout.addWidget(self.ram_chart, 2, 3)
+        self.charts = [self.battery_chart, self.cpu_chart, self.ram_chart]
+        
+        # Extra SmartDashboard keys from the config
+        self.dashboard_labels = {}
+        for row, key in enumerate(self.config.get("telemetry_keys", []), start=3):
+            key_label = QLabel(f"{key}:")
+            key_label.setFont(base_font)
+            layout.addWidget(key_label, row, 0)
+            value_label = QLabel("--")
+            value_label.setFont(base_font)
+            layout.addWidget(value_label, row, 1, 1, 2)
+            self.dashboard_labels[key] = value_label
+        
+        # Chart time span
+        span_layout = QHBoxLayout()
+        span_label = QLabel("History:")
+        span_label.setFont(base_font)
+        span_layout.addWidget(span_label)
+        self.span_combo = QComboBox()
+        self.span_combo.setFont(base_font)
+        for text, span in (("10 s", 10.0), ("1 min", 60.0), ("5 min", 300.0),
+                           ("30 min", 1800.0), ("Session", None)):
+            self.span_combo.addItem(text, span)
+        self.span_combo.currentIndexChanged.connect(self.on_span_changed)
+        span_layout.addWidget(self.span_combo)
+        span_layout.addStretch()
+        layout.addLayout(span_layout, layout.rowCount(), 3)
+        
         group.setLayout(layout)
         return group
     
@@ -242,7 +331,7 @@ class DriverStationWindow(QMainWindow):
         
         layout = QVBoxLayout()
         
-        # Controller selector
+        # Controller selector and its slot (kept per device in the config)
         selector_layout = QHBoxLayout()
         selector_label = QLabel("USB Controller:")
         base_font = QFont()
@@ -254,65 +343,123 @@ class DriverStationWindow(QMainWindow):
         self.controller_combo.setFont(base_font)
         self.controller_combo.currentIndexChanged.connect(self.on_controller_selected)
         selector_layout.addWidget(self.controller_combo)
+        
+        slot_label = QLabel("Slot:")
+        slot_label.setFont(base_font)
+        selector_layout.addWidget(slot_label)
+        self.slot_combo = QComboBox()
+        self.slot_combo.setFont(base_font)
+        for slot in range(MAX_SLOTS):
+            role = {0: " (driver)", 1: " (operator)"}.get(slot, "")
+            self.slot_combo.addItem(f"{slot}{role}", slot)
+        self.slot_combo.setEnabled(False)
+        self.slot_combo.currentIndexChanged.connect(self.on_slot_selected)
+        selector_layout.addWidget(self.slot_combo)
         selector_layout.addStretch()
         layout.addLayout(selector_layout)
+        self.selected_slot = None  # Slot of the controller to select after a list update
         
         # Controller status
-        self.controller_status = QLabel("● No Controller")
-        self.controller_status.setStyleSheet("color: red; font-weight: bold;")
+        self.controller_status = QLabel()
+        self.view.set_status(self.controller_status, "● No Controller", "red")
         layout.addWidget(self.controller_status)
         
+        # Joystick bandwidth
+        self.joystick_tx_label = QLabel("Joystick TX: --")
+        self.joystick_tx_label.setFont(base_font)
+        layout.addWidget(self.joystick_tx_label)
+        
+        self.rate_label = QLabel("Rate control: full rate")
+        self.rate_label.setFont(base_font)
+        layout.addWidget(self.rate_label)
+        
+        # Control loop timing
+        self.loop_stats_label = QLabel("Control loop: --")
+        self.loop_stats_label.setFont(base_font)
+        layout.addWidget(self.loop_stats_label)
+        
+        # Widget updates skipped by the view model
+        self.view_stats_label = QLabel("UI updates: --")
+        self.view_stats_label.setFont(base_font)
+        layout.addWidget(self.view_stats_label)
+        
         group.setLayout(layout)
         return group
     
     def setup_timers(self):
         """Setup update timers."""
-        # Telemetry update timer (100ms)
-        self.telemetry_timer = QTimer()
-        self.telemetry_timer.timeout.connect(self.update_telemetry)
-        self.telemetry_timer.start(100)
-        
-        # Controller update timer (20ms / 50Hz)
+        # Telemetry chart redraw timer (100ms, charts scroll while connected)
+        self.chart_timer = QTimer()
+        self.chart_timer.timeout.connect(self.update_charts)
+        self.chart_timer.start(100)
+        
+        # Joystick bandwidth update timer (1 second, matches the stats window)
+        self.publish_stats_timer = QTimer()
+        self.publish_stats_timer.timeout.connect(self.update_publish_stats)
+        self.publish_stats_timer.timeout.connect(self.update_loop_stats)
+        self.publish_stats_timer.timeout.connect(self.update_heartbeat)
+        self.publish_stats_timer.timeout.connect(self.diagnostics_panel.update_stats)
+        self.publish_stats_timer.start(1000)
+        
+        # Controller status timer (100ms, display only; frames are sent by the control loop)
         self.controller_timer = QTimer()
         self.controller_timer.timeout.connect(self.update_controller)
-        self.controller_timer.start(20)
-        
-        # Controller list update timer (1 second)
-        self.controller_list_timer = QTimer()
-        self.controller_list_timer.timeout.connect(self.update_controller_list)
-        self.controller_list_timer.start(1000)
+        self.controller_timer.start(100)
+        
+        # Controller event pump (5ms), only where pygame events must be
+        # handled on the main thread
+        if self.controller.event_thread == "main":
+            self.controller_event_timer = QTimer()
+            self.controller_event_timer.timeout.connect(self.controller.pump_events)
+            self.controller_event_timer.start(5)
     
     def on_connect_clicked(self):
         """Handle connect button click."""
-        if not self.robot.is_connected():
-            # Connect
+        if self.robot.state == ConnectionState.IDLE:
+            # Connect (runs in the background, progress arrives as state changes)
             self.robot.team_number = self.team_spin.value()
-            self.connect_btn.setEnabled(False)
-            self.connect_btn.setText("Connecting...")
-            
-            # Connect in background (to avoid freezing UI)
-            QTimer.singleShot(100, self.do_connect)
+            self.robot.connect()
         else:
-            # Disconnect
+            # Disconnect or cancel the pending attempt
             self.robot.disconnect()
-            self.on_connection_changed(False)
     
-    def do_connect(self):
-        """Actually perform the connection."""
-        success = self.robot.connect()
-        self.on_connection_changed(success)
+    def on_connection_state_changed(self, state):
+        """Handle a connection state machine transition."""
+        if state == ConnectionState.CONNECTED:
+            self.on_connection_changed(True)
+            reconnect_time = self.robot.last_reconnect_time
+            if reconnect_time is not None:
+                self.statusBar().showMessage(
+                    f"Reconnected to robot {self.robot.team_number} after {reconnect_time:.2f} s")
+        elif state == ConnectionState.IDLE:
+            self.on_connection_changed(False)
+        elif state == ConnectionState.LOST:
+            self.on_connection_changed(False)
+            self.view.set_text(self.connection_status, "● Connection Lost")
+            self.connect_btn.setText("Cancel")
+            self.statusBar().showMessage("Lost connection to robot, reconnecting...")
+        elif state == ConnectionState.CONNECTING:
+            self.view.set_status(self.connection_status, "● Connecting...", "orange")
+            self.connect_btn.setText("Cancel")
+            if self.robot.robot_address:
+                self.statusBar().showMessage(f"Connecting to {self.robot.robot_address}...")
+            else:
+                self.statusBar().showMessage(f"Searching for robot {self.robot.team_number}...")
+        elif state == ConnectionState.BACKOFF:
+            self.view.set_status(self.connection_status, "● Retrying...", "orange")
+            self.connect_btn.setText("Cancel")
+            self.statusBar().showMessage(f"Robot not reachable, retrying in {self.robot.backoff_delay:.1f} s")
     
     def on_connection_changed(self, connected):
         """Handle connection state change."""
         if connected:
-            self.connection_status.setText("● Connected")
-            self.connection_status.setStyleSheet("color: green; font-size: 28px; font-weight: bold;")
+            self.view.set_status(self.connection_status, "● Connected", "green")
             self.connect_btn.setText("Disconnect")
             self.enable_btn.setEnabled(True)
-            self.statusBar().showMessage(f"Connected to robot {self.team_spin.value()}")
+            self.statusBar().showMessage(
+                f"Connected to robot {self.robot.team_number} at {self.robot.get_robot_address()}")
         else:
-            self.connection_status.setText("● Disconnected")
-            self.connection_status.setStyleSheet("color: red; font-size: 28px; font-weight: bold;")
+            self.view.set_status(self.connection_status, "● Disconnected", "red")
             self.connect_btn.setText("Connect")
             self.enable_btn.setEnabled(False)
             self.enable_btn.setText("ENABLE")
@@ -339,7 +486,12 @@ class DriverStationWindow(QMainWindow):
         
         if not self.robot.enabled:
             # Enable robot
-            self.robot.set_enabled(True)
+            if not self.robot.set_enabled(True):
+                if self.robot.estopped:
+                    self.statusBar().showMessage("Robot is e-stopped, disconnect and connect again to enable")
+                elif self.robot.heartbeat.stale:
+                    self.statusBar().showMessage("Robot is not answering heartbeats, not enabled")
+                return
             self.enable_btn.setText("DISABLE")
             self.enable_btn.setStyleSheet("""
                 QPushButton {
@@ -367,25 +519,23 @@ class DriverStationWindow(QMainWindow):
             self.statusBar().showMessage("Robot DISABLED")
     
     def on_estop_clicked(self):
-        """Handle emergency stop button click."""
-        if self.robot.is_connected() and self.robot.enabled:
-            reply = QMessageBox.question(self, 'Emergency Stop', 
-                                         'Are you sure you want to emergency stop the robot?',
-                                         QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
-            
-            if reply == QMessageBox.Yes:
-                self.robot.set_enabled(False)
-                self.enable_btn.setText("ENABLE")
-                self.enable_btn.setStyleSheet("""
-                    QPushButton {
-                        background-color: #28a745;
-                        color: white;
-                    }
-                    QPushButton:hover {
-                        background-color: #218838;
-                    }
-                """)
-                self.statusBar().showMessage("EMERGENCY STOP ACTIVATED")
+        """Handle emergency stop button click (no confirmation)."""
+        self.stop_robots(time.monotonic(), estop=True)
+    
+    def stop_robots(self, pressed, estop=True):
+        """E-stop or disable every stop target at once, then update the controls."""
+        for robot in self.stop_targets:
+            robot.stop_now(pressed, estop)
+        self.on_robot_state_changed(False, self.robot.mode)
+        if not estop:
+            self.show_stop_message("Robot DISABLED")
+    
+    def show_stop_message(self, message):
+        """Show a stop in the status bar with its request-to-send time."""
+        stats = self.robot.get_stop_stats()
+        if stats["last_ms"] is not None:
+            message += f" ({stats['last_ms']:.2f} ms to send)"
+        self.statusBar().showMessage(message)
     
     def on_mode_changed(self, mode_text):
         """Handle mode selection change."""
@@ -398,82 +548,243 @@ class DriverStationWindow(QMainWindow):
         self.robot.set_mode(mode)
         self.statusBar().showMessage(f"Mode changed to {mode_text}")
     
+    def on_heartbeat_stale(self, age):
+        """Report an automatic disable after the heartbeat went stale."""
+        self.statusBar().showMessage(
+            f"Heartbeat lost ({1000.0 * age:.0f} ms without echo), robot disabled")
+    
+    def on_robot_state_changed(self, enabled, mode):
+        """Reflect the robot's enable state and mode in the controls."""
+        if enabled:
+            self.enable_btn.setText("DISABLE")
+            self.enable_btn.setStyleSheet("""
+                QPushButton {
+                    background-color: #dc3545;
+                    color: white;
+                }
+                QPushButton:hover {
+                    background-color: #c82333;
+                }
+            """)
+        elif self.enable_btn.text() != "ENABLE":
+            self.enable_btn.setText("ENABLE")
+            self.enable_btn.setStyleSheet("""
+                QPushButton {
+                    background-color: #28a745;
+                    color: white;
+                }
+                QPushButton:hover {
+                    background-color: #218838;
+                }
+                QPushButton:disabled {
+                    background-color: #6c757d;
+                }
+            """)
+        
+        if self.robot.estopped and not enabled:
+            # Also reached from the controller e-stop button
+            self.show_stop_message("EMERGENCY STOP ACTIVATED")
+        
+        mode_names = {"teleop": "Teleop", "auto": "Autonomous", "test": "Test"}
+        self.mode_combo.blockSignals(True)
+        self.mode_combo.setCurrentText(mode_names.get(mode, "Teleop"))
+        self.mode_combo.blockSignals(False)
+    
     def on_team_changed(self, team_number):
         """Handle team number change."""
         self.config.set("team_number", team_number)
     
+    def use_robot_team(self):
+        """Show the robot's own team number, fixed (robots from the robots list)."""
+        self.team_spin.blockSignals(True)
+        self.team_spin.setValue(self.robot.team_number)
+        self.team_spin.blockSignals(False)
+        self.team_spin.setEnabled(False)
+    
     def update_telemetry(self):
-        """Update telemetry displays."""
-        if not self.robot.is_connected():
+        """Update the telemetry displays for keys that changed."""
+        changed = self.robot.telemetry.take_changed()
+        if not changed:
             return
         
         # Battery voltage
-        voltage = self.robot.get_battery_voltage()
-        self.battery_label.setText(f"{voltage:.2f} V")
-        self.battery_bar.setValue(int(voltage * 10))
-        
-        # Color code battery voltage
-        if voltage < 10.0:
-            self.battery_label.setStyleSheet("font-size: 36px; font-weight: bold; color: red;")
-        elif voltage < 11.5:
-            self.battery_label.setStyleSheet("font-size: 36px; font-weight: bold; color: orange;")
-        else:
-            self.battery_label.setStyleSheet("font-size: 36px; font-weight: bold; color: green;")
+        if "BatteryVoltage" in changed:
+            voltage = self.robot.get_battery_voltage()
+            self.view.set_text(self.battery_label, f"{voltage:.2f} V")
+            self.view.set_value(self.battery_bar, int(voltage * 10))
+            
+            # Color code battery voltage (restyled only when the color changes)
+            self.view.set_style(self.battery_label, battery_style(voltage))
         
         # RoboRIO status
-        status = self.robot.get_roborio_status()
-        cpu = status["cpu"]
-        ram = status["ram"]
+        if "RoboRIO/CPU" in changed:
+            cpu = self.robot.get_telemetry("RoboRIO/CPU", 0.0)
+            self.view.set_text(self.cpu_label, f"{cpu:.1f}%")
+            self.view.set_value(self.cpu_bar, int(cpu))
+        
+        if "RoboRIO/RAM" in changed:
+            ram = self.robot.get_telemetry("RoboRIO/RAM", 0.0)
+            self.view.set_text(self.ram_label, f"{ram:.1f}%")
+            self.view.set_value(self.ram_bar, int(ram))
+        
+        # Extra SmartDashboard keys
+        for key in changed.intersection(self.dashboard_labels):
+            value = self.robot.get_telemetry(key)
+            text = f"{value:.2f}" if isinstance(value, float) else str(value)
+            self.view.set_text(self.dashboard_labels[key], text)
+    
+    def update_charts(self):
+        """Scroll the telemetry charts."""
+        if not self.robot.is_connected():
+            return
+        for chart in self.charts:
+            chart.update()
+    
+    def on_span_changed(self, index):
+        """Handle chart history span change."""
+        span = self.span_combo.itemData(index)
+        for chart in self.charts:
+            chart.set_span(span)
+    
+    def update_publish_stats(self):
+        """Update the joystick bandwidth and UI update displays."""
+        view_stats = self.view.get_stats()
+        self.view.set_text(
+            self.view_stats_label,
+            f"UI updates: {view_stats['applied']} applied, {view_stats['skipped']} skipped "
+            f"({view_stats['skipped_percent']:.1f}%)")
+        
+        if not self.robot.is_connected():
+            return
         
-        self.cpu_label.setText(f"{cpu:.1f}%")
-        self.cpu_bar.setValue(int(cpu))
+        stats = self.robot.get_publish_stats()
+        self.view.set_text(
+            self.joystick_tx_label,
+            f"Joystick TX: {stats['writes_per_second']} writes/s, "
+            f"{stats['bytes_per_second']} B/s "
+            f"({stats['fms_cap_percent']:.3f}% of FMS cap, "
+            f"{stats['saved_bytes_per_second']} B/s saved)")
+        
+        rate = self.robot.get_rate_stats()
+        if rate["level"]:
+            limit = "" if rate["max_rate"] is None else f", {rate['max_rate']:g} Hz"
+            self.view.set_text(self.rate_label,
+                               f"Rate control: {rate['name']}{limit}, step {rate['quantization']:g}")
+            self.view.set_style(self.rate_label, "color: orange;")
+        else:
+            self.view.set_text(self.rate_label, "Rate control: full rate")
+            self.view.set_style(self.rate_label, "")
+        
+        # Recent decisions on hover
+        rows = [f"{time.strftime('%H:%M:%S', time.localtime(d['time']))}  "
+                f"{d['from']} -> {d['to']}: {d['reason']}" for d in rate["decisions"][-10:]]
+        self.view.set_tooltip(self.rate_label, "\n".join(rows))
+    
+    def update_heartbeat(self):
+        """Update the heartbeat RTT and loss display."""
+        if self.robot.transport == "udp":
+            self.update_udp_link()
+            return
+        
+        stats = self.robot.get_heartbeat_stats()
+        if not self.robot.is_connected() or not stats["established"]:
+            text = "Heartbeat: no echo" if self.robot.is_connected() else "Heartbeat: --"
+            self.view.set_text(self.heartbeat_label, text)
+            self.view.set_style(self.heartbeat_label, "")
+            return
+        
+        text = (f"Heartbeat: RTT {stats['rtt_mean_ms']:.1f} ms avg / {stats['rtt_max_ms']:.1f} ms max, "
+                f"{stats['loss_percent']:.0f}% loss")
+        if stats["stale"]:
+            text += f", STALE ({stats['age_ms']:.0f} ms)"
+        self.view.set_text(self.heartbeat_label, text)
+        self.view.set_style(self.heartbeat_label, "color: red;" if stats["stale"] else "")
+    
+    def update_udp_link(self):
+        """Show UDP trip times and robot status flags in the heartbeat line."""
+        stats = self.robot.get_transport_stats()
+        if not stats["communicating"] or stats["trip_mean_ms"] is None:
+            self.view.set_text(self.heartbeat_label, "UDP: no robot")
+            self.view.set_style(self.heartbeat_label, "")
+            return
+        
+        text = (f"UDP: trip {stats['trip_mean_ms']:.1f} ms avg / {stats['trip_max_ms']:.1f} ms max, "
+                f"{stats['loss_percent']:.0f}% loss")
+        flags = [name for name, active in (("BROWNOUT", stats["brownout"]), ("E-STOP", stats["estop"]),
+                                           ("NO CODE", not stats["robot_code"])) if active]
+        if flags:
+            text += ", " + ", ".join(flags)
+        self.view.set_text(self.heartbeat_label, text)
+        self.view.set_style(self.heartbeat_label, "color: red;" if flags else "")
+    
+    def update_loop_stats(self):
+        """Update the control loop timing display."""
+        if self.control_loop is None:
+            return
         
-        self.ram_label.setText(f"{ram:.1f}%")
-        self.ram_bar.setValue(int(ram))
+        stats = self.control_loop.get_stats()
+        self.view.set_text(
+            self.loop_stats_label,
+            f"Control loop: {stats['rate']:g} Hz, jitter {stats['jitter_mean_ms']:.2f} ms mean / "
+            f"{stats['jitter_max_ms']:.2f} ms max, {stats['overruns']} overruns "
+            f"({stats['skipped_ticks']} ticks skipped)")
+        
+        # Full histograms on hover
+        rows = [f"{label:>9}  {jitter:>8}  {overrun:>8}" for label, jitter, overrun in
+                zip(stats["labels"], stats["jitter_histogram"], stats["overrun_histogram"])]
+        self.view.set_tooltip(
+            self.loop_stats_label,
+            "<pre>" + "\n".join([f"{'':>9}  {'jitter':>8}  {'overrun':>8}"] + rows) + "</pre>")
     
     def update_controller(self):
-        """Update controller and send joystick data."""
-        # Update controller status display
+        """Update the controller status display."""
         if self.controller.is_connected():
             name = self.controller.get_controller_name()
-            self.controller_status.setText(f"● {name}")
-            self.controller_status.setStyleSheet("color: green; font-size: 28px; font-weight: bold;")
+            self.view.set_status(self.controller_status, f"● {name}", "green")
         else:
-            self.controller_status.setText("● No Controller")
-            self.controller_status.setStyleSheet("color: red; font-size: 28px; font-weight: bold;")
-        
-        # Send controller data to robot if enabled
-        if self.robot.is_connected() and self.robot.enabled and self.controller.is_connected():
-            axes = self.controller.get_axes()
-            buttons = self.controller.get_buttons()
-            self.robot.send_joystick_data(axes, buttons)
+            self.view.set_status(self.controller_status, "● No Controller", "red")
     
     def update_controller_list(self):
-        """Update the list of available controllers."""
+        """Show the controller in each slot (called when the registry changes)."""
         available = self.controller.get_available_controllers()
-        
-        # Check if the list has changed
-        current_count = self.controller_combo.count()
-        if len(available) != current_count:
-            # Block signals to avoid triggering selection change
-            self.controller_combo.blockSignals(True)
-            self.controller_combo.clear()
-            
-            if available:
-                for index, name in available:
-                    self.controller_combo.addItem(f"{index}: {name}", index)
-            else:
-                self.controller_combo.addItem("No controllers available", -1)
-            
-            self.controller_combo.blockSignals(False)
+        selected = self.selected_slot
+        if selected is None:
+            selected = self.controller_combo.currentData()
+        
+        # Block signals to avoid triggering selection change
+        self.controller_combo.blockSignals(True)
+        self.controller_combo.clear()
+        if available:
+            for slot, name in available:
+                self.controller_combo.addItem(f"{slot}: {name}", slot)
+            index = self.controller_combo.findData(selected)
+            self.controller_combo.setCurrentIndex(max(0, index))
+        else:
+            self.controller_combo.addItem("No controllers available", -1)
+        self.controller_combo.blockSignals(False)
+        self.selected_slot = None
+        self.on_controller_selected(self.controller_combo.currentIndex())
     
     def on_controller_selected(self, index):
-        """Handle controller selection change."""
-        if index >= 0:
-            controller_index = self.controller_combo.itemData(index)
-            if controller_index >= 0:
-                self.controller.select_controller(controller_index)
-                self.statusBar().showMessage(f"Controller {controller_index} selected")
+        """Show the slot of the selected controller."""
+        slot = self.controller_combo.itemData(index)
+        self.slot_combo.blockSignals(True)
+        if slot is not None and slot >= 0:
+            self.slot_combo.setCurrentIndex(self.slot_combo.findData(slot))
+            self.slot_combo.setEnabled(True)
+        else:
+            self.slot_combo.setEnabled(False)
+        self.slot_combo.blockSignals(False)
+    
+    def on_slot_selected(self, index):
+        """Move the selected controller to another slot (swapping with any there)."""
+        slot = self.controller_combo.currentData()
+        new_slot = self.slot_combo.itemData(index)
+        if slot is None or slot < 0 or new_slot == slot:
+            return
+        self.selected_slot = new_slot
+        self.controller.assign_slot(slot, new_slot)
+        self.statusBar().showMessage(f"Controller moved to slot {new_slot}")
     
     def closeEvent(self, event):
         """Handle window close event."""
@@ -481,10 +792,16 @@ class DriverStationWindow(QMainWindow):
         geometry = self.geometry()
         self.config.set("window_geometry", (geometry.x(), geometry.y(), geometry.width(), geometry.height()))
         
+        QApplication.instance().removeEventFilter(self.stop_keys)
+        
         # Disconnect from robot
-        if self.robot.is_connected():
+        if self.robot.state != ConnectionState.IDLE:
             self.robot.disconnect()
         
+        # Stop the control loop before the controller it reads from
+        if self.control_loop:
+            self.control_loop.stop()
+        
         # Stop controller
         self.controller.stop()
         
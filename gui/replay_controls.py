@@ -0,0 +1,92 @@
+"""
+Playback controls for session replay.
+"""
+
+from PyQt5.QtWidgets import (QGroupBox, QHBoxLayout, QPushButton, QLabel,
+                             QComboBox, QSlider)
+from PyQt5.QtCore import QTimer, Qt
+from PyQt5.QtGui import QFont
+
+
+class ReplayControls(QGroupBox):
+    """Play/pause, speed, step and seek controls for a ReplayPlayer."""
+    
+    def __init__(self, player, parent=None):
+        super().__init__("Replay", parent)
+        self.player = player
+        self._last_dispatched = 0
+        
+        group_font = QFont()
+        group_font.setPointSize(16)
+        group_font.setBold(True)
+        self.setFont(group_font)
+        
+        base_font = QFont()
+        base_font.setPointSize(12)
+        
+        layout = QHBoxLayout()
+        
+        self.play_btn = QPushButton("Play")
+        self.play_btn.setFont(base_font)
+        self.play_btn.clicked.connect(self.on_play_clicked)
+        layout.addWidget(self.play_btn)
+        
+        self.step_btn = QPushButton("Step 0.1 s")
+        self.step_btn.setFont(base_font)
+        self.step_btn.clicked.connect(lambda: self.player.step(0.1))
+        layout.addWidget(self.step_btn)
+        
+        self.speed_combo = QComboBox()
+        self.speed_combo.setFont(base_font)
+        for text, speed in (("0.25x", 0.25), ("1x", 1.0), ("2x", 2.0), ("4x", 4.0),
+                            ("10x", 10.0), ("Max", None)):
+            self.speed_combo.addItem(text, speed)
+            if speed == player.speed:
+                self.speed_combo.setCurrentIndex(self.speed_combo.count() - 1)
+        self.speed_combo.currentIndexChanged.connect(self.on_speed_changed)
+        layout.addWidget(self.speed_combo)
+        
+        self.seek_slider = QSlider(Qt.Horizontal)
+        self.seek_slider.setRange(0, max(1, int(player.reader.duration * 10)))
+        self.seek_slider.sliderReleased.connect(self.on_seek)
+        layout.addWidget(self.seek_slider, 1)
+        
+        self.position_label = QLabel()
+        self.position_label.setFont(base_font)
+        layout.addWidget(self.position_label)
+        
+        self.setLayout(layout)
+        
+        # Position display timer (200ms)
+        self.position_timer = QTimer()
+        self.position_timer.timeout.connect(self.update_position)
+        self.position_timer.start(200)
+        self.update_position()
+    
+    def on_play_clicked(self):
+        """Toggle playback."""
+        if self.player.playing:
+            self.player.pause()
+        else:
+            self.player.play()
+    
+    def on_speed_changed(self, index):
+        """Change playback speed."""
+        self.player.set_speed(self.speed_combo.itemData(index))
+    
+    def on_seek(self):
+        """Jump to the slider position."""
+        self.player.seek(self.seek_slider.value() / 10.0)
+    
+    def update_position(self):
+        """Update the position display and record rate."""
+        position = self.player.get_position()
+        duration = self.player.reader.duration
+        dispatched = self.player.records_dispatched
+        rate = (dispatched - self._last_dispatched) * 5
+        self._last_dispatched = dispatched
+        
+        self.play_btn.setText("Pause" if self.player.playing else "Play")
+        if not self.seek_slider.isSliderDown():
+            self.seek_slider.setValue(int(position * 10))
+        self.position_label.setText(f"{position:7.1f} / {duration:.1f} s  ({rate} rec/s)")
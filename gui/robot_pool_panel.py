@@ -0,0 +1,160 @@
+"""
+Robot pool panel.
+One status row per robot of a ConnectionPool, with connect and enable
+buttons and a choice of which robot the controllers drive.
+"""
+
+from PyQt5.QtWidgets import QGroupBox, QGridLayout, QLabel, QPushButton, QRadioButton, QButtonGroup
+from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import QFont
+from network.connection_state import ConnectionState
+
+
+STATE_COLORS = {
+    ConnectionState.IDLE: "gray",
+    ConnectionState.CONNECTING: "orange",
+    ConnectionState.CONNECTED: "green",
+    ConnectionState.LOST: "red",
+    ConnectionState.BACKOFF: "orange",
+}
+
+
+class RobotPoolPanel(QGroupBox):
+    """Status rows for every robot in the pool, refreshed twice a second."""
+    
+    def __init__(self, pool, control_loop, view, parent=None):
+        super().__init__("Robots", parent)
+        self.pool = pool
+        self.control_loop = control_loop  # Its robot is the one the controllers drive
+        self.view = view
+        
+        group_font = QFont()
+        group_font.setPointSize(16)
+        group_font.setBold(True)
+        self.setFont(group_font)
+        
+        base_font = QFont()
+        base_font.setPointSize(12)
+        
+        layout = QGridLayout()
+        for column, title in enumerate(("Drive", "Robot", "Address", "Status", "Heartbeat", "Battery")):
+            header = QLabel(title)
+            header.setFont(base_font)
+            layout.addWidget(header, 0, column)
+        
+        # One row of widgets per robot
+        self.rows = []
+        self.drive_group = QButtonGroup(self)
+        for row, robot in enumerate(pool.connections, start=1):
+            drive = QRadioButton()
+            drive.setChecked(robot is control_loop.robot)
+            self.drive_group.addButton(drive, row - 1)
+            layout.addWidget(drive, row, 0)
+            
+            labels = []
+            for column in range(1, 6):
+                label = QLabel("--")
+                label.setFont(base_font)
+                layout.addWidget(label, row, column)
+                labels.append(label)
+            labels[0].setText(robot.name or f"Team {robot.team_number}")
+            
+            connect_btn = QPushButton("Connect")
+            connect_btn.setFont(base_font)
+            connect_btn.clicked.connect(lambda checked, r=robot: self.on_connect_clicked(r))
+            layout.addWidget(connect_btn, row, 6)
+            
+            enable_btn = QPushButton("Enable")
+            enable_btn.setFont(base_font)
+            enable_btn.clicked.connect(lambda checked, r=robot: self.on_enable_clicked(r))
+            layout.addWidget(enable_btn, row, 7)
+            
+            self.rows.append((robot, labels, connect_btn, enable_btn))
+        self.drive_group.buttonClicked[int].connect(self.on_drive_changed)
+        
+        self.disable_all_btn = QPushButton("Disable All")
+        self.disable_all_btn.setFont(base_font)
+        self.disable_all_btn.clicked.connect(self.disable_all)
+        layout.addWidget(self.disable_all_btn, len(self.rows) + 1, 0, 1, 2)
+        
+        self.stats_label = QLabel("")
+        self.stats_label.setFont(base_font)
+        layout.addWidget(self.stats_label, len(self.rows) + 1, 2, 1, 6)
+        
+        self.setLayout(layout)
+        
+        # A single timer for all rows, however many robots there are
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.update_rows)
+        self.timer.start(500)
+        self.update_rows()
+    
+    def on_connect_clicked(self, robot):
+        """Connect a robot, or disconnect it (or cancel its attempt)."""
+        if robot.state == ConnectionState.IDLE:
+            robot.connect()
+        else:
+            robot.disconnect()
+        self.update_rows()
+    
+    def on_enable_clicked(self, robot):
+        """Toggle a robot's enable state."""
+        if robot.is_connected():
+            robot.set_enabled(not robot.enabled)
+        self.update_rows()
+    
+    def on_drive_changed(self, index):
+        """Send the controllers to another robot, disabling the previous one."""
+        robot = self.pool.connections[index]
+        previous = self.control_loop.robot
+        if robot is previous:
+            return
+        if previous.enabled:
+            # It would keep acting on the last frame it got
+            previous.set_enabled(False)
+        self.control_loop.robot = robot
+        self.update_rows()
+    
+    def connect_all(self):
+        """Connect every robot that is not connected yet."""
+        for robot, _, _, _ in self.rows:
+            if robot.state == ConnectionState.IDLE:
+                robot.connect()
+    
+    def disable_all(self):
+        """Disable every robot."""
+        for robot, _, _, _ in self.rows:
+            if robot.enabled:
+                robot.set_enabled(False)
+        self.update_rows()
+    
+    def update_rows(self):
+        """Refresh every row from its robot."""
+        for robot, labels, connect_btn, enable_btn in self.rows:
+            _, address, status, heartbeat, battery = labels
+            connected = robot.is_connected()
+            
+            self.view.set_text(address, robot.get_robot_address())
+            if connected and robot.enabled:
+                text, color = f"Enabled ({robot.mode})", "green"
+            else:
+                text, color = robot.state.capitalize(), STATE_COLORS.get(robot.state, "gray")
+            self.view.set_text(status, text)
+            self.view.set_style(status, f"color: {color}; font-weight: bold;")
+            
+            stats = robot.get_heartbeat_stats()
+            if connected and stats["established"]:
+                rtt = stats["rtt_mean_ms"]
+                self.view.set_text(heartbeat, f"{rtt:.1f} ms, {stats['loss_percent']:.0f}% lost"
+                                   if rtt is not None else "--")
+            else:
+                self.view.set_text(heartbeat, "--")
+            self.view.set_text(battery, f"{robot.get_battery_voltage():.2f} V" if connected else "--")
+            
+            self.view.set_text(connect_btn, "Connect" if robot.state == ConnectionState.IDLE else "Disconnect")
+            self.view.set_text(enable_btn, "Disable" if robot.enabled else "Enable")
+            enable_btn.setEnabled(connected)
+        
+        stats = self.pool.get_stats()
+        self.view.set_text(self.stats_label, f"{stats['connected']}/{stats['robots']} connected, "
+                                             f"pool thread busy {stats['busy_percent']:.2f}%")
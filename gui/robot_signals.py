@@ -0,0 +1,22 @@
+"""
+Qt signal bridges for robot connection and controller events.
+RobotConnection and ControllerManager call back from their own threads;
+these signals carry the events over to the GUI thread as queued calls.
+"""
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class RobotSignals(QObject):
+    """Signals emitted on behalf of RobotConnection."""
+    
+    state_changed = pyqtSignal(str)
+    telemetry_changed = pyqtSignal()
+    robot_state_changed = pyqtSignal(bool, str)
+    heartbeat_stale = pyqtSignal(float)
+
+
+class ControllerSignals(QObject):
+    """Signals emitted on behalf of ControllerManager."""
+    
+    controllers_changed = pyqtSignal()
@@ -0,0 +1,81 @@
+"""
+Keyboard e-stop for the whole application.
+As on the FRC driver station, Space e-stops the robot and Enter disables
+it, whichever widget has focus. The keys are caught by an application
+event filter, before any widget or shortcut handling sees them.
+
+The stop request is always made. The key itself is swallowed only when it
+goes to the main window; in dialogs (a file name being typed, Enter to
+accept) and in text inputs it is passed on after the stop, so those still
+work as usual.
+"""
+
+import time
+from PyQt5.QtCore import QObject, QEvent, Qt
+from PyQt5.QtGui import QWindow
+from PyQt5.QtWidgets import (QApplication, QWidget, QAbstractSpinBox, QComboBox, QLineEdit,
+                             QPlainTextEdit, QTextEdit)
+
+
+ESTOP_KEYS = (Qt.Key_Space,)
+DISABLE_KEYS = (Qt.Key_Return, Qt.Key_Enter)
+
+# Widgets that take typed text, so get the key after the stop
+TEXT_INPUTS = (QLineEdit, QTextEdit, QPlainTextEdit, QAbstractSpinBox)
+
+
+class StopKeyFilter(QObject):
+    """Application event filter turning Space and Enter into stop requests.
+    
+    parent is the main window; without one every press is swallowed.
+    """
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._passed = None  # (key, timestamp) of the press being passed on
+        
+        # Callbacks
+        self.on_stop = None  # Called with (pressed, estop); pressed is time.monotonic()
+    
+    def eventFilter(self, watched, event):
+        """Act on the key press; keep it from the widgets of the main window."""
+        if event.type() == QEvent.KeyRelease:
+            self._passed = None
+            return False
+        if event.type() != QEvent.KeyPress:
+            return False
+        key = event.key()
+        if key not in ESTOP_KEYS and key not in DISABLE_KEYS:
+            return False
+        pressed = time.monotonic()
+        
+        # A passed-on press comes back here for the focus widget and its parents
+        stamp = (key, event.timestamp())
+        if stamp != self._passed and not event.isAutoRepeat() and self.on_stop:
+            self.on_stop(pressed, key in ESTOP_KEYS)
+        if self._swallows(watched):
+            self._passed = None
+            return True
+        self._passed = stamp
+        return False
+    
+    def _swallows(self, watched):
+        """Whether a press going to watched belongs to the main window."""
+        window = self.parent()
+        if window is None:
+            return True
+        modal = QApplication.activeModalWidget()
+        if modal is not None and modal is not window:
+            return False
+        if isinstance(watched, QWindow):
+            # Key presses reach the native window first, then the focus widget
+            if watched is not window.windowHandle():
+                return False
+            watched = QApplication.focusWidget()
+            if watched is None:
+                return True
+        if not isinstance(watched, QWidget) or watched.window() is not window:
+            return False
+        if isinstance(watched, QComboBox):
+            return not watched.isEditable()
+        return not isinstance(watched, TEXT_INPUTS)
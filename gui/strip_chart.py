@@ -0,0 +1,75 @@
+"""
+Live strip chart for a telemetry channel.
+Draws one min/max bar per pixel column, so drawing cost depends on the
+widget width rather than on how many samples are in the window.
+"""
+
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPainter, QPen, QColor
+
+
+class StripChart(QWidget):
+    """Scrolling min/max-decimated plot of one telemetry history channel."""
+    
+    def __init__(self, history, key, y_min, y_max, color="#007bff", thresholds=(), parent=None):
+        super().__init__(parent)
+        self.history = history
+        self.key = key
+        self.y_min = y_min
+        self.y_max = y_max
+        self.color = QColor(color)
+        self.thresholds = thresholds  # (value, color) pairs drawn as dashed lines
+        self.span = 10.0  # Seconds shown, None for the whole session
+        
+        self.setMinimumSize(240, 60)
+    
+    def set_span(self, span):
+        """Set the visible time span in seconds (None shows everything)."""
+        self.span = span
+        self.update()
+    
+    def paintEvent(self, event):
+        """Draw the chart."""
+        painter = QPainter(self)
+        width = self.width()
+        height = self.height()
+        painter.fillRect(0, 0, width, height, QColor("#1e1e1e"))
+        
+        def to_y(value):
+            scale = (value - self.y_min) / (self.y_max - self.y_min)
+            return int(round((height - 1) * (1.0 - min(1.0, max(0.0, scale)))))
+        
+        for value, color in self.thresholds:
+            pen = QPen(QColor(color))
+            pen.setStyle(Qt.DashLine)
+            painter.setPen(pen)
+            y = to_y(value)
+            painter.drawLine(0, y, width, y)
+        
+        buffer = self.history.get(self.key)
+        if buffer is None or len(buffer) == 0:
+            painter.end()
+            return
+        
+        end = self.history.clock()
+        start = buffer.oldest_time() if self.span is None else end - self.span
+        mins, maxs = buffer.decimate_minmax(start, end, width)
+        
+        painter.setPen(QPen(self.color))
+        last_y = None
+        for x in range(width):
+            low = mins[x]
+            if low != low:  # NaN, no samples in this column
+                continue
+            top = to_y(maxs[x])
+            bottom = to_y(low)
+            
+            # Join to the previous column so sparse data still reads as a line
+            if last_y is not None:
+                top = min(top, last_y)
+                bottom = max(bottom, last_y)
+            painter.drawLine(x, top, x, bottom)
+            last_y = to_y((low + maxs[x]) / 2.0)
+        
+        painter.end()
@@ -0,0 +1,81 @@
+"""
+View model for the main window.
+Remembers what each widget currently shows and only calls into Qt when a
+displayed value or color bucket actually changes.
+"""
+
+
+def status_style(color):
+    """Stylesheet for the large status indicators."""
+    return f"color: {color}; font-size: 28px; font-weight: bold;"
+
+
+def battery_color(voltage):
+    """Color bucket for a battery voltage."""
+    if voltage < 10.0:
+        return "red"
+    if voltage < 11.5:
+        return "orange"
+    return "green"
+
+
+def battery_style(voltage):
+    """Stylesheet for the battery voltage label."""
+    return f"font-size: 36px; font-weight: bold; color: {battery_color(voltage)};"
+
+
+class ViewModel:
+    """Diffs widget state before touching Qt.
+    
+    Every change to a widget property managed here must go through the
+    view model, otherwise the cached value goes stale.
+    """
+    
+    def __init__(self):
+        self._shown = {}  # (widget, property) -> displayed value
+        self.applied = 0
+        self.skipped = 0
+    
+    def _changed(self, widget, prop, value):
+        """Record a value and tell whether the widget needs updating."""
+        key = (widget, prop)
+        if key in self._shown and self._shown[key] == value:
+            self.skipped += 1
+            return False
+        self._shown[key] = value
+        self.applied += 1
+        return True
+    
+    def set_text(self, widget, text):
+        """Set a label or button text if it differs from what is shown."""
+        if self._changed(widget, "text", text):
+            widget.setText(text)
+    
+    def set_style(self, widget, style):
+        """Set a stylesheet if it differs (restyling forces a re-polish)."""
+        if self._changed(widget, "style", style):
+            widget.setStyleSheet(style)
+    
+    def set_tooltip(self, widget, text):
+        """Set a tooltip if it differs."""
+        if self._changed(widget, "tooltip", text):
+            widget.setToolTip(text)
+    
+    def set_value(self, widget, value):
+        """Set a progress bar value if it differs."""
+        if self._changed(widget, "value", value):
+            widget.setValue(value)
+    
+    def set_status(self, widget, text, color):
+        """Set the text and color of a status indicator."""
+        self.set_text(widget, text)
+        self.set_style(widget, status_style(color))
+    
+    def get_stats(self):
+        """Get applied/skipped update counts."""
+        total = self.applied + self.skipped
+        return {
+            "applied": self.applied,
+            "skipped": self.skipped,
+            "skipped_percent": 100.0 * self.skipped / total if total else 0.0,
+        }
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+FRC Driver Station - headless edition, no GUI (practice carts, CI).
+
+Same robot connection, controllers, control loop and session recording
+as main.py, without importing Qt. Commands are typed on stdin or sent to
+the control socket:
+    python headless.py                  # Run, take commands from stdin
+    python headless.py --send enable    # Command a running instance
+"""
+
+import time
+
+STARTED = time.monotonic()
+
+import argparse
+import asyncio
+import json
+import sys
+from utils.config import Config
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="FRC Driver Station (headless)")
+    parser.add_argument("--team", type=int, help="team number (saved to the config)")
+    parser.add_argument("--connect", action="store_true",
+                        help="connect at startup (also when connect_on_startup is set)")
+    parser.add_argument("--no-socket", action="store_true", help="do not open the control socket")
+    parser.add_argument("--no-stdin", action="store_true", help="ignore stdin (running as a service)")
+    parser.add_argument("--status-interval", type=float, default=5.0,
+                        help="seconds between status lines, 0 for none")
+    parser.add_argument("--send", nargs=argparse.REMAINDER, metavar="COMMAND",
+                        help="send a command to a running instance, print the reply and exit")
+    return parser.parse_args()
+
+
+def main():
+    """Headless entry point."""
+    args = parse_args()
+    config = Config()
+    
+    from core.headless import HeadlessDriverStation, socket_address, send_command
+    address = socket_address(config)
+    
+    if args.send is not None:
+        try:
+            reply = asyncio.run(send_command(address, " ".join(args.send) or "status"))
+        except (OSError, asyncio.TimeoutError) as e:
+            print(f"No headless driver station at {address}: {e}")
+            sys.exit(2)
+        print(json.dumps(reply, indent=2))
+        sys.exit(0 if reply.get("ok") else 1)
+    
+    if args.team is not None:
+        config.set('team_number', args.team)
+    
+    print("=" * 60)
+    print("FRC Driver Station - Headless")
+    print("=" * 60)
+    print(f"Team Number: {config.get('team_number')}")
+    
+    station = HeadlessDriverStation(config, status_interval=args.status_interval, started=STARTED)
+    station.start()
+    try:
+        asyncio.run(station.run(control_address=None if args.no_socket else address,
+                                use_stdin=not args.no_stdin,
+                                connect=args.connect or config.get('connect_on_startup')))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        station.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,39 +3,215 @@
 FRC Driver Station - Simple Platform-Independent Driver Station
 """
 
+from utils.startup import startup  # First, so the startup clock includes the imports below
+import argparse
 import sys
-from PyQt5.QtWidgets import QApplication
-from gui.main_window import DriverStationWindow
-from network.robot_connection import RobotConnection
-from controllers.controller_manager import ControllerManager
+
+# pygame and NetworkTables are not imported here: the controller input
+# thread and the first connection attempt load them in the background
+with startup.importing("PyQt5"):
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QTimer
+with startup.importing("gui"):
+    from gui.main_window import DriverStationWindow
+with startup.importing("network"):
+    from network.robot_connection import create_robot
+    from network.connection_pool import ConnectionPool
+with startup.importing("controllers"):
+    from controllers.controller_manager import create_controller
+    from core.control_loop import ControlLoop
+with startup.importing("recording"):
+    from recording.recorder import create_recorder
 from utils.config import Config
+startup.mark("imports")
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="FRC Driver Station")
+    parser.add_argument("--replay", metavar="LOG",
+                        help="replay a recorded session log instead of connecting to a robot")
+    parser.add_argument("--speed", default="1",
+                        help="replay speed factor, or 'max' to replay as fast as possible")
+    parser.add_argument("--start", type=float, default=0.0,
+                        help="replay start position in seconds")
+    parser.add_argument("--startup-report", nargs="?", const="-", metavar="PATH",
+                        help="print startup phase and import times once the robot is connected "
+                             "(or the window is up without auto-connect), or save them as JSON")
+    return parser.parse_args()
+
+
+def run_replay(args, config):
+    """Drive the window from a recorded session log."""
+    from recording.replay import (SessionReader, ReplayRobotConnection,
+                                  ReplayControllerManager, ReplayPlayer)
+    from gui.replay_controls import ReplayControls
+    
+    reader = SessionReader(args.replay)
+    print(f"Replaying {args.replay} ({reader.duration:.1f} s, {len(reader.index)} index points)")
+    
+    robot = ReplayRobotConnection(
+        team_number=config.get('team_number'),
+        history_capacity=config.get('telemetry_history_samples', 131072),
+    )
+    controller = ReplayControllerManager()
+    speed = None if args.speed.lower() == "max" else float(args.speed)
+    player = ReplayPlayer(reader, robot, controller, speed=speed)
+    player.start()
+    player.seek(args.start)
+    
+    app = QApplication(sys.argv)
+    app.setApplicationName("FRC Driver Station")
+    app.setOrganizationName("FRC")
+    
+    window = DriverStationWindow(robot, controller, config)
+    window.setWindowTitle(f"FRC Driver Station - Replay {args.replay}")
+    window.centralWidget().layout().insertWidget(0, ReplayControls(player))
+    window.show()
+    window.on_connect_clicked()
+    
+    exit_code = app.exec_()
+    player.stop()
+    reader.close()
+    sys.exit(exit_code)
+
+
+def show_window(window):
+    """Show the window and mark when it is up and when the event loop runs."""
+    window.show()
+    startup.mark("window_shown")
+    QTimer.singleShot(0, lambda: startup.mark("event_loop"))
+
+
+def run_control_worker(config):
+    """Run the window on top of a control worker process.
+    
+    The worker samples the controllers and talks to the robot; this
+    process only draws what it reads from shared memory.
+    """
+    from core.control_worker import (ControlWorker, WorkerRobotConnection,
+                                     WorkerControllerManager, WorkerControlLoop)
+    
+    worker = ControlWorker()
+    robot = WorkerRobotConnection(
+        worker,
+        team_number=config.get('team_number'),
+        telemetry_keys=config.get('telemetry_keys', []),
+        history_capacity=config.get('telemetry_history_samples', 131072),
+        robot_address=config.get('robot_address'),
+        transport=config.get('transport', 'networktables'),
+    )
+    controller = WorkerControllerManager(worker)
+    control_loop = WorkerControlLoop(worker, robot, rate=config.get('control_loop_rate', 50.0))
+    
+    def on_worker_message(message):
+        if message[0] == "config":
+            config.set(message[1], message[2])
+        robot.on_worker_message(message)
+        controller.on_worker_message(message)
+    
+    worker.on_message = on_worker_message
+    worker.start()
+    robot.start_sync()
+    print(f"Team Number: {config.get('team_number')} (control worker pid {worker.process.pid})")
+    
+    app = QApplication(sys.argv)
+    app.setApplicationName("FRC Driver Station")
+    app.setOrganizationName("FRC")
+    
+    window = DriverStationWindow(robot, controller, config, control_loop)
+    window.show()
+    
+    if config.get('connect_on_startup'):
+        # The worker connects in the background; the window stays responsive
+        print("Auto-connecting to robot...")
+        window.on_connect_clicked()
+    
+    print("\nDriver Station Ready!")
+    print("-" * 60)
+    
+    exit_code = app.exec_()
+    robot.stop_sync()
+    worker.stop()  # The worker disables the robot before it exits
+    sys.exit(exit_code)
 
 
 def main():
     """Main application entry point."""
+    args = parse_args()
+    
     print("=" * 60)
     print("FRC Driver Station - Simple Edition")
     print("=" * 60)
     
     # Load configuration
     config = Config()
-    print(f"Team Number: {config.get('team_number')}")
+    startup.mark("config")
+    
+    if args.replay:
+        run_replay(args, config)
+        return
+    
+    robot_configs = config.get('robots') or []
+    if config.get('control_worker'):
+        if robot_configs:
+            print("control_worker does not support several robots, running them in this process")
+        else:
+            run_control_worker(config)
+            return
+    
+    # Initialize robot connections; several robots share one pool thread
+    pool = None
+    if robot_configs:
+        pool = ConnectionPool()
+        for entry in robot_configs:
+            pool.add(create_robot(config, entry))
+        pool.start()
+        robot = pool.connections[0]
+        print(f"Robots: {', '.join(r.name or str(r.team_number) for r in pool.connections)}")
+    else:
+        robot = create_robot(config)
+        print(f"Team Number: {config.get('team_number')}")
+    
+    # Initialize controller manager (started once the window is shown)
+    controller = create_controller(config)
     
-    # Initialize robot connection
-    robot = RobotConnection(team_number=config.get('team_number'))
+    # Send frames at a steady rate from a dedicated thread
+    control_loop = ControlLoop(robot, controller, rate=config.get('control_loop_rate', 50.0))
+    control_loop.start()
     
-    # Initialize controller manager
-    controller = ControllerManager(deadzone=config.get('controller_deadzone', 0.1))
-    controller.start()
+    # Forward input changes to the driven robot as soon as they arrive
+    def on_input_changed(frame):
+        control_loop.robot.send_joystick_data(frame.axes, frame.buttons, frame.captured, frame.shaped)
+    
+    controller.on_input_changed = on_input_changed
     
     # Setup connection callback
     def on_connection_changed(connected):
         if connected:
+            startup.mark("connected")
             print(f"✓ Connected to robot")
         else:
             print("✗ Disconnected from robot")
     
     robot.on_connection_changed = on_connection_changed
+    # The first heartbeat or joystick frame flushed after link up (over UDP,
+    # the control packet the robot answered)
+    robot.on_first_control_frame = lambda: startup.mark("first_control_frame")
+    
+    # Record the session (telemetry, joystick frames, enable/mode changes) of
+    # the first robot
+    recorder = None
+    if config.get('record_sessions'):
+        try:
+            recorder = create_recorder(config)
+            recorder.start()
+            robot.recorder = recorder
+            robot.rate_controller.recorder = recorder
+            recorder.record_state(robot.enabled, robot.mode)
+        except Exception as e:
+            print(f"Session recording disabled: {e}")
+            recorder = None
     
     # Setup controller callback
     def on_controller_changed(connected, name):
@@ -46,27 +222,77 @@ def main():
     
     controller.on_controller_changed = on_controller_changed
     
+    # The controller e-stop button stops every robot, not only the driven one
+    robots = pool.connections if pool else [robot]
+    
+    def on_estop(pressed):
+        for target in robots:
+            target.stop_now(pressed)
+    
+    controller.on_estop = on_estop
+    
     # Create Qt application
     app = QApplication(sys.argv)
     app.setApplicationName("FRC Driver Station")
     app.setOrganizationName("FRC")
     
     # Create main window
-    window = DriverStationWindow(robot, controller, config)
-    window.show()
+    window = DriverStationWindow(robot, controller, config, control_loop)
+    window.stop_targets = robots
+    pool_panel = None
+    if pool:
+        # The window details the first robot; the panel has a row for each
+        from gui.robot_pool_panel import RobotPoolPanel
+        pool_panel = RobotPoolPanel(pool, control_loop, window.view)
+        window.centralWidget().layout().insertWidget(0, pool_panel)
+        window.use_robot_team()
+    show_window(window)
     
-    # Auto-connect if configured
-    if config.get('connect_on_startup'):
+    # Controllers and the connection come up in the background, after the
+    # window: the input thread imports pygame, the connection NetworkTables
+    controller.start(wait=False)
+    connecting = config.get('connect_on_startup')
+    if connecting:
         print("Auto-connecting to robot...")
-        from PyQt5.QtCore import QTimer
-        QTimer.singleShot(500, window.on_connect_clicked)
+        if pool_panel:
+            pool_panel.connect_all()
+        else:
+            window.on_connect_clicked()
+    
+    # Report startup times at the first control frame (or, without
+    # auto-connect, once the event loop runs); phases are marked on other
+    # threads, so the GUI thread checks for the last one
+    report_timer = QTimer()
+    if args.startup_report:
+        last_phase = "first_control_frame" if connecting else "event_loop"
+        
+        def check_startup_report():
+            if last_phase in startup.phases:
+                report_timer.stop()
+                startup.write(args.startup_report)
+        
+        report_timer.timeout.connect(check_startup_report)
+        report_timer.start(10)
     
     print("\nDriver Station Ready!")
     print("Plug in a PS5 or Xbox controller to send commands to the robot.")
     print("-" * 60)
     
     # Run application
-    sys.exit(app.exec_())
+    exit_code = app.exec_()
+    
+    if report_timer.isActive():
+        startup.write(args.startup_report)  # Never got that far; report what there is
+    
+    if pool:
+        pool.stop()
+    
+    if recorder:
+        robot.recorder = None
+        robot.rate_controller.recorder = None
+        recorder.close()
+    
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
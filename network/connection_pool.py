@@ -0,0 +1,104 @@
+"""
+Connection pool for several robots in one driver station process.
+Each RobotConnection owns its NetworkTables instance; the pool runs all of
+their connection state machines, heartbeats and rate control on a single
+thread that sleeps until the earliest deadline or a link event.
+"""
+
+import time
+from threading import Thread, Event, Lock
+from network.connection_state import ConnectionState
+
+
+class ConnectionPool:
+    """Drives RobotConnection.poll() for every robot on one thread.
+    
+    A connection listener or finished discovery of any robot wakes the
+    thread early through wake().
+    """
+    
+    def __init__(self, max_wait=1.0):
+        self.max_wait = max_wait  # Longest sleep between polls
+        self.connections = []
+        self.polls = 0
+        self.poll_time = 0.0  # Seconds spent polling since start
+        self.started = None
+        self._lock = Lock()
+        self._wake_event = Event()
+        self._stop_event = Event()
+        self._thread = None
+    
+    def add(self, connection):
+        """Take over a connection's supervision (before connect())."""
+        connection.pool = self
+        with self._lock:
+            self.connections.append(connection)
+        self.wake()
+    
+    def remove(self, connection):
+        """Disconnect a connection and stop polling it."""
+        connection.disconnect()
+        with self._lock:
+            if connection in self.connections:
+                self.connections.remove(connection)
+        connection.pool = None
+    
+    def wake(self):
+        """Poll all connections now instead of at the next deadline."""
+        self._wake_event.set()
+    
+    def start(self):
+        """Start the pool thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self.started = time.monotonic()
+        self._thread = Thread(target=self._run, name="connection-pool", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Disconnect every robot and stop the pool thread."""
+        with self._lock:
+            connections = list(self.connections)
+        for connection in connections:
+            if connection.state != ConnectionState.IDLE:
+                connection.disconnect()
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+    
+    def _run(self):
+        """Poll every connection, then sleep until the earliest deadline."""
+        while not self._stop_event.is_set():
+            self._wake_event.clear()
+            start = time.monotonic()
+            deadline = start + self.max_wait
+            with self._lock:
+                connections = list(self.connections)
+            for connection in connections:
+                try:
+                    next_poll = connection.poll(start)
+                except Exception as e:
+                    print(f"Error polling robot {connection.team_number}: {e}")
+                    continue
+                if next_poll is not None:
+                    deadline = min(deadline, next_poll)
+            
+            self.polls += 1
+            self.poll_time += time.monotonic() - start
+            self._wake_event.wait(max(0.0, deadline - time.monotonic()))
+    
+    def get_stats(self):
+        """Get robot counts and how much time the pool thread spends polling."""
+        with self._lock:
+            connections = list(self.connections)
+        elapsed = time.monotonic() - self.started if self.started else 0.0
+        return {
+            "robots": len(connections),
+            "connected": sum(1 for connection in connections if connection.connected),
+            "polls": self.polls,
+            "poll_time_ms": 1000.0 * self.poll_time,
+            "busy_percent": 100.0 * self.poll_time / elapsed if elapsed else 0.0,
+        }
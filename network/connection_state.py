@@ -0,0 +1,48 @@
+"""
+Connection state machine helpers for the robot link.
+Defines the connection states and the reconnect backoff policy.
+"""
+
+import random
+
+# Backoff exponent ceiling; 2 ** 64 times any useful initial delay is past any cap
+MAX_EXPONENT = 64
+
+
+class ConnectionState:
+    """Connection states reported by RobotConnection."""
+
+    IDLE = "idle"              # Not trying to connect
+    CONNECTING = "connecting"  # NetworkTables started, waiting for the robot
+    CONNECTED = "connected"    # Link is up
+    LOST = "lost"              # Link dropped while connected
+    BACKOFF = "backoff"        # Waiting before the next connection attempt
+
+    ALL = (IDLE, CONNECTING, CONNECTED, LOST, BACKOFF)
+
+
+class BackoffPolicy:
+    """Jittered exponential backoff between connection attempts."""
+
+    def __init__(self, initial=0.5, maximum=8.0, multiplier=2.0, jitter=0.25):
+        self.initial = initial
+        self.maximum = maximum
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.attempts = 0
+
+    def next_delay(self):
+        """Get the delay before the next attempt and advance the schedule."""
+        delay = min(self.initial * (self.multiplier ** self.attempts), self.maximum)
+        # Stop counting once at the cap (or stuck at a zero initial delay);
+        # a larger exponent would eventually overflow
+        if delay < self.maximum and self.attempts < MAX_EXPONENT:
+            self.attempts += 1
+
+        # Spread retries so several driver stations do not hammer the robot in step
+        spread = delay * self.jitter
+        return max(0.0, delay + random.uniform(-spread, spread))
+
+    def reset(self):
+        """Start over from the initial delay."""
+        self.attempts = 0
@@ -0,0 +1,143 @@
+"""
+Robot discovery.
+Probes every address a robot may be reachable at (mDNS name, 10.TE.AM.2,
+USB, localhost for simulation) at the same time and picks the first one
+that accepts a connection on the NetworkTables port. The winner is cached
+per team and gets a head start next time.
+"""
+
+import socket
+import time
+from threading import Thread, Event, Lock
+
+
+USB_ADDRESS = "172.22.11.2"
+LOCALHOST = "127.0.0.1"
+NT3_PORT = 1735
+
+
+def team_address(team_number):
+    """Static radio address 10.TE.AM.2 of a team."""
+    team_str = str(team_number)
+    if len(team_str) == 4:
+        return f"10.{team_str[:2]}.{team_str[2:]}.2"
+    return f"10.0.{team_str}.2"
+
+
+def mdns_name(team_number):
+    """mDNS host name of a team's roboRIO."""
+    return f"roboRIO-{team_number}-FRC.local"
+
+
+def default_candidates(team_number):
+    """Addresses to try, in order of preference."""
+    return [mdns_name(team_number), team_address(team_number), USB_ADDRESS, LOCALHOST]
+
+
+class RobotDiscovery:
+    """Races connection probes to all candidate addresses.
+    
+    cache maps team numbers (as strings) to the candidate that answered
+    last time; it is updated in place and reported through on_cache_changed
+    so the caller can persist it.
+    """
+    
+    def __init__(self, port=NT3_PORT, cache=None, candidates=None, head_start=0.1,
+                 retry_interval=0.1):
+        self.port = port
+        self.cache = cache if cache is not None else {}
+        self.candidates = candidates  # Fixed candidate list instead of the defaults
+        self.head_start = head_start  # Seconds before the others join the cached candidate
+        self.retry_interval = retry_interval
+        self.results = {}  # candidate -> outcome of the last discovery
+        
+        # Callbacks
+        self.on_cache_changed = None  # Called with the cache after a new winner
+    
+    def candidates_for(self, team_number):
+        """Candidate list for a team, the cached winner first."""
+        candidates = list(self.candidates or default_candidates(team_number))
+        cached = self.cache.get(str(team_number))
+        if cached:
+            if cached in candidates:
+                candidates.remove(cached)
+            candidates.insert(0, cached)
+        return candidates
+    
+    def discover(self, team_number, timeout=5.0, stop_event=None):
+        """Probe all candidates; return (candidate, ip, seconds) or None.
+        
+        Blocks until one answers, the timeout passes or stop_event is set.
+        """
+        candidates = self.candidates_for(team_number)
+        cached = self.cache.get(str(team_number))
+        start = time.monotonic()
+        deadline = start + timeout
+        found = Event()
+        lock = Lock()
+        winner = []
+        self.results = {candidate: "not tried" for candidate in candidates}
+        
+        def probe(candidate, delay):
+            if delay and found.wait(delay):
+                return
+            self.results[candidate] = "no answer"
+            ip = self._resolve(candidate, deadline, found)
+            if ip is None:
+                return
+            while not found.is_set() and time.monotonic() < deadline:
+                if stop_event is not None and stop_event.is_set():
+                    return
+                remaining = deadline - time.monotonic()
+                try:
+                    with socket.create_connection((ip, self.port), timeout=max(0.05, min(1.0, remaining))):
+                        pass
+                except OSError as e:
+                    self.results[candidate] = f"{ip}: {e.strerror or e}"
+                    found.wait(self.retry_interval)
+                    continue
+                elapsed = time.monotonic() - start
+                with lock:
+                    won = not winner
+                    if won:
+                        winner.append((candidate, ip, elapsed))
+                        found.set()
+                self.results[candidate] = (f"{ip}: answered after {1000.0 * elapsed:.0f} ms" +
+                                           ("" if won else ", too late"))
+                return
+        
+        for candidate in candidates:
+            delay = self.head_start if cached and candidate != cached else 0.0
+            Thread(target=probe, args=(candidate, delay), name=f"discover-{candidate}",
+                   daemon=True).start()
+        
+        while not found.is_set() and time.monotonic() < deadline:
+            if stop_event is not None and stop_event.is_set():
+                break
+            found.wait(0.05)
+        found.set()  # Release probes that are still waiting
+        
+        if not winner:
+            return None
+        candidate, ip, elapsed = winner[0]
+        if self.cache.get(str(team_number)) != candidate:
+            self.cache[str(team_number)] = candidate
+            if self.on_cache_changed:
+                self.on_cache_changed(self.cache)
+        return candidate, ip, elapsed
+    
+    def _resolve(self, candidate, deadline, found):
+        """Resolve a host name to an IPv4 address (mDNS names may take a while)."""
+        try:
+            socket.inet_aton(candidate)
+            return candidate
+        except OSError:
+            pass
+        try:
+            infos = socket.getaddrinfo(candidate, self.port, socket.AF_INET, socket.SOCK_STREAM)
+        except socket.gaierror:
+            self.results[candidate] = "not resolved"
+            return None
+        if found.is_set() or time.monotonic() > deadline:
+            return None
+        return infos[0][4][0]
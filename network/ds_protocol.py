@@ -0,0 +1,228 @@
+"""
+FRC driver station UDP packet format.
+Encodes the control packets a driver station sends to the roboRIO (port
+1110, every 20 ms) and decodes the status packets the roboRIO answers with
+(port 1150). Both carry a 16-bit sequence number, the reply echoing the
+one it answers, so trip times can be measured per packet.
+"""
+
+import struct
+from collections import namedtuple
+from datetime import datetime
+
+
+ROBOT_PORT = 1110  # roboRIO listens for control packets here
+DS_PORT = 1150  # Driver station listens for status packets here
+COMM_VERSION = 0x01
+
+# Control byte (DS -> robot) and status byte (robot -> DS)
+CONTROL_ESTOP = 0x80
+CONTROL_FMS_ATTACHED = 0x08
+CONTROL_ENABLED = 0x04
+STATUS_ESTOP = 0x80
+STATUS_BROWNOUT = 0x10
+STATUS_CODE_START = 0x08
+STATUS_ENABLED = 0x04
+MODE_BITS = {"teleop": 0x00, "test": 0x01, "auto": 0x02}
+
+# Request byte (DS -> robot)
+REQUEST_RESTART_CODE = 0x04
+REQUEST_REBOOT = 0x08
+
+# Trace byte (robot -> DS)
+TRACE_ROBOT_CODE = 0x20
+TRACE_IS_ROBORIO = 0x10
+TRACE_TEST = 0x08
+TRACE_AUTO = 0x04
+TRACE_TELEOP = 0x02
+TRACE_DISABLED = 0x01
+
+# Tags
+TAG_COUNTDOWN = 0x07
+TAG_JOYSTICK = 0x0C
+TAG_DATE = 0x0F
+TAG_TIMEZONE = 0x10
+TAG_CPU = 0x05
+TAG_RAM = 0x06
+
+# Limits of the joystick tag
+MAX_JOYSTICKS = 6
+MAX_AXES = 12
+MAX_BUTTONS = 32
+
+STATUS_HEADER = struct.Struct(">HBBBBBB")
+
+RobotStatus = namedtuple("RobotStatus", "sequence estop brownout code_start enabled mode "
+                                        "robot_code trace battery request_date tags")
+
+
+def station_byte(alliance, station):
+    """Alliance station number: 0-2 red 1-3, 3-5 blue 1-3."""
+    index = min(max(int(station), 1), 3) - 1
+    return index + (3 if alliance == "blue" else 0)
+
+
+def encode_axis(value):
+    """Scale an axis value in [-1, 1] to a signed byte."""
+    scaled = round(value * (127 if value >= 0 else 128))
+    return min(max(scaled, -128), 127)
+
+
+def encode_joystick(axes, buttons):
+    """Joystick tag (without the size byte) for one controller."""
+    axes = list(axes)[:MAX_AXES]
+    buttons = list(buttons)[:MAX_BUTTONS]
+    mask = 0
+    for i, pressed in enumerate(buttons):
+        if pressed:
+            mask |= 1 << i
+    nbytes = (len(buttons) + 7) // 8
+    data = bytearray((TAG_JOYSTICK, len(axes)))
+    data.extend(struct.pack(f">{len(axes)}b", *(encode_axis(v) for v in axes)))
+    data.append(len(buttons))
+    data.extend(mask.to_bytes(nbytes, "big"))
+    data.append(0)  # No POV hats
+    return bytes(data)
+
+
+def encode_date(now=None):
+    """Date tag (without the size byte), sent when the robot asks for it."""
+    now = now or datetime.now()
+    return struct.pack(">BIBBBBBB", TAG_DATE, now.microsecond, now.second, now.minute,
+                       now.hour, now.day, now.month - 1, now.year - 1900)
+
+
+def encode_timezone(name):
+    """Timezone tag (without the size byte)."""
+    return bytes((TAG_TIMEZONE,)) + name.encode("ascii", "replace")
+
+
+def encode_control(sequence, enabled, mode, estop=False, station=0, request=0,
+                   joysticks=(), extra_tags=()):
+    """Build one control packet.
+    
+    joysticks is a sequence of (axes, buttons) per slot; extra_tags are
+    already encoded tags (id and data) such as the date.
+    """
+    control = MODE_BITS.get(mode, 0)
+    if enabled and not estop:
+        control |= CONTROL_ENABLED
+    if estop:
+        control |= CONTROL_ESTOP
+    packet = bytearray(struct.pack(">HBBBB", sequence & 0xFFFF, COMM_VERSION, control,
+                                   request, station))
+    for tag in extra_tags:
+        packet.append(len(tag))
+        packet.extend(tag)
+    for axes, buttons in list(joysticks)[:MAX_JOYSTICKS]:
+        tag = encode_joystick(axes, buttons)
+        packet.append(len(tag))
+        packet.extend(tag)
+    return bytes(packet)
+
+
+def decode_control(packet):
+    """Parse a control packet (used by the stand-in roboRIO).
+    
+    Returns (sequence, enabled, mode, estop, request, station, joysticks, tags)
+    with joysticks as (axes, buttons) per slot, axes back in [-1, 1].
+    """
+    sequence, version, control, request, station = struct.unpack_from(">HBBBB", packet)
+    mode = {bits: name for name, bits in MODE_BITS.items()}.get(control & 0x03, "teleop")
+    joysticks = []
+    tags = {}
+    for tag_id, data in iter_tags(packet, 6):
+        if tag_id == TAG_JOYSTICK:
+            joysticks.append(decode_joystick(data))
+        else:
+            tags[tag_id] = data
+    return (sequence, bool(control & CONTROL_ENABLED), mode, bool(control & CONTROL_ESTOP),
+            request, station, joysticks, tags)
+
+
+def decode_joystick(data):
+    """Parse the data of a joystick tag into (axes, buttons)."""
+    naxes = data[0]
+    axes = [v / (127.0 if v >= 0 else 128.0) for v in struct.unpack_from(f">{naxes}b", data, 1)]
+    offset = 1 + naxes
+    nbuttons = data[offset]
+    nbytes = (nbuttons + 7) // 8
+    mask = int.from_bytes(data[offset + 1:offset + 1 + nbytes], "big")
+    buttons = [bool(mask & (1 << i)) for i in range(nbuttons)]
+    return axes, buttons
+
+
+def iter_tags(packet, offset):
+    """Yield (tag id, data) for each size-prefixed tag from offset on."""
+    while offset < len(packet):
+        size = packet[offset]
+        if size == 0 or offset + 1 + size > len(packet):
+            return
+        yield packet[offset + 1], packet[offset + 2:offset + 1 + size]
+        offset += 1 + size
+
+
+def encode_status(sequence, enabled, mode, battery, estop=False, brownout=False,
+                  robot_code=True, request_date=False, tags=()):
+    """Build a roboRIO status packet (used by the stand-in roboRIO)."""
+    status = MODE_BITS.get(mode, 0)
+    if enabled:
+        status |= STATUS_ENABLED
+    if estop:
+        status |= STATUS_ESTOP
+    if brownout:
+        status |= STATUS_BROWNOUT
+    trace = TRACE_IS_ROBORIO
+    if robot_code:
+        trace |= TRACE_ROBOT_CODE
+    if not enabled:
+        trace |= TRACE_DISABLED
+    else:
+        trace |= {"teleop": TRACE_TELEOP, "auto": TRACE_AUTO, "test": TRACE_TEST}.get(mode, 0)
+    whole = int(battery)
+    fraction = min(int(round((battery - whole) * 256)), 255)
+    packet = bytearray(STATUS_HEADER.pack(sequence & 0xFFFF, COMM_VERSION, status, trace,
+                                          whole, fraction, 1 if request_date else 0))
+    for tag in tags:
+        packet.append(len(tag))
+        packet.extend(tag)
+    return bytes(packet)
+
+
+def encode_cpu(usage):
+    """CPU tag (without the size byte): one CPU, usage percent as normal priority."""
+    return struct.pack(">BBffff", TAG_CPU, 1, 0.0, 0.0, usage, 0.0)
+
+
+def decode_status(packet):
+    """Parse a roboRIO status packet into a RobotStatus, or None if malformed."""
+    if len(packet) < STATUS_HEADER.size:
+        return None
+    sequence, version, status, trace, whole, fraction, request = STATUS_HEADER.unpack_from(packet)
+    if version != COMM_VERSION:
+        return None
+    mode = {bits: name for name, bits in MODE_BITS.items()}.get(status & 0x03, "teleop")
+    return RobotStatus(
+        sequence=sequence,
+        estop=bool(status & STATUS_ESTOP),
+        brownout=bool(status & STATUS_BROWNOUT),
+        code_start=bool(status & STATUS_CODE_START),
+        enabled=bool(status & STATUS_ENABLED),
+        mode=mode,
+        robot_code=bool(trace & TRACE_ROBOT_CODE),
+        trace=trace,
+        battery=whole + fraction / 256.0,
+        request_date=bool(request & 0x01),
+        tags=dict(iter_tags(packet, STATUS_HEADER.size)),
+    )
+
+
+def decode_cpu(data):
+    """Average CPU usage in percent from a CPU tag."""
+    count = data[0]
+    if count == 0 or len(data) < 1 + 16 * count:
+        return None
+    total = 0.0
+    for i in range(count):
+        total += sum(struct.unpack_from(">ffff", data, 1 + 16 * i))
+    return total / count
@@ -0,0 +1,226 @@
+"""
+Heartbeat channel between the driver station and the robot.
+The driver station writes a sequence number to DriverStation/Heartbeat;
+robot code copies it back to DriverStation/HeartbeatEcho (HeartbeatEcho
+below is a reference implementation). Matching echoes to sends gives the
+round-trip time, the share of heartbeats that never came back and how
+long ago the robot was last heard from.
+"""
+
+import time
+from collections import deque
+from threading import Thread, Event, Lock, Timer
+
+
+HEARTBEAT_KEY = "Heartbeat"
+ECHO_KEY = "HeartbeatEcho"
+
+
+class HeartbeatMonitor:
+    """Sends heartbeats and measures their echoes.
+    
+    Staleness is only enforced once the robot has echoed at least one
+    heartbeat on the current connection, so robot code without an echo
+    keeps working (just without the protection).
+    """
+    
+    def __init__(self, rate=10.0, timeout=0.5, window=100):
+        self.rate = rate
+        self.timeout = timeout  # Echo age that counts as stale, 0 to never go stale
+        self.window = window
+        
+        self.table = None
+        self.sequence = 0
+        self.established = False
+        self.stale = False
+        self.last_echo_time = None
+        self.last_rtt = None
+        self.sent = 0
+        self.received = 0
+        
+        self._flush = None
+        self._pending = {}  # sequence -> send time
+        self._rtts = deque(maxlen=window)
+        self._outcomes = deque(maxlen=window)  # True = echoed, False = lost
+        self._next_send = None
+        self._lock = Lock()
+        self._stop_event = Event()
+        self._thread = None
+        
+        # Callbacks
+        self.on_stale = None  # Called with the echo age (s) when the heartbeat goes stale
+    
+    def start(self, table, flush=None, threaded=True):
+        """Start sending on a DriverStation table (after the link is up).
+        
+        With threaded=False no thread is started and the caller sends
+        through poll() instead (see ConnectionPool).
+        """
+        self.stop()
+        with self._lock:
+            self.table = table
+            self._flush = flush
+            self.established = False
+            self.stale = False
+            self.last_echo_time = None
+            self.last_rtt = None
+            self._pending.clear()
+            self._rtts.clear()
+            self._outcomes.clear()
+        
+        table.addEntryListener(self._on_echo, immediateNotify=False, key=ECHO_KEY)
+        self._next_send = time.monotonic()
+        if not threaded:
+            return
+        self._stop_event.clear()
+        self._thread = Thread(target=self._run, name="heartbeat", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop sending (link lost or disconnecting)."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self.table is not None:
+            try:
+                self.table.removeEntryListener(self._on_echo)
+            except Exception:
+                pass
+            self.table = None
+        self._next_send = None
+    
+    def _run(self):
+        """Send at a fixed rate until stopped."""
+        while not self._stop_event.is_set():
+            deadline = self.poll(time.monotonic())
+            if deadline is None:
+                break
+            self._stop_event.wait(max(0.0, deadline - time.monotonic()))
+    
+    def poll(self, now):
+        """Send if a heartbeat is due and watch for lost and stale echoes.
+        
+        Returns the time the next heartbeat is due, None when stopped.
+        """
+        if self.table is None or self._next_send is None:
+            return None
+        if now >= self._next_send:
+            self._send(now)
+            self._expire(now)
+            self._check_stale(now)
+            
+            period = 1.0 / self.rate
+            self._next_send += period
+            if self._next_send < now:
+                self._next_send = now + period
+        return self._next_send
+    
+    def _send(self, now):
+        """Write the next sequence number and flush it out."""
+        with self._lock:
+            self.sequence += 1
+            sequence = self.sequence
+            self._pending[sequence] = now
+            self.sent += 1
+        try:
+            self.table.putNumber(HEARTBEAT_KEY, sequence)
+            if self._flush:
+                self._flush()
+        except Exception as e:
+            print(f"Error sending heartbeat: {e}")
+    
+    def _on_echo(self, table, key, value, is_new):
+        """Match an echo to its heartbeat (NetworkTables listener thread)."""
+        now = time.monotonic()
+        try:
+            sequence = int(value)
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            sent = self._pending.pop(sequence, None)
+            if sent is None:
+                return  # Late or repeated echo
+            # Older heartbeats still pending were overwritten before the robot saw them
+            for older in [s for s in self._pending if s < sequence]:
+                del self._pending[older]
+                self._outcomes.append(False)
+            self.last_rtt = now - sent
+            self._rtts.append(self.last_rtt)
+            self._outcomes.append(True)
+            self.last_echo_time = now
+            self.received += 1
+            self.established = True
+            self.stale = False
+    
+    def _expire(self, now):
+        """Count heartbeats without an echo after a second as lost."""
+        limit = max(1.0, 2 * self.timeout)
+        with self._lock:
+            for sequence in [s for s, sent in self._pending.items() if now - sent > limit]:
+                del self._pending[sequence]
+                self._outcomes.append(False)
+    
+    def _check_stale(self, now):
+        """Report once when the last echo gets older than the timeout."""
+        if not self.established or self.timeout <= 0 or self.stale:
+            return
+        age = now - self.last_echo_time
+        if age > self.timeout:
+            self.stale = True
+            if self.on_stale:
+                self.on_stale(age)
+    
+    def get_age(self):
+        """Seconds since the last echo, or None before the first one."""
+        if self.last_echo_time is None:
+            return None
+        return time.monotonic() - self.last_echo_time
+    
+    def snapshot(self):
+        """Get RTT, loss and staleness figures as a dictionary."""
+        age = self.get_age()
+        with self._lock:
+            rtts = sorted(self._rtts)
+            outcomes = list(self._outcomes)
+        lost = outcomes.count(False)
+        return {
+            "established": self.established,
+            "stale": self.stale,
+            "age_ms": None if age is None else 1000.0 * age,
+            "rtt_ms": None if self.last_rtt is None else 1000.0 * self.last_rtt,
+            "rtt_mean_ms": 1000.0 * sum(rtts) / len(rtts) if rtts else None,
+            "rtt_max_ms": 1000.0 * rtts[-1] if rtts else None,
+            "loss_percent": 100.0 * lost / len(outcomes) if outcomes else 0.0,
+            "sent": self.sent,
+            "received": self.received,
+        }
+
+
+class HeartbeatEcho:
+    """Robot-side reference echo: copies Heartbeat back to HeartbeatEcho.
+    
+    For robot code written in Python (RobotPy or a stand-in robot); the
+    README has the same few lines for Java.
+    """
+    
+    def __init__(self, table, flush=None, delay=0.0):
+        self.table = table
+        self.flush = flush
+        self.delay = delay  # Artificial delay in seconds, for testing
+        self.echoed = 0
+        table.addEntryListener(self._on_heartbeat, immediateNotify=False, key=HEARTBEAT_KEY)
+    
+    def _on_heartbeat(self, table, key, value, is_new):
+        """Echo one heartbeat."""
+        if self.delay:
+            Timer(self.delay, self._echo, (value,)).start()
+        else:
+            self._echo(value)
+    
+    def _echo(self, value):
+        """Write the echo and push it out."""
+        self.table.putNumber(ECHO_KEY, value)
+        if self.flush:
+            self.flush()
+        self.echoed += 1
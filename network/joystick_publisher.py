@@ -0,0 +1,226 @@
+"""
+Joystick publishing for the NetworkTables link.
+Packs the state of every controller slot into a single entry, quantizes
+axes and skips frames that did not change, while keeping count of what
+went out.
+"""
+
+import time
+from threading import Lock
+
+
+# Per-robot bandwidth cap enforced by the FMS radio (4 Mbit/s), in bytes/s
+FMS_BANDWIDTH_CAP = 4000000 // 8
+
+# NT3 entry update header: message type (1) + entry id (2) + sequence (2) + value type (1)
+NT_UPDATE_OVERHEAD = 6
+NT_DOUBLE_SIZE = 8
+NT_BOOLEAN_SIZE = 1
+
+PUBLISH_MODES = ("packed", "legacy")
+
+
+def _double_array_size(count):
+    """Wire size of a double array value (1 byte count + 8 bytes per item)."""
+    return 1 + NT_DOUBLE_SIZE * count
+
+
+class PublishStats:
+    """Rolling per-second counters for outgoing NetworkTables writes."""
+    
+    def __init__(self):
+        self._lock = Lock()
+        self._window_start = time.monotonic()
+        self._writes = 0
+        self._bytes = 0
+        self._legacy_bytes = 0
+        
+        # Values for the last complete one-second window
+        self.writes_per_second = 0
+        self.bytes_per_second = 0
+        self.legacy_bytes_per_second = 0
+        
+        # Totals since creation
+        self.total_writes = 0
+        self.total_bytes = 0
+        self.frames = 0
+        self.suppressed_frames = 0
+        self.throttled_frames = 0
+    
+    def add(self, writes, nbytes, legacy_bytes, throttled=False):
+        """Account for one send_joystick_data call."""
+        with self._lock:
+            self._roll(time.monotonic())
+            self._writes += writes
+            self._bytes += nbytes
+            self._legacy_bytes += legacy_bytes
+            self.total_writes += writes
+            self.total_bytes += nbytes
+            self.frames += 1
+            if throttled:
+                self.throttled_frames += 1
+            elif writes == 0:
+                self.suppressed_frames += 1
+    
+    def _roll(self, now):
+        """Close the current window if a second has passed."""
+        elapsed = now - self._window_start
+        if elapsed < 1.0:
+            return
+        
+        if elapsed < 2.0:
+            self.writes_per_second = self._writes
+            self.bytes_per_second = self._bytes
+            self.legacy_bytes_per_second = self._legacy_bytes
+        else:
+            # Nothing was sent during the last full second
+            self.writes_per_second = 0
+            self.bytes_per_second = 0
+            self.legacy_bytes_per_second = 0
+        
+        self._window_start = now
+        self._writes = 0
+        self._bytes = 0
+        self._legacy_bytes = 0
+    
+    def snapshot(self):
+        """Get the latest per-second figures as a dictionary."""
+        with self._lock:
+            self._roll(time.monotonic())
+            return {
+                "writes_per_second": self.writes_per_second,
+                "bytes_per_second": self.bytes_per_second,
+                "legacy_bytes_per_second": self.legacy_bytes_per_second,
+                "saved_bytes_per_second": max(0, self.legacy_bytes_per_second - self.bytes_per_second),
+                "fms_cap_percent": 100.0 * self.bytes_per_second / FMS_BANDWIDTH_CAP,
+                "total_writes": self.total_writes,
+                "total_bytes": self.total_bytes,
+                "frames": self.frames,
+                "suppressed_frames": self.suppressed_frames,
+                "throttled_frames": self.throttled_frames,
+            }
+
+
+class JoystickPublisher:
+    """Writes joystick frames to the DriverStation table.
+    
+    In "packed" mode a frame is a single number array, Joystick/Packed:
+        
+        frame counter, slot count,
+        then per slot: axis count, axes..., button count, button bitmask
+    
+    so all controllers are updated by one atomic write. In "legacy" mode the
+    per-key Joystick/AxisN and Joystick/ButtonN entries are kept for slot 0
+    (JoystickS/... for slot S). Both modes only write when a (quantized)
+    value changed since the last frame, and at most max_rate times per
+    second when a rate limit is set (see RateController).
+    """
+    
+    def __init__(self, mode="legacy", quantization=0.01):
+        if mode not in PUBLISH_MODES:
+            print(f"Unknown joystick publish mode '{mode}', using legacy")
+            mode = "legacy"
+        self.mode = mode
+        self.quantization = quantization
+        self.max_rate = None  # Frames/s, None for no limit
+        self.frame_counter = 0
+        self.stats = PublishStats()
+        
+        # Frames can come from the input thread and the GUI timer
+        self._lock = Lock()
+        
+        self._last_packed = None
+        self._last_axes = {}  # slot -> axes (legacy mode)
+        self._last_buttons = {}  # slot -> buttons (legacy mode)
+        self._last_write = 0.0
+    
+    def reset(self):
+        """Forget the last published frame so the next one is sent in full."""
+        self._last_write = 0.0
+        self._last_packed = None
+        self._last_axes = {}
+        self._last_buttons = {}
+    
+    def quantize(self, value):
+        """Snap an axis value to the configured quantization step."""
+        if self.quantization <= 0:
+            return float(value)
+        return round(value / self.quantization) * self.quantization
+    
+    def publish(self, table, axes, buttons):
+        """Write one joystick frame, skipping anything that did not change.
+        
+        axes and buttons hold one sequence per controller slot. Frames
+        arriving faster than max_rate are dropped; the next frame carries
+        the latest state anyway.
+        """
+        max_rate = self.max_rate
+        if max_rate and time.monotonic() - self._last_write < 1.0 / max_rate:
+            self.stats.add(0, 0, 0, throttled=True)
+            return 0
+        
+        quantize = self.quantize
+        axes = [tuple(quantize(value) for value in slot_axes) for slot_axes in axes]
+        legacy_bytes = 0
+        for slot_axes, slot_buttons in zip(axes, buttons):
+            legacy_bytes += (len(slot_axes) * (NT_UPDATE_OVERHEAD + NT_DOUBLE_SIZE) +
+                             len(slot_buttons) * (NT_UPDATE_OVERHEAD + NT_BOOLEAN_SIZE))
+        
+        with self._lock:
+            if self.mode == "packed":
+                writes, nbytes = self._publish_packed(table, axes, buttons)
+            else:
+                writes, nbytes = self._publish_legacy(table, axes, buttons)
+            if writes:
+                self._last_write = time.monotonic()
+        
+        self.stats.add(writes, nbytes, legacy_bytes)
+        return writes
+    
+    def _publish_packed(self, table, axes, buttons):
+        """Write every slot as one number array with a frame counter."""
+        packed = [len(axes)]
+        for slot_axes, slot_buttons in zip(axes, buttons):
+            mask = 0
+            for i, pressed in enumerate(slot_buttons):
+                if pressed:
+                    mask |= 1 << i
+            packed.append(len(slot_axes))
+            packed.extend(slot_axes)
+            packed.append(len(slot_buttons))
+            packed.append(mask)
+        
+        if packed == self._last_packed:
+            return 0, 0
+        self._last_packed = packed
+        
+        self.frame_counter += 1
+        table.putNumberArray("Joystick/Packed", [self.frame_counter] + packed)
+        return 1, NT_UPDATE_OVERHEAD + _double_array_size(len(packed) + 1)
+    
+    def _publish_legacy(self, table, axes, buttons):
+        """Write only the per-key axis and button entries that changed."""
+        writes = 0
+        nbytes = 0
+        
+        for slot, (slot_axes, slot_buttons) in enumerate(zip(axes, buttons)):
+            prefix = "Joystick" if slot == 0 else f"Joystick{slot}"
+            last_axes = self._last_axes.get(slot, ())
+            last_buttons = self._last_buttons.get(slot, ())
+            
+            for i, value in enumerate(slot_axes):
+                if i >= len(last_axes) or last_axes[i] != value:
+                    table.putNumber(f"{prefix}/Axis{i}", value)
+                    writes += 1
+                    nbytes += NT_UPDATE_OVERHEAD + NT_DOUBLE_SIZE
+            
+            slot_buttons = tuple(bool(pressed) for pressed in slot_buttons)
+            for i, pressed in enumerate(slot_buttons):
+                if i >= len(last_buttons) or last_buttons[i] != pressed:
+                    table.putBoolean(f"{prefix}/Button{i}", pressed)
+                    writes += 1
+                    nbytes += NT_UPDATE_OVERHEAD + NT_BOOLEAN_SIZE
+            
+            self._last_axes[slot] = slot_axes
+            self._last_buttons[slot] = slot_buttons
+        return writes, nbytes
@@ -0,0 +1,227 @@
+"""
+NetworkTables 4 backend (pyntcore) with the NT3 calls RobotConnection uses.
+Values are written through typed topic publishers that send every change,
+batched by NT4 once per publish period, and telemetry is read through
+subscribers with an explicit update period instead of NT3's global rate.
+"""
+
+import os
+import tempfile
+
+try:
+    import ntcore
+except ImportError:  # Optional dependency, only needed with networktables_version 4
+    ntcore = None
+
+
+NT4_PORT = 5810
+
+
+class NT4Table:
+    """A table on an NT4 instance, offering the NT3 table methods.
+    
+    Each key gets one typed publisher, created on its first write and
+    reused afterwards.
+    """
+    
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+        self._table = client.instance.getTable(name)
+        self.period = client.table_periods.get(name, client.telemetry_period)
+        self.key_periods = {}  # key -> period replacing the table's (set_key_period)
+        self._publishers = {}  # key -> typed publisher
+        self._listeners = {}  # callback -> [(listener handle, subscriber, key)]
+    
+    def _path(self, key):
+        """Full topic name of a key."""
+        return f"/{self.name}/{key}"
+    
+    def _publish(self, key, get_topic, value):
+        """Write a value through the key's publisher."""
+        publisher = self._publishers.get(key)
+        if publisher is None:
+            topic = get_topic(self._path(key))
+            publisher = topic.publish(ntcore.PubSubOptions(sendAll=True,
+                                                           periodic=self.client.publish_period))
+            self._publishers[key] = publisher
+        publisher.set(value)
+        return True
+    
+    def putNumber(self, key, value):
+        """Publish a double."""
+        return self._publish(key, self.client.instance.getDoubleTopic, float(value))
+    
+    def putBoolean(self, key, value):
+        """Publish a boolean."""
+        return self._publish(key, self.client.instance.getBooleanTopic, bool(value))
+    
+    def putString(self, key, value):
+        """Publish a string."""
+        return self._publish(key, self.client.instance.getStringTopic, str(value))
+    
+    def putNumberArray(self, key, value):
+        """Publish a double array (joystick frames)."""
+        return self._publish(key, self.client.instance.getDoubleArrayTopic, [float(v) for v in value])
+    
+    def putStringArray(self, key, value):
+        """Publish a string array."""
+        return self._publish(key, self.client.instance.getStringArrayTopic, list(value))
+    
+    def getNumber(self, key, default):
+        """Latest double value of a key."""
+        return self._table.getNumber(key, default)
+    
+    def getBoolean(self, key, default):
+        """Latest boolean value of a key."""
+        return self._table.getBoolean(key, default)
+    
+    def getString(self, key, default):
+        """Latest string value of a key."""
+        return self._table.getString(key, default)
+    
+    def getNumberArray(self, key, default):
+        """Latest double array value of a key."""
+        return self._table.getNumberArray(key, default)
+    
+    def getStringArray(self, key, default):
+        """Latest string array value of a key."""
+        return self._table.getStringArray(key, default)
+    
+    def addEntryListener(self, listener, immediateNotify=False, key=None, period=None):
+        """Call listener(table, key, value, is_new) for every update of a key.
+        
+        The subscription asks the server for updates every `period`
+        seconds (by default the key's period, see set_key_period, or the
+        table's).
+        """
+        subscription = self._subscribe(listener, key, period or self.key_periods.get(key, self.period),
+                                       immediateNotify)
+        self._listeners.setdefault(listener, []).append(subscription)
+    
+    def _subscribe(self, listener, key, period, immediate):
+        """Subscribe to a key for a listener; returns (handle, subscriber, key)."""
+        instance = self.client.instance
+        options = ntcore.PubSubOptions(periodic=period)
+        subscriber = instance.getTopic(self._path(key)).genericSubscribe(options)
+        mask = ntcore.EventFlags.kValueAll
+        if immediate:
+            mask |= ntcore.EventFlags.kImmediate
+        
+        def on_event(event):
+            listener(self, key, event.data.value.value(), False)
+        
+        return instance.addListener(subscriber, mask, on_event), subscriber, key
+    
+    def set_key_period(self, key, period):
+        """Ask for updates of a key every `period` seconds (None for the table's period).
+        
+        NT4 fixes the period when subscribing, so the key's listeners are
+        subscribed again; the new subscriber is made before the old one is
+        released, so no update is missed.
+        """
+        if period == self.key_periods.get(key):
+            return
+        if period is None:
+            self.key_periods.pop(key, None)
+        else:
+            self.key_periods[key] = period
+        for listener, subscriptions in list(self._listeners.items()):
+            for i, (handle, subscriber, subscribed_key) in enumerate(subscriptions):
+                if subscribed_key == key:
+                    subscriptions[i] = self._subscribe(listener, key, period or self.period, False)
+                    self.client.instance.removeListener(handle)
+    
+    def removeEntryListener(self, listener):
+        """Remove every subscription made for a listener."""
+        # Subscribers are released with their last reference
+        for handle, subscriber, key in self._listeners.pop(listener, []):
+            self.client.instance.removeListener(handle)
+    
+    def close(self):
+        """Release all publishers and subscriptions."""
+        for listener in list(self._listeners):
+            self.removeEntryListener(listener)
+        for publisher in self._publishers.values():
+            publisher.close()
+        self._publishers.clear()
+
+
+class NT4Client:
+    """NT4 connection with the NetworkTables (NT3 singleton) methods.
+    
+    RobotConnection and the stand-in robot use it in place of the
+    pynetworktables module; every initialize() creates a new instance.
+    """
+    
+    def __init__(self, identity="frc-driverstation", port=NT4_PORT, publish_period=0.005,
+                 telemetry_period=0.05):
+        if ntcore is None:
+            raise ImportError("NetworkTables 4 needs pyntcore (pip install pyntcore)")
+        self.identity = identity
+        self.port = port
+        self.publish_period = publish_period  # Batching interval for our writes
+        self.telemetry_period = telemetry_period  # Update period requested for subscriptions
+        # Heartbeats and control entries are read at the publish period instead
+        self.table_periods = {"DriverStation": publish_period}
+        self.instance = None
+        self._tables = {}
+        self._connection_listeners = []
+    
+    def initialize(self, server=None, listen_address=""):
+        """Connect to a server, or run as the server when none is given."""
+        self.shutdown()
+        self.instance = ntcore.NetworkTableInstance.create()
+        if server:
+            self.instance.startClient4(self.identity)
+            self.instance.setServer(server, self.port)
+        else:
+            name = f"{self.identity}-{listen_address}" if listen_address else self.identity
+            persist = os.path.join(tempfile.gettempdir(), f"{name}-nt4.json")
+            self.instance.startServer(persist, listen_address, ntcore.NetworkTableInstance.kDefaultPort3,
+                                      self.port)
+        return True
+    
+    def shutdown(self):
+        """Close the connection and release the instance."""
+        if self.instance is None:
+            return
+        for table in self._tables.values():
+            table.close()
+        self._tables.clear()
+        for handle in self._connection_listeners:
+            self.instance.removeListener(handle)
+        self._connection_listeners = []
+        ntcore.NetworkTableInstance.destroy(self.instance)
+        self.instance = None
+    
+    def getTable(self, name):
+        """Get (or create) a table."""
+        table = self._tables.get(name)
+        if table is None:
+            table = self._tables[name] = NT4Table(self, name)
+        return table
+    
+    def addConnectionListener(self, listener, immediateNotify=False):
+        """Call listener(connected, info) on connects and disconnects."""
+        def on_event(event):
+            listener(event.is_(ntcore.EventFlags.kConnected), event.data)
+        
+        self._connection_listeners.append(self.instance.addConnectionListener(immediateNotify, on_event))
+    
+    def isConnected(self):
+        """Whether the client is connected (a server always is)."""
+        if self.instance is None:
+            return False
+        if self.instance.getNetworkMode() & ntcore.NetworkTableInstance.NetworkMode.kNetModeServer:
+            return True
+        return self.instance.isConnected()
+    
+    def flush(self):
+        """Send pending values now instead of at the next publish period."""
+        if self.instance is not None:
+            self.instance.flush()
+    
+    def setNetworkIdentity(self, identity):
+        """Name used when connecting to the server."""
+        self.identity = identity
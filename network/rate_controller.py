@@ -0,0 +1,229 @@
+"""
+Bandwidth-aware rate control for driver station traffic.
+Once a second, compares outgoing bytes per second and heartbeat RTT with
+their limits and steps the joystick publish rate, axis quantization and
+low-priority telemetry up or down one level at a time.
+"""
+
+import time
+from collections import deque, namedtuple
+from threading import Thread, Event
+from network.joystick_publisher import NT_UPDATE_OVERHEAD, NT_DOUBLE_SIZE
+from network.telemetry import DEFAULT_TELEMETRY_KEYS
+
+
+# max_rate: joystick frames/s (None = unlimited), quantization: multiple of
+# the configured step, throttle_telemetry: ask the robot to slow down
+# low-priority dashboard keys, telemetry_period: seconds between updates
+# of those keys requested from the server (None = the normal period; only
+# NT4 subscriptions have a period of their own)
+RateLevel = namedtuple("RateLevel", "name max_rate quantization throttle_telemetry telemetry_period")
+
+LEVELS = (
+    RateLevel("full", None, 1.0, False, None),
+    RateLevel("reduced", 50.0, 2.0, False, None),
+    RateLevel("low", 25.0, 2.0, True, 0.25),
+    RateLevel("minimal", 10.0, 5.0, True, 1.0),
+)
+
+# Smallest step used when coarsening with quantization disabled
+MIN_QUANTIZATION = 0.005
+
+# Entries robot code can read to slow down its own low-priority telemetry
+LEVEL_KEY = "RateLevel"
+THROTTLED_KEYS_KEY = "ThrottledTelemetry"
+
+
+class RateController:
+    """Adapts joystick publishing to the link.
+    
+    Steps down a level after `hold` consecutive seconds over the byte budget
+    or RTT limit, and back up after `recover` consecutive seconds comfortably
+    below both. Enable/mode writes and heartbeats do not go through the
+    publisher and are never throttled.
+    """
+    
+    def __init__(self, publisher, heartbeat, telemetry_keys=(), budget=50000, rtt_limit_ms=50.0,
+                 hold=2, recover=5, enabled=True):
+        self.publisher = publisher
+        self.heartbeat = heartbeat
+        self.telemetry_keys = telemetry_keys  # Subscribed keys; all but the defaults are low priority
+        self.budget = budget  # Outgoing bytes/s
+        self.rtt_limit_ms = rtt_limit_ms
+        self.hold = hold
+        self.recover = recover
+        self.enabled = enabled
+        self.base_quantization = publisher.quantization
+        
+        self.level = 0
+        self.table = None
+        self.telemetry_period = None  # Period last reported through on_telemetry_period
+        self.decisions = deque(maxlen=200)
+        self._over = 0
+        self._under = 0
+        self._next_evaluation = None
+        self._stop_event = Event()
+        self._thread = None
+        
+        # Optional SessionRecorder, gets every level change as telemetry
+        self.recorder = None
+        
+        # Called with (low-priority keys, period or None) when the period
+        # requested for them changes
+        self.on_telemetry_period = None
+    
+    def start(self, table, threaded=True):
+        """Start evaluating once a second (after the link is up).
+        
+        With threaded=False the caller evaluates through poll() instead.
+        """
+        self.stop()
+        self.table = table
+        self._over = 0
+        self._under = 0
+        self.telemetry_period = None  # New subscriptions use the normal period
+        self._apply(0, "link up", None, None)
+        if not self.enabled:
+            return
+        self._next_evaluation = time.monotonic() + 1.0
+        if not threaded:
+            return
+        self._stop_event.clear()
+        self._thread = Thread(target=self._run, name="rate-control", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop evaluating (link lost or disconnecting)."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self.table = None
+        self._next_evaluation = None
+    
+    def _run(self):
+        """Evaluation loop."""
+        while not self._stop_event.wait(1.0):
+            try:
+                self.evaluate()
+            except Exception as e:
+                print(f"Rate control error: {e}")
+    
+    def poll(self, now):
+        """Evaluate if a second has passed; return when the next one is due.
+        
+        Returns None when stopped or disabled.
+        """
+        if self._next_evaluation is None:
+            return None
+        if now >= self._next_evaluation:
+            self._next_evaluation += 1.0
+            if self._next_evaluation < now:
+                self._next_evaluation = now + 1.0
+            try:
+                self.evaluate()
+            except Exception as e:
+                print(f"Rate control error: {e}")
+        return self._next_evaluation
+    
+    def outgoing_bytes(self):
+        """Estimated outgoing bytes over the last second."""
+        nbytes = self.publisher.stats.snapshot()["bytes_per_second"]
+        if self.heartbeat.table is not None:
+            nbytes += int(self.heartbeat.rate * (NT_UPDATE_OVERHEAD + NT_DOUBLE_SIZE))
+        return nbytes
+    
+    def evaluate(self):
+        """Compare the last second with the limits and change level if needed."""
+        nbytes = self.outgoing_bytes()
+        rtt = self.heartbeat.snapshot()["rtt_mean_ms"]
+        
+        reasons = []
+        if nbytes > 0.9 * self.budget:
+            reasons.append(f"{nbytes} B/s over 90% of {self.budget} B/s budget")
+        if rtt is not None and rtt > self.rtt_limit_ms:
+            reasons.append(f"RTT {rtt:.1f} ms over {self.rtt_limit_ms:g} ms")
+        
+        if reasons:
+            self._under = 0
+            self._over += 1
+            if self._over >= self.hold and self.level < len(LEVELS) - 1:
+                self._over = 0
+                self._apply(self.level + 1, ", ".join(reasons), nbytes, rtt)
+            return
+        
+        self._over = 0
+        comfortable = nbytes < 0.6 * self.budget and (rtt is None or rtt < 0.6 * self.rtt_limit_ms)
+        if comfortable and self.level > 0:
+            self._under += 1
+            if self._under >= self.recover:
+                self._under = 0
+                self._apply(self.level - 1, "link recovered", nbytes, rtt)
+        else:
+            self._under = 0
+    
+    def _apply(self, level, reason, nbytes, rtt):
+        """Switch to a level, configure the publisher and log the decision."""
+        previous = self.level
+        self.level = level
+        settings = LEVELS[level]
+        
+        self.publisher.max_rate = settings.max_rate
+        if settings.quantization > 1.0:
+            step = max(self.base_quantization, MIN_QUANTIZATION) * settings.quantization
+        else:
+            step = self.base_quantization
+        self.publisher.quantization = step
+        
+        throttled = [key for key in self.telemetry_keys if key not in DEFAULT_TELEMETRY_KEYS]
+        table = self.table
+        if table is not None:
+            try:
+                table.putNumber(LEVEL_KEY, level)
+                table.putStringArray(THROTTLED_KEYS_KEY,
+                                     throttled if settings.throttle_telemetry else [])
+            except Exception as e:
+                print(f"Error publishing rate level: {e}")
+        
+        # Slow down the subscriptions themselves where the backend can
+        if settings.telemetry_period != self.telemetry_period:
+            self.telemetry_period = settings.telemetry_period
+            if self.on_telemetry_period and throttled:
+                try:
+                    self.on_telemetry_period(throttled, settings.telemetry_period)
+                except Exception as e:
+                    print(f"Error changing telemetry period: {e}")
+        
+        decision = {
+            "time": time.time(),
+            "from": LEVELS[previous].name,
+            "to": settings.name,
+            "reason": reason,
+            "bytes_per_second": nbytes,
+            "rtt_ms": rtt,
+            "max_rate": settings.max_rate,
+            "quantization": step,
+            "throttle_telemetry": settings.throttle_telemetry,
+            "telemetry_period": settings.telemetry_period,
+        }
+        self.decisions.append(decision)
+        if previous != level:
+            rate = "unlimited" if settings.max_rate is None else f"{settings.max_rate:g} Hz"
+            print(f"Rate control: {LEVELS[previous].name} -> {settings.name} ({reason}); "
+                  f"joystick {rate}, quantization {step:g}, "
+                  f"telemetry {'throttled' if settings.throttle_telemetry else 'normal'}")
+        if self.recorder:
+            self.recorder.record_telemetry("RateControl/Level", float(level))
+    
+    def get_stats(self):
+        """Get the current level and the latest decisions."""
+        settings = LEVELS[self.level]
+        return {
+            "level": self.level,
+            "name": settings.name,
+            "max_rate": settings.max_rate,
+            "quantization": self.publisher.quantization,
+            "throttle_telemetry": settings.throttle_telemetry,
+            "telemetry_period": settings.telemetry_period,
+            "decisions": list(self.decisions),
+        }
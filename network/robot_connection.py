@@ -1,170 +1,738 @@
 """
 NetworkTables client for robot communication.
-Handles connection, telemetry, and robot state.
+Handles connection, telemetry, and robot state. Enable state, mode and
+joysticks go either through NetworkTables or, with the "udp" transport,
+through the standard driver station UDP protocol.
 """
 
-from networktables import NetworkTables
 import time
-from threading import Thread
+from collections import deque
+from threading import Thread, Event, Lock
+from network.connection_state import ConnectionState, BackoffPolicy
+from network.joystick_publisher import JoystickPublisher
+from network.telemetry import TelemetryStore, DEFAULT_TELEMETRY_KEYS
+from network.heartbeat import HeartbeatMonitor
+from network.rate_controller import RateController
+from network.udp_control import UdpControlEngine
+from network.ds_protocol import station_byte, TAG_CPU, decode_cpu
+from network.discovery import RobotDiscovery, team_address, NT3_PORT
+from core.latency import LatencyTracker
+from utils.startup import startup
+
+
+TRANSPORTS = ("networktables", "udp")
 
 
 class RobotConnection:
     """Manages NetworkTables connection to robot."""
     
-    def __init__(self, team_number=2026):
+    def __init__(self, team_number=2026, joystick_mode="legacy", joystick_quantization=0.01,
+                 connect_timeout=5.0, backoff_initial=0.5, backoff_max=8.0, telemetry_keys=(),
+                 history_capacity=131072, robot_address=None, heartbeat_rate=10.0,
+                 heartbeat_timeout=0.5, rate_control=True, rate_budget=50000, rate_rtt_limit_ms=50.0,
+                 transport="networktables", alliance="blue", station=1, nt_version=3,
+                 nt4_telemetry_period=0.05, address_cache=None, discovery_candidates=None, name=None,
+                 nt_backend=None):
         self.team_number = team_number
+        self.name = name  # Prefixes log lines when several robots share a process
+        self.robot_address = robot_address  # Fixed address, skips discovery (e.g. a local stand-in robot)
+        self.address = None  # Address of the current or last connection
         self.connected = False
-        self.nt = None
+        self.state = ConnectionState.IDLE
+        self.connect_timeout = connect_timeout
+        
+        # NetworkTables backend: an NT4 client, or an NT3 (pynetworktables)
+        # instance of our own created by the first connection attempt. A
+        # given nt_backend with the same calls is used instead (e.g. the
+        # in-process one in tools/fake_networktables.py).
+        self.nt = nt_backend
+        self.nt_version = 3
+        if nt_version == 4 and nt_backend is None:
+            try:
+                from network.nt4_client import NT4Client
+                self.nt = NT4Client(telemetry_period=nt4_telemetry_period)
+                self.nt_version = 4
+            except ImportError as e:
+                print(f"{e}, using NetworkTables 3")
         self.ds_table = None
         self.robot_table = None
         
-        # Telemetry data
-        self.battery_voltage = 0.0
-        self.roborio_cpu = 0.0
-        self.roborio_ram = 0.0
+        # Telemetry data, pushed in by NetworkTables entry listeners
+        self.telemetry = TelemetryStore(history_capacity)
+        self.telemetry_keys = []
+        for key in tuple(DEFAULT_TELEMETRY_KEYS) + tuple(telemetry_keys):
+            self.subscribe(key)
         
         # Robot state
         self.enabled = False
         self.mode = "teleop"  # "teleop", "auto", "test"
+        self.estopped = False  # Latched by stop_now(estop=True) until the next connect()
+        self.stop_times = deque(maxlen=100)  # Seconds from stop request to flush
+        
+        # Finds the robot among its possible addresses
+        port = self.nt.port if self.nt_version == 4 else NT3_PORT
+        self.discovery = RobotDiscovery(port=port, cache=address_cache, candidates=discovery_candidates)
+        
+        # Joystick publishing (per-key or packed, change-suppressed)
+        self.joystick_publisher = JoystickPublisher(joystick_mode, joystick_quantization)
+        
+        # Capture-to-flush latency of sent joystick frames
+        self.latency = LatencyTracker()
+        
+        # Heartbeat round trips; the robot is disabled when the echo goes stale
+        self.heartbeat = HeartbeatMonitor(rate=heartbeat_rate, timeout=heartbeat_timeout)
+        self.heartbeat.on_stale = self._on_heartbeat_stale
+        
+        # Slows joystick publishing down when the link gets congested
+        self.rate_controller = RateController(self.joystick_publisher, self.heartbeat,
+                                              self.telemetry_keys, budget=rate_budget,
+                                              rtt_limit_ms=rate_rtt_limit_ms, enabled=rate_control)
+        self.rate_controller.on_telemetry_period = self._set_telemetry_period
+        
+        # Control transport; NetworkTables always carries the dashboard telemetry
+        if transport not in TRANSPORTS:
+            print(f"Unknown transport '{transport}', using networktables")
+            transport = "networktables"
+        self.transport = transport
+        self.udp = None
+        if transport == "udp":
+            self.udp = UdpControlEngine()
+            self.udp.station = station_byte(alliance, station)
+            self.udp.latency = self.latency
+            self.udp.on_link_changed = self._on_udp_link_changed
+            self.udp.on_status = self._on_udp_status
+        
+        # Optional SessionRecorder, gets every sample, frame and transition
+        self.recorder = None
+        
+        # Reconnect handling
+        self.backoff = BackoffPolicy(initial=backoff_initial, maximum=backoff_max)
+        self.backoff_delay = 0.0
+        self.last_reconnect_time = None
+        self.reconnect_times = []
+        self._lost_at = None
+        self._first_flush_pending = False  # No control data flushed since the link came up
+        self._attempt_deadline = None  # End of the current connection attempt
+        self._retry_at = None  # End of the current backoff
+        self._discovery = None  # (thread, result) of a running discovery
+        self._supervisor = None
+        self._stop_event = Event()
+        self._link_event = Event()  # Wakes the supervisor thread
+        self._state_lock = Lock()
+        self._poll_lock = Lock()
+        
+        # ConnectionPool that runs poll() instead of a supervisor thread of our own
+        self.pool = None
         
         # Callbacks
         self.on_connection_changed = None
+        self.on_state_changed = None  # Called from the supervisor (or pool) thread
+        self.on_robot_state_changed = None  # Called with (enabled, mode) from any thread
+        self.on_heartbeat_stale = None  # Called with the echo age (s) from the heartbeat thread
+        self.on_first_control_frame = None  # Called once per link up, when control data first went out
+    
+    def _log(self, message):
+        """Print a message, prefixed with the robot's name if it has one."""
+        print(f"[{self.name}] {message}" if self.name else message)
+    
+    def get_robot_address(self):
+        """Get the fixed or last discovered robot address, else 10.TE.AM.2."""
+        return self.robot_address or self.address or team_address(self.team_number)
     
     def connect(self):
-        """Connect to robot via NetworkTables."""
-        try:
-            # Calculate robot IP from team number
-            team_str = str(self.team_number)
-            if len(team_str) == 4:
-                ip = f"10.{team_str[:2]}.{team_str[2:]}.2"
-            else:
-                ip = f"10.0.{team_str}.2"
-            
-            print(f"Connecting to robot at {ip}...")
-            
-            # Initialize NetworkTables
-            NetworkTables.initialize(server=ip)
-            
-            # Get tables
-            self.nt = NetworkTables
-            self.ds_table = NetworkTables.getTable("DriverStation")
-            self.robot_table = NetworkTables.getTable("SmartDashboard")
-            
-            # Wait for connection
-            start_time = time.time()
-            while not NetworkTables.isConnected() and time.time() - start_time < 5:
-                time.sleep(0.1)
-            
-            self.connected = NetworkTables.isConnected()
-            
-            if self.connected:
-                print(f"✓ Connected to robot")
-                # Start telemetry update thread
-                self._start_telemetry_thread()
-            else:
-                print(f"✗ Failed to connect to robot")
-            
-            if self.on_connection_changed:
-                self.on_connection_changed(self.connected)
-            
-            return self.connected
-            
-        except Exception as e:
-            print(f"Connection error: {e}")
-            self.connected = False
-            if self.on_connection_changed:
-                self.on_connection_changed(False)
+        """Start connecting to the robot in the background.
+        
+        Returns immediately; progress is reported through on_state_changed
+        and on_connection_changed. The link is re-established automatically
+        until disconnect() is called.
+        """
+        if self.state != ConnectionState.IDLE or (self._supervisor is not None and
+                                                   self._supervisor.is_alive()):
             return False
+        
+        with self._poll_lock:
+            self._stop_event.clear()
+            self.backoff.reset()
+            self._lost_at = None
+            self.estopped = False
+            if self.udp:
+                self.udp.estop = False
+            self._begin_attempt()
+        
+        if self.pool is not None:
+            self.pool.wake()
+        else:
+            self._supervisor = Thread(target=self._supervise, daemon=True)
+            self._supervisor.start()
+        return True
     
     def disconnect(self):
         """Disconnect from robot."""
         if self.connected:
             self.set_enabled(False)  # Disable robot before disconnecting
-            NetworkTables.shutdown()
+        
+        self._stop_event.set()
+        self._link_event.set()
+        if self._supervisor is not None:
+            self._supervisor.join(timeout=1.0)
+            self._supervisor = None
+        
+        with self._poll_lock:
+            self.heartbeat.stop()
+            self.rate_controller.stop()
+            if self.udp:
+                self.udp.stop()
+            self._discovery = None
+            was_connected = self.connected
             self.connected = False
+            if self.nt is not None:
+                self.nt.shutdown()
+            self._set_state(ConnectionState.IDLE)
+        
+        if was_connected:
             if self.on_connection_changed:
                 self.on_connection_changed(False)
-            print("Disconnected from robot")
+            self._log("Disconnected from robot")
+    
+    def _set_state(self, state):
+        """Record a state transition and notify the listener."""
+        with self._state_lock:
+            if state == self.state:
+                return
+            self.state = state
+        
+        if self.on_state_changed:
+            self.on_state_changed(state)
+    
+    def _wake(self):
+        """Have poll() run now, on the supervisor or pool thread."""
+        if self.pool is not None:
+            self.pool.wake()
+        else:
+            self._link_event.set()
+    
+    def _on_nt_connection(self, connected, info):
+        """NetworkTables connection listener, wakes the supervisor."""
+        self._wake()
+    
+    def _on_udp_link_changed(self, communicating):
+        """UDP engine link listener, wakes the supervisor."""
+        self._wake()
+    
+    def _link_up(self):
+        """Whether the control transport currently reaches the robot."""
+        if self.udp:
+            return self.udp.communicating
+        return self.nt.isConnected()
+    
+    def _supervise(self):
+        """Runs poll() on its own thread when there is no ConnectionPool."""
+        while not self._stop_event.is_set():
+            self._link_event.clear()
+            deadline = self.poll()
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            self._link_event.wait(timeout)
+    
+    def poll(self, now=None):
+        """Advance the connection state machine without blocking.
+        
+        Also sends heartbeats and runs rate control while connected.
+        Returns the time poll() wants to run again, or None if only a link
+        event (connection listener, finished discovery) needs attention.
+        """
+        now = now or time.monotonic()
+        with self._poll_lock:
+            if self._stop_event.is_set():
+                return None
+            if self.state == ConnectionState.CONNECTING:
+                return self._poll_connecting(now)
+            if self.state == ConnectionState.CONNECTED:
+                if not self._link_up():
+                    self._on_link_lost()
+                    return self._back_off(now)
+                return self._poll_connected(now)
+            if self.state == ConnectionState.BACKOFF:
+                if now < self._retry_at:
+                    return self._retry_at
+                if self.nt is not None:
+                    self.nt.shutdown()
+                self._begin_attempt()
+                return self._poll_connecting(now)
+            return None
+    
+    def _begin_attempt(self):
+        """Start a connection attempt with discovery (or the fixed address)."""
+        self._attempt_deadline = None
+        self._discovery = None
+        self._set_state(ConnectionState.CONNECTING)
+    
+    def _poll_connecting(self, now):
+        """Discover, open NetworkTables and wait for the link, step by step."""
+        if self._attempt_deadline is None:
+            ip = self.robot_address
+            if not ip:
+                if self._discovery is None:
+                    self._start_discovery()
+                    return None
+                thread, result = self._discovery
+                if thread.is_alive():
+                    return None
+                self._discovery = None
+                ip = result[0] if result else None
+                if ip is None:
+                    return self._back_off(now)
+            if not self._open(ip):
+                return self._back_off(now)
+            self._attempt_deadline = now + self.connect_timeout
+        
+        if self._link_up():
+            self._attempt_deadline = None
+            self._on_link_up()
+            return self._poll_connected(now)
+        if now >= self._attempt_deadline:
+            self._attempt_deadline = None
+            self._log("✗ Failed to connect to robot")
+            return self._back_off(now)
+        return self._attempt_deadline
+    
+    def _poll_connected(self, now):
+        """Send due heartbeats and rate control evaluations."""
+        deadlines = [self.heartbeat.poll(now), self.rate_controller.poll(now)]
+        deadlines = [deadline for deadline in deadlines if deadline is not None]
+        return min(deadlines) if deadlines else None
+    
+    def _back_off(self, now):
+        """Wait before the next connection attempt."""
+        self.backoff_delay = self.backoff.next_delay()
+        self._retry_at = now + self.backoff_delay
+        self._set_state(ConnectionState.BACKOFF)
+        self._log(f"Retrying in {self.backoff_delay:.1f} s")
+        return self._retry_at
+    
+    def _open(self, ip):
+        """Start the NetworkTables client and look up the tables."""
+        try:
+            self.address = ip
+            self._log(f"Connecting to robot at {ip}...")
+            
+            # Initialize NetworkTables
+            self._create_nt()
+            self.nt.initialize(server=ip)
+            self.nt.addConnectionListener(self._on_nt_connection, immediateNotify=True)
+            
+            if self.udp:
+                self.udp.start(ip)
+            
+            # Get tables
+            self.ds_table = self.nt.getTable("DriverStation")
+            self.robot_table = self.nt.getTable("SmartDashboard")
+            
+            # Listeners do not survive a NetworkTables restart
+            for key in self.telemetry_keys:
+                self._add_telemetry_listener(key)
+            return True
+        
+        except Exception as e:
+            self._log(f"Connection error: {e}")
+            return False
+    
+    def _create_nt(self):
+        """Create the NT3 instance on first use.
+        
+        Importing pynetworktables is left until here so that it happens on
+        the connecting thread rather than while the window starts.
+        """
+        if self.nt is None:
+            with startup.importing("networktables"):
+                from networktables import NetworkTablesInstance
+            self.nt = NetworkTablesInstance.create()
+    
+    def _start_discovery(self):
+        """Run discovery on a thread of its own; poll() picks up the result."""
+        result = []
+        
+        def run():
+            ip = self._discover()
+            if ip is not None:
+                result.append(ip)
+            self._wake()
+        
+        thread = Thread(target=run, name=f"discover-{self.team_number}", daemon=True)
+        self._discovery = (thread, result)
+        thread.start()
+    
+    def _discover(self):
+        """Race all candidate addresses; return the first that answers."""
+        self._log(f"Searching for robot {self.team_number}...")
+        found = self.discovery.discover(self.team_number, self.connect_timeout, self._stop_event)
+        if found is None:
+            if not self._stop_event.is_set():
+                details = ", ".join(f"{c} ({r})" for c, r in self.discovery.results.items())
+                self._log(f"✗ Robot not found: {details}")
+            return None
+        candidate, ip, elapsed = found
+        self._log(f"Found robot at {candidate} ({ip}) after {1000.0 * elapsed:.0f} ms")
+        return ip
+    
+    def _on_link_up(self):
+        """Handle a successful (re)connection."""
+        self.connected = True
+        self.backoff.reset()
+        self.joystick_publisher.reset()
+        
+        if self._lost_at is not None:
+            self.last_reconnect_time = time.monotonic() - self._lost_at
+            self.reconnect_times = self.reconnect_times[-19:] + [self.last_reconnect_time]
+            self._lost_at = None
+            self._log(f"✓ Reconnected to robot after {self.last_reconnect_time:.2f} s")
+        else:
+            self._log(f"✓ Connected to robot")
+        
+        self._set_state(ConnectionState.CONNECTED)
+        if not self.udp:
+            try:
+                self.ds_table.putBoolean("EStop", self.estopped)
+            except Exception as e:
+                self._log(f"Error writing e-stop state: {e}")
+            # The first heartbeat or joystick frame flushed reports it
+            self._first_flush_pending = True
+            # UDP has its own trip times and a fixed 50 Hz packet rate
+            # Both are driven by poll(), on the supervisor or pool thread
+            self.heartbeat.start(self.ds_table, self._flush, threaded=False)
+            self.rate_controller.start(self.ds_table, threaded=False)
+        elif self.on_first_control_frame:
+            # The robot answered a control packet, so one has gone out
+            self.on_first_control_frame()
+        
+        if self.on_connection_changed:
+            self.on_connection_changed(True)
+    
+    def _on_link_lost(self):
+        """Handle a dropped link; the robot comes back disabled."""
+        self.connected = False
+        self.heartbeat.stop()
+        self.rate_controller.stop()
+        if self.enabled:
+            self.enabled = False
+            self._state_changed()
+        if self._lost_at is None:
+            self._lost_at = time.monotonic()
+        self._log("Lost connection to robot")
+        self._set_state(ConnectionState.LOST)
+        
+        if self.on_connection_changed:
+            self.on_connection_changed(False)
     
     def set_enabled(self, enabled):
         """Enable or disable the robot."""
         if not self.connected:
             return False
+        if enabled and self.heartbeat.stale:
+            self._log("Not enabling: robot is not echoing heartbeats")
+            return False
+        if enabled and self.estopped:
+            self._log("Not enabling: e-stopped, disconnect and connect again to clear")
+            return False
         
         try:
             self.enabled = enabled
-            self.ds_table.putBoolean("Enabled", enabled)
-            self.ds_table.putString("Mode", self.mode)
+            if enabled:
+                # Make sure the robot gets a full frame after enabling
+                self.joystick_publisher.reset()
+            if self.udp:
+                self.udp.enabled = enabled
+                self.udp.send_now()
+            else:
+                self.ds_table.putBoolean("Enabled", enabled)
+                self.ds_table.putString("Mode", self.mode)
+                # Enable state bypasses rate control and goes out immediately
+                self._flush()
+            self._state_changed()
             return True
         except Exception as e:
-            print(f"Error setting enabled state: {e}")
+            self._log(f"Error setting enabled state: {e}")
             return False
     
+    def stop_now(self, pressed=None, estop=True):
+        """Disable the robot at once: the e-stop fast path.
+        
+        Works whatever the local state is. Joystick frames stop before the
+        disable is written, and it is flushed (or sent as a UDP packet)
+        right away instead of with the next update. With estop the robot
+        stays disabled until the next connect(). pressed is the time of the
+        keypress or button event (time.monotonic()); returns the seconds
+        from then to the flush, or None when there was no link to flush.
+        """
+        pressed = pressed or time.monotonic()
+        self.enabled = False  # Checked by send_joystick_data on every thread
+        if estop:
+            self.estopped = True
+        
+        flushed = None
+        try:
+            if self.udp:
+                self.udp.enabled = False
+                self.udp.estop = self.estopped
+                self.udp.set_joysticks((), ())  # Drop the pending frame
+                self.udp.send_now()
+                if self.udp.communicating:
+                    flushed = time.monotonic()
+            elif self.connected:
+                self.ds_table.putBoolean("Enabled", False)
+                if estop:
+                    self.ds_table.putBoolean("EStop", True)
+                self._flush_now()
+                flushed = time.monotonic()
+        except Exception as e:
+            self._log(f"Error sending stop: {e}")
+        
+        elapsed = None
+        if flushed is not None:
+            elapsed = flushed - pressed
+            self.stop_times.append(elapsed)
+            self._log(f"{'E-stop' if estop else 'Disable'} flushed {1000.0 * elapsed:.2f} ms after request")
+        self._state_changed()
+        return elapsed
+    
+    def _flush_now(self):
+        """Flush even if the previous flush was less than 10 ms ago.
+        
+        pynetworktables ignores flush() calls within 10 ms of the last one,
+        and joystick frames flush about that often, so a disable could
+        otherwise wait for the next periodic update.
+        """
+        if self.nt_version == 3:
+            try:
+                dispatcher = self.nt._api.dispatcher
+                with dispatcher.m_flush_mutex:
+                    dispatcher.m_last_flush = 0.0
+            except AttributeError:
+                pass  # Other pynetworktables internals; a plain flush will do
+        self._flush()
+    
+    def _flush(self):
+        """Flush NetworkTables, reporting the first flush after link up."""
+        self.nt.flush()
+        if self._first_flush_pending:
+            self._first_flush_pending = False
+            if self.on_first_control_frame:
+                self.on_first_control_frame()
+    
     def set_mode(self, mode):
         """Set robot mode (teleop, auto, test)."""
         if mode not in ["teleop", "auto", "test"]:
             return False
         
         self.mode = mode
+        self._state_changed()
+        if self.udp:
+            self.udp.mode = mode
+            return True
         if self.connected:
             try:
                 self.ds_table.putString("Mode", mode)
                 return True
             except Exception as e:
-                print(f"Error setting mode: {e}")
+                self._log(f"Error setting mode: {e}")
                 return False
         return True
     
-    def send_joystick_data(self, axes, buttons):
-        """Send joystick data to robot."""
+    def _on_heartbeat_stale(self, age):
+        """Disable locally when the robot stops echoing heartbeats."""
+        self._log(f"Heartbeat stale ({1000.0 * age:.0f} ms since last echo)")
+        if self.enabled:
+            self.set_enabled(False)
+            self._log("Robot disabled: heartbeat lost")
+        if self.on_heartbeat_stale:
+            self.on_heartbeat_stale(age)
+    
+    def send_joystick_data(self, axes, buttons, captured=None, shaped=None):
+        """Send joystick data to robot (one axis and button list per slot).
+        
+        captured and shaped are the frame's ControllerFrame timestamps; when
+        given, the frame's latency is recorded once it has been flushed.
+        """
         if not self.connected or not self.enabled:
             return
         
+        if self.udp:
+            # Goes out with the next 50 Hz control packet
+            self.udp.set_joysticks(axes, buttons, captured, shaped)
+            self._record_joysticks(axes, buttons)
+            return
+        
+        sent = time.monotonic()
         try:
-            # Send axis values
-            for i, value in enumerate(axes):
-                self.ds_table.putNumber(f"Joystick/Axis{i}", value)
-            
-            # Send button states
-            for i, pressed in enumerate(buttons):
-                self.ds_table.putBoolean(f"Joystick/Button{i}", pressed)
+            writes = self.joystick_publisher.publish(self.ds_table, axes, buttons)
+            if writes:
+                # Push the update out now instead of at the next periodic update
+                self._flush()
+                if captured:
+                    self.latency.add(captured, shaped or sent, sent, time.monotonic())
+        except Exception as e:
+            self._log(f"Error sending joystick data: {e}")
         
+        self._record_joysticks(axes, buttons)
+    
+    def _record_joysticks(self, axes, buttons):
+        """Log a sent frame, one record per slot."""
+        if self.recorder:
+            for slot, (slot_axes, slot_buttons) in enumerate(zip(axes, buttons)):
+                self.recorder.record_joystick(slot_axes, slot_buttons, slot)
+    
+    def _on_udp_status(self, status):
+        """Feed battery and CPU from UDP status packets into the telemetry."""
+        if status.battery != self.telemetry.get("BatteryVoltage"):
+            self._on_telemetry_entry(None, "BatteryVoltage", status.battery, False)
+        cpu = status.tags.get(TAG_CPU)
+        if cpu:
+            usage = decode_cpu(cpu)
+            if usage is not None and usage != self.telemetry.get("RoboRIO/CPU"):
+                self._on_telemetry_entry(None, "RoboRIO/CPU", usage, False)
+    
+    def _state_changed(self):
+        """Log and announce the current enable/mode state."""
+        if self.recorder:
+            self.recorder.record_state(self.enabled, self.mode)
+        if self.on_robot_state_changed:
+            self.on_robot_state_changed(self.enabled, self.mode)
+    
+    def subscribe(self, key):
+        """Subscribe to a SmartDashboard key; updates land in self.telemetry."""
+        if key in self.telemetry_keys:
+            return
+        self.telemetry_keys.append(key)
+        if self.robot_table is not None:
+            self._add_telemetry_listener(key)
+    
+    def unsubscribe(self, key):
+        """Stop receiving updates for a SmartDashboard key."""
+        if key not in self.telemetry_keys:
+            return
+        self.telemetry_keys.remove(key)
+        if self.robot_table is not None:
+            self.robot_table.removeEntryListener(self._on_telemetry_entry)
+            for other in self.telemetry_keys:
+                self._add_telemetry_listener(other)
+    
+    def _add_telemetry_listener(self, key):
+        """Register the entry listener for one key."""
+        try:
+            self.robot_table.addEntryListener(self._on_telemetry_entry, immediateNotify=True, key=key)
         except Exception as e:
-            print(f"Error sending joystick data: {e}")
-    
-    def _start_telemetry_thread(self):
-        """Start background thread to update telemetry."""
-        def update_telemetry():
-            while self.connected and NetworkTables.isConnected():
-                try:
-                    # Read telemetry from SmartDashboard
-                    self.battery_voltage = self.robot_table.getNumber("BatteryVoltage", 0.0)
-                    self.roborio_cpu = self.robot_table.getNumber("RoboRIO/CPU", 0.0)
-                    self.roborio_ram = self.robot_table.getNumber("RoboRIO/RAM", 0.0)
-                    
-                    time.sleep(0.1)  # Update at 10Hz
-                except Exception as e:
-                    print(f"Telemetry error: {e}")
-                    break
-            
-            # Connection lost
-            if self.connected:
-                self.connected = False
-                if self.on_connection_changed:
-                    self.on_connection_changed(False)
-                print("Lost connection to robot")
-        
-        thread = Thread(target=update_telemetry, daemon=True)
-        thread.start()
+            self._log(f"Error subscribing to {key}: {e}")
+    
+    def _set_telemetry_period(self, keys, period):
+        """Change the update period of low-priority telemetry keys.
+        
+        Only NT4 subscriptions have a period of their own; NT3 sends
+        everything at one rate, so there the level stays a hint that robot
+        code may act on.
+        """
+        table = self.robot_table
+        if self.nt_version != 4 or table is None:
+            return
+        for key in keys:
+            table.set_key_period(key, period)
+    
+    def _on_telemetry_entry(self, source, key, value, is_new):
+        """Entry listener, runs on the NetworkTables notifier thread."""
+        timestamp = time.monotonic()
+        self.telemetry.update(key, value, timestamp)
+        if self.recorder:
+            self.recorder.record_telemetry(key, value, timestamp)
+    
+    def get_telemetry(self, key, default=None):
+        """Get the latest value of a subscribed SmartDashboard key."""
+        return self.telemetry.get(key, default)
     
     def get_battery_voltage(self):
         """Get current battery voltage."""
-        return self.battery_voltage
+        return self.telemetry.get("BatteryVoltage", 0.0)
     
     def get_roborio_status(self):
         """Get RoboRIO CPU and RAM usage."""
-        return {"cpu": self.roborio_cpu, "ram": self.roborio_ram}
+        return {"cpu": self.telemetry.get("RoboRIO/CPU", 0.0),
+                "ram": self.telemetry.get("RoboRIO/RAM", 0.0)}
+    
+    def get_latency_stats(self):
+        """Get capture-to-flush latency percentiles per stage."""
+        return self.latency.snapshot()
+    
+    def get_heartbeat_stats(self):
+        """Get heartbeat RTT, loss rate and echo age."""
+        return self.heartbeat.snapshot()
+    
+    def get_rate_stats(self):
+        """Get the current rate control level and its recent decisions."""
+        return self.rate_controller.get_stats()
+    
+    def get_transport_stats(self):
+        """Get UDP trip times and robot status flags (None on NetworkTables)."""
+        return self.udp.get_stats() if self.udp else None
+    
+    def get_publish_stats(self):
+        """Get per-second joystick write counts and bytes."""
+        return self.joystick_publisher.stats.snapshot()
+    
+    def get_reconnect_stats(self):
+        """Get time-to-reconnect measurements in seconds."""
+        times = self.reconnect_times
+        return {
+            "last": self.last_reconnect_time,
+            "average": sum(times) / len(times) if times else None,
+            "max": max(times) if times else None,
+            "count": len(times),
+        }
+    
+    def get_stop_stats(self):
+        """Get request-to-flush times of e-stops and fast disables in ms."""
+        times = [1000.0 * t for t in self.stop_times]
+        return {
+            "estopped": self.estopped,
+            "count": len(times),
+            "last_ms": times[-1] if times else None,
+            "mean_ms": sum(times) / len(times) if times else None,
+            "max_ms": max(times) if times else None,
+        }
     
     def is_connected(self):
         """Check if connected to robot."""
-        return self.connected and NetworkTables.isConnected()
+        return self.connected and self._link_up()
+
+
+def create_robot(config, overrides=None):
+    """Create a robot connection from the config, with per-robot overrides."""
+    overrides = overrides or {}
+    
+    def setting(key, default=None):
+        return overrides.get(key, config.get(key, default))
+    
+    robot = RobotConnection(
+        team_number=setting('team_number'),
+        joystick_mode=setting('joystick_publish_mode', 'legacy'),
+        joystick_quantization=setting('joystick_quantization', 0.01),
+        connect_timeout=setting('connect_timeout', 5.0),
+        backoff_initial=setting('reconnect_backoff_initial', 0.5),
+        backoff_max=setting('reconnect_backoff_max', 8.0),
+        telemetry_keys=setting('telemetry_keys', []),
+        history_capacity=setting('telemetry_history_samples', 131072),
+        robot_address=setting('robot_address'),
+        heartbeat_rate=setting('heartbeat_rate', 10.0),
+        heartbeat_timeout=setting('heartbeat_timeout', 0.5),
+        rate_control=setting('rate_control', True),
+        rate_budget=setting('rate_budget_bytes', 50000),
+        rate_rtt_limit_ms=setting('rate_rtt_limit_ms', 50.0),
+        transport=setting('transport', 'networktables'),
+        alliance=setting('alliance', 'blue'),
+        station=setting('station', 1),
+        nt_version=setting('networktables_version', 3),
+        nt4_telemetry_period=setting('nt4_telemetry_period', 0.05),
+        address_cache=config.get('robot_address_cache'),
+        discovery_candidates=setting('discovery_candidates'),
+        name=overrides.get('name'),
+    )
+    
+    # Remember which address answered so it is tried first next time
+    robot.discovery.on_cache_changed = lambda cache: config.set('robot_address_cache', cache)
+    return robot
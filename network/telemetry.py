@@ -0,0 +1,109 @@
+"""
+Shared telemetry store fed by NetworkTables entry listeners.
+Keeps the latest value of every subscribed key, which keys changed
+since the GUI last looked, and a bounded history of numeric samples.
+"""
+
+import time
+from threading import Lock
+from utils.ring_buffer import RingBuffer
+
+
+# Keys the driver station always subscribes to on the SmartDashboard table
+DEFAULT_TELEMETRY_KEYS = ("BatteryVoltage", "RoboRIO/CPU", "RoboRIO/RAM")
+
+
+class TelemetryHistory:
+    """Per-channel ring buffers holding every numeric telemetry sample."""
+    
+    def __init__(self, capacity=131072):
+        self.capacity = capacity
+        self._channels = {}
+        self._lock = Lock()
+        
+        # Time source matching the sample timestamps (session time in replay)
+        self.clock = time.monotonic
+    
+    def append(self, key, timestamp, value):
+        """Record a sample, creating the channel on first use."""
+        buffer = self._channels.get(key)
+        if buffer is None:
+            with self._lock:
+                buffer = self._channels.setdefault(key, RingBuffer(self.capacity))
+        buffer.append(timestamp, value)
+    
+    def get(self, key):
+        """Get the ring buffer for a channel, or None if it has no samples."""
+        return self._channels.get(key)
+    
+    def channels(self):
+        """Get the names of all channels with samples."""
+        return list(self._channels)
+    
+    def clear(self):
+        """Drop all samples, keeping the channel buffers allocated."""
+        with self._lock:
+            for buffer in self._channels.values():
+                buffer.clear()
+
+
+class TelemetryStore:
+    """Latest value and receive time for each telemetry key."""
+    
+    def __init__(self, history_capacity=131072):
+        self._lock = Lock()
+        self._values = {}  # key -> (value, monotonic receive time)
+        self._changed = set()
+        self.history = TelemetryHistory(history_capacity)
+        
+        # Called once when the first key of a new batch changes. Further
+        # changes are collected until take_changed() drains the batch.
+        self.on_changed = None
+    
+    def update(self, key, value, timestamp=None):
+        """Store a new value for a key."""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        
+        # Every numeric sample goes into the history, even repeats
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            self.history.append(key, timestamp, value)
+        
+        with self._lock:
+            previous = self._values.get(key)
+            self._values[key] = (value, timestamp)
+            if previous is not None and previous[0] == value:
+                return
+            notify = not self._changed
+            self._changed.add(key)
+        
+        if notify and self.on_changed:
+            self.on_changed()
+    
+    def get(self, key, default=None):
+        """Get the latest value of a key."""
+        item = self._values.get(key)
+        return default if item is None else item[0]
+    
+    def get_timestamp(self, key):
+        """Get the monotonic time the key was last received, or None."""
+        item = self._values.get(key)
+        return None if item is None else item[1]
+    
+    def take_changed(self):
+        """Get and clear the set of keys that changed since the last call."""
+        with self._lock:
+            changed = self._changed
+            self._changed = set()
+        return changed
+    
+    def keys(self):
+        """Get all keys that have received a value."""
+        with self._lock:
+            return list(self._values)
+    
+    def clear(self):
+        """Drop all stored values."""
+        with self._lock:
+            self._values.clear()
+            self._changed.clear()
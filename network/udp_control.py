@@ -0,0 +1,226 @@
+"""
+UDP control engine speaking the FRC driver station protocol.
+Sends a control packet (enable state, mode, alliance station, joysticks)
+to the roboRIO every 20 ms and reads its status replies: battery voltage,
+brownout and e-stop flags, robot code state and per-packet trip times.
+"""
+
+import socket
+import time
+from collections import deque
+from threading import Thread, Event, Lock
+from network import ds_protocol
+
+
+class UdpControlEngine:
+    """Control packets out, status packets in, on two threads.
+    
+    The robot counts as communicating while status packets keep arriving
+    within `timeout` seconds; on_link_changed reports transitions.
+    """
+    
+    def __init__(self, rate=50.0, timeout=0.5, robot_port=ds_protocol.ROBOT_PORT,
+                 ds_port=ds_protocol.DS_PORT, window=250):
+        self.rate = rate
+        self.timeout = timeout
+        self.robot_port = robot_port
+        self.ds_port = ds_port
+        self.address = None
+        
+        # Control state, read by the send thread every tick
+        self.enabled = False
+        self.mode = "teleop"
+        self.estop = False
+        self.station = 0
+        self.request = 0
+        self._joysticks = ()
+        self._frame_times = None  # (captured, shaped, sent) of the pending frame
+        self._armed_captured = None  # Capture time of the last frame timed
+        
+        # Status from the robot
+        self.status = None
+        self.last_status_time = None
+        self.communicating = False
+        
+        # Trip times
+        self.sequence = 0
+        self.sent = 0
+        self.received = 0
+        self._pending = {}  # sequence -> send time
+        self._trip_times = deque(maxlen=window)
+        self._outcomes = deque(maxlen=window)  # True = answered, False = lost
+        self._date_requested = False
+        
+        self._lock = Lock()
+        self._stop_event = Event()
+        self._sock = None
+        self._threads = []
+        
+        # Optional LatencyTracker, gets each frame when its packet goes out
+        self.latency = None
+        
+        # Callbacks
+        self.on_link_changed = None  # Called with True/False from the engine threads
+        self.on_status = None  # Called with each RobotStatus from the receive thread
+    
+    def start(self, address):
+        """Open the sockets and start sending to a robot address."""
+        self.stop()
+        self.address = address
+        self.communicating = False
+        self.status = None
+        self.last_status_time = None
+        with self._lock:
+            self._pending.clear()
+            self._trip_times.clear()
+            self._outcomes.clear()
+        
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(("", self.ds_port))
+        self._sock.settimeout(0.1)
+        
+        self._stop_event.clear()
+        self._threads = [Thread(target=self._send_loop, name="ds-udp-send", daemon=True),
+                         Thread(target=self._receive_loop, name="ds-udp-receive", daemon=True)]
+        for thread in self._threads:
+            thread.start()
+    
+    def stop(self):
+        """Stop sending and close the socket."""
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        self._set_communicating(False)
+    
+    def set_joysticks(self, axes, buttons, captured=None, shaped=None):
+        """Store the frame to go out with the next control packet.
+        
+        The control loop hands over the same frame every tick while the sticks
+        are still; only a new frame is timed, once, by the packet that carries it.
+        """
+        joysticks = tuple(zip(axes, buttons))
+        with self._lock:
+            changed = joysticks != self._joysticks
+            self._joysticks = joysticks
+            if captured and (changed or captured != self._armed_captured):
+                self._armed_captured = captured
+                self._frame_times = (captured, shaped or captured, time.monotonic())
+    
+    def send_now(self):
+        """Send a control packet immediately instead of at the next tick."""
+        if self._sock is not None:
+            self._send(time.monotonic())
+    
+    def _send_loop(self):
+        """Send a control packet every period against absolute deadlines."""
+        period = 1.0 / self.rate
+        deadline = time.monotonic()
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            try:
+                self._send(now)
+            except OSError as e:
+                print(f"Error sending control packet: {e}")
+            self._expire(now)
+            if self.communicating and now - self.last_status_time > self.timeout:
+                self._set_communicating(False)
+            
+            deadline += period
+            if deadline < now:
+                deadline = now + period
+            self._stop_event.wait(max(0.0, deadline - time.monotonic()))
+    
+    def _send(self, now):
+        """Encode and send one control packet."""
+        with self._lock:
+            self.sequence = (self.sequence + 1) & 0xFFFF
+            sequence = self.sequence
+            joysticks = self._joysticks
+            frame_times = self._frame_times
+            self._frame_times = None
+            self._pending[sequence] = now
+            date_requested = self._date_requested
+            self._date_requested = False
+        
+        extra_tags = ()
+        if date_requested:
+            extra_tags = (ds_protocol.encode_date(), ds_protocol.encode_timezone(time.strftime("%Z")))
+        packet = ds_protocol.encode_control(sequence, self.enabled, self.mode, self.estop,
+                                            self.station, self.request, joysticks, extra_tags)
+        self._sock.sendto(packet, (self.address, self.robot_port))
+        self.sent += 1
+        if frame_times and self.latency is not None:
+            captured, shaped, sent = frame_times
+            self.latency.add(captured, shaped, sent, time.monotonic())
+    
+    def _receive_loop(self):
+        """Read status packets until stopped."""
+        while not self._stop_event.is_set():
+            try:
+                packet, _ = self._sock.recvfrom(1500)
+            except socket.timeout:
+                continue
+            except OSError:
+                if self._stop_event.is_set():
+                    break
+                continue
+            self._on_packet(packet, time.monotonic())
+    
+    def _on_packet(self, packet, now):
+        """Match a status packet to its control packet and store it."""
+        status = ds_protocol.decode_status(packet)
+        if status is None:
+            return
+        with self._lock:
+            sent = self._pending.pop(status.sequence, None)
+            if sent is not None:
+                self._trip_times.append(now - sent)
+                self._outcomes.append(True)
+            if status.request_date:
+                self._date_requested = True
+            self.received += 1
+        self.status = status
+        self.last_status_time = now
+        if not self.communicating:
+            self._set_communicating(True)
+        if self.on_status:
+            self.on_status(status)
+    
+    def _expire(self, now):
+        """Count control packets without a reply after the timeout as lost."""
+        with self._lock:
+            for sequence in [s for s, sent in self._pending.items() if now - sent > self.timeout]:
+                del self._pending[sequence]
+                self._outcomes.append(False)
+    
+    def _set_communicating(self, communicating):
+        """Record a link transition and notify the listener."""
+        if communicating == self.communicating:
+            return
+        self.communicating = communicating
+        if self.on_link_changed:
+            self.on_link_changed(communicating)
+    
+    def get_stats(self):
+        """Get trip times, loss and the latest robot status flags."""
+        with self._lock:
+            trips = sorted(self._trip_times)
+            outcomes = list(self._outcomes)
+        status = self.status
+        return {
+            "communicating": self.communicating,
+            "trip_mean_ms": 1000.0 * sum(trips) / len(trips) if trips else None,
+            "trip_max_ms": 1000.0 * trips[-1] if trips else None,
+            "loss_percent": 100.0 * outcomes.count(False) / len(outcomes) if outcomes else 0.0,
+            "sent": self.sent,
+            "received": self.received,
+            "battery": status.battery if status else None,
+            "brownout": status.brownout if status else False,
+            "estop": status.estop if status else False,
+            "robot_code": status.robot_code if status else False,
+        }
@@ -0,0 +1 @@
+"""Recording package initialization."""
@@ -0,0 +1,251 @@
+"""
+Session recorder.
+Streams telemetry samples, joystick frames and enable/mode transitions
+into an append-only binary log on a background writer thread. Old logs
+are deleted beyond a number of sessions, and a session stops recording
+at a size limit.
+"""
+
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from queue import SimpleQueue, Empty
+from threading import Thread
+from recording import session_log
+
+
+class SessionRecorder:
+    """Writes a session log without blocking the caller.
+    
+    The record_* methods only put a tuple on a queue; encoding and disk
+    writes happen on the writer thread, which flushes in batches. When the
+    writer falls behind (a stalled disk) by max_queue records, or the log
+    reaches max_bytes, further records are dropped and counted.
+    """
+    
+    def __init__(self, path, flush_interval=0.5, flush_bytes=65536, index_interval=1.0,
+                 max_queue=20000, max_bytes=None):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.index_interval = index_interval
+        self.max_queue = max_queue
+        self.max_bytes = max_bytes  # None for no limit
+        
+        self.start_wall_time = time.time()
+        self.start_time = time.monotonic()
+        
+        self.records_written = 0
+        self.bytes_written = 0
+        self.dropped = 0  # Records not written: queue full, size limit or encode errors
+        self.full = False  # Reached max_bytes
+        
+        self._queue = SimpleQueue()
+        self._thread = None
+        self._file = None
+        self._running = False
+        
+        # Writer thread state
+        self._keys = {}  # key name -> id
+        self._index = []  # (time, offset) pairs
+        self._last_index_time = None
+        self._last_state = None
+        self._last_values = {}  # key id -> last telemetry value
+        self._last_frames = {}  # slot -> (axes, buttons)
+    
+    @classmethod
+    def create_in(cls, directory, keep_sessions=None, **kwargs):
+        """Create a recorder writing to a new timestamped file in a directory.
+        
+        With keep_sessions, the oldest logs there are deleted so that the
+        new one makes keep_sessions.
+        """
+        directory = Path(directory).expanduser()
+        directory.mkdir(parents=True, exist_ok=True)
+        if keep_sessions:
+            prune_sessions(directory, keep_sessions - 1)
+        name = datetime.now().strftime("session-%Y%m%d-%H%M%S.dslog")
+        return cls(directory / name, **kwargs)
+    
+    def start(self):
+        """Open the log file and start the writer thread."""
+        self._file = open(self.path, "wb")
+        self._file.write(session_log.encode_header(self.start_wall_time))
+        self.bytes_written = session_log.HEADER.size
+        self._running = True
+        self._thread = Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+        print(f"Recording session to {self.path}")
+    
+    def close(self):
+        """Flush everything, write the index and close the file."""
+        if not self._running:
+            return
+        self._running = False
+        self._queue.put(None)
+        if self._thread:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        print(f"Session recorded: {self.records_written} records, {self.bytes_written} bytes" +
+              (f", {self.dropped} dropped" if self.dropped else ""))
+    
+    def _now(self):
+        """Seconds since the session started."""
+        return time.monotonic() - self.start_time
+    
+    def _put(self, item):
+        """Queue a record unless the writer is max_queue records behind."""
+        # qsize() is approximate, which is fine for a bound; SimpleQueue
+        # keeps put() cheap on the callers' threads
+        if self._queue.qsize() >= self.max_queue:
+            self.dropped += 1
+        else:
+            self._queue.put(item)
+    
+    def record_telemetry(self, key, value, timestamp=None):
+        """Queue a telemetry sample (timestamp is time.monotonic())."""
+        if self._running:
+            t = self._now() if timestamp is None else timestamp - self.start_time
+            self._put((session_log.REC_TELEMETRY, t, key, value))
+    
+    def record_joystick(self, axes, buttons, slot=0, timestamp=None):
+        """Queue a joystick frame."""
+        if self._running:
+            t = self._now() if timestamp is None else timestamp - self.start_time
+            self._put((session_log.REC_JOYSTICK, t, tuple(axes), tuple(buttons), slot))
+    
+    def record_state(self, enabled, mode, timestamp=None):
+        """Queue an enable/mode transition."""
+        if self._running:
+            t = self._now() if timestamp is None else timestamp - self.start_time
+            self._put((session_log.REC_STATE, t, enabled, mode))
+    
+    def _writer_loop(self):
+        """Drain the queue, encode records and flush in batches."""
+        buffer = bytearray()
+        last_flush = time.monotonic()
+        running = True
+        
+        while running:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except Empty:
+                item = False
+            
+            if item is None:
+                running = False
+            elif item and self.max_bytes and self.bytes_written + len(buffer) >= self.max_bytes:
+                if not self.full:
+                    self.full = True
+                    print(f"Session log reached {self.max_bytes // 1000000} MB, recording stopped")
+                self.dropped += 1
+            elif item:
+                try:
+                    self._encode(item, buffer)
+                except Exception as e:
+                    self.dropped += 1
+                    print(f"Recorder error: {e}")
+            
+            now = time.monotonic()
+            if buffer and (not running or len(buffer) >= self.flush_bytes or
+                           now - last_flush >= self.flush_interval):
+                self._write(buffer)
+                buffer.clear()
+                last_flush = now
+        
+        self._finish()
+    
+    def _encode(self, item, buffer):
+        """Encode one queued item into the pending buffer."""
+        record_type, t = item[0], item[1]
+        offset = self.bytes_written + len(buffer)
+        
+        # Sparse index: one entry per index_interval, each followed by a
+        # keyframe of the current state, telemetry values and joystick
+        # frames so a reader can start there without scanning back
+        if self._last_index_time is None or t - self._last_index_time >= self.index_interval:
+            self._index.append((t, offset))
+            self._last_index_time = t
+            self._write_keyframe(t, buffer)
+        
+        if record_type == session_log.REC_TELEMETRY:
+            key, value = item[2], item[3]
+            key_id = self._keys.get(key)
+            if key_id is None:
+                key_id = len(self._keys)
+                self._keys[key] = key_id
+                buffer += session_log.encode_key(t, key_id, key)
+                self.records_written += 1
+            data = session_log.encode_telemetry(t, key_id, value)
+            if data is None:
+                self.dropped += 1
+                return
+            self._last_values[key_id] = value
+            buffer += data
+        elif record_type == session_log.REC_JOYSTICK:
+            self._last_frames[item[4]] = (item[2], item[3])
+            buffer += session_log.encode_joystick(t, item[2], item[3], item[4])
+        elif record_type == session_log.REC_STATE:
+            self._last_state = (item[2], item[3])
+            buffer += session_log.encode_state(t, item[2], item[3])
+        self.records_written += 1
+    
+    def _write_keyframe(self, t, buffer):
+        """Repeat the latest state, telemetry values and joystick frames."""
+        if self._last_state is not None:
+            buffer += session_log.encode_state(t, *self._last_state)
+            self.records_written += 1
+        for key_id, value in self._last_values.items():
+            buffer += session_log.encode_telemetry(t, key_id, value)
+            self.records_written += 1
+        for slot, (axes, buttons) in self._last_frames.items():
+            buffer += session_log.encode_joystick(t, axes, buttons, slot)
+            self.records_written += 1
+    
+    def _write(self, buffer):
+        """Append a batch to the file."""
+        try:
+            self._file.write(buffer)
+            self._file.flush()
+            self.bytes_written += len(buffer)
+        except Exception as e:
+            print(f"Error writing session log: {e}")
+    
+    def _finish(self):
+        """Write the index record and trailer, then close the file."""
+        try:
+            index_offset = self.bytes_written
+            keys = {key_id: key for key, key_id in self._keys.items()}
+            data = session_log.encode_index(self._now(), self._index, keys)
+            data += session_log.encode_trailer(index_offset)
+            self._file.write(data)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.bytes_written += len(data)
+        except Exception as e:
+            print(f"Error finishing session log: {e}")
+        finally:
+            self._file.close()
+            self._file = None
+
+
+def prune_sessions(directory, keep):
+    """Delete the oldest session logs in a directory, keeping the newest keep."""
+    # Names are timestamps, so they sort oldest first
+    logs = sorted(Path(directory).glob("session-*.dslog"))
+    for path in logs[:max(0, len(logs) - keep)]:
+        try:
+            path.unlink()
+        except OSError as e:
+            print(f"Error deleting old session log {path}: {e}")
+
+
+def create_recorder(config):
+    """Create (but do not start) a session recorder from the config."""
+    max_mb = config.get('recording_max_session_mb', 200)
+    return SessionRecorder.create_in(
+        config.get('recording_dir'),
+        keep_sessions=config.get('recording_keep_sessions', 20),
+        max_bytes=int(max_mb * 1000000) if max_mb else None,
+    )
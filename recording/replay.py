@@ -0,0 +1,439 @@
+"""
+Session log replay.
+Memory-maps a recorded session and plays it back through stand-ins for
+RobotConnection and ControllerManager, so the normal window can be driven
+without a robot or controller.
+"""
+
+import mmap
+import time
+from bisect import bisect_right
+from threading import Thread, Event, Lock
+from controllers.controller_manager import ControllerFrame
+from network.connection_state import ConnectionState
+from network.robot_connection import RobotConnection
+from recording import session_log
+
+
+class SessionReader:
+    """Random access to a session log through mmap."""
+    
+    def __init__(self, path, index_interval=1.0):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, version, self.start_wall_time = session_log.HEADER.unpack_from(self._map, 0)
+        if magic != session_log.MAGIC:
+            raise ValueError(f"{path} is not a driver station session log")
+        if version > session_log.VERSION:
+            raise ValueError(f"{path} uses log version {version}, newer than supported")
+        
+        self.data_start = session_log.HEADER.size
+        self.data_end = len(self._map)
+        self.keys = {}
+        self.index = []
+        
+        if not self._load_index():
+            # Log was not closed cleanly, rebuild the index with one pass
+            print(f"{path} has no index, scanning...")
+            self._scan(index_interval)
+        
+        self._index_times = [t for t, _ in self.index]
+        self.duration = self._find_duration()
+    
+    def close(self):
+        """Unmap and close the file."""
+        self._map.close()
+        self._file.close()
+    
+    def _load_index(self):
+        """Read the index through the trailer, if there is one."""
+        size = len(self._map)
+        if size < self.data_start + session_log.TRAILER.size:
+            return False
+        
+        magic, index_offset = session_log.TRAILER.unpack_from(self._map, size - session_log.TRAILER.size)
+        if magic != session_log.TRAILER_MAGIC or index_offset >= size:
+            return False
+        
+        length = session_log.LENGTH.unpack_from(self._map, index_offset)[0]
+        body = memoryview(self._map)[index_offset + 4:index_offset + 4 + length]
+        try:
+            record_type, _, payload = session_log.decode_record(body)
+        finally:
+            body.release()
+        if record_type != session_log.REC_INDEX:
+            return False
+        
+        self.index, self.keys = payload
+        self.data_end = index_offset
+        return True
+    
+    def _scan(self, index_interval):
+        """Walk every record to collect keys and build a sparse index."""
+        last_time = None
+        for offset, record_type, t, payload in self._iter_raw(self.data_start):
+            if record_type == session_log.REC_KEY:
+                self.keys[payload[0]] = payload[1]
+            if last_time is None or t - last_time >= index_interval:
+                self.index.append((t, offset))
+                last_time = t
+    
+    def _find_duration(self):
+        """Time of the last record, found by reading from the last index entry."""
+        start = self.index[-1][1] if self.index else self.data_start
+        duration = 0.0
+        for _, _, t, _ in self._iter_raw(start):
+            duration = max(duration, t)
+        return duration
+    
+    def _iter_raw(self, offset):
+        """Yield (offset, type, time, payload) from a file offset onwards."""
+        end = self.data_end
+        data = self._map
+        while offset + 4 <= end:
+            length = session_log.LENGTH.unpack_from(data, offset)[0]
+            if length < session_log.RECORD_HEAD.size or offset + 4 + length > end:
+                break  # Truncated tail of an unclosed log
+            body = memoryview(data)[offset + 4:offset + 4 + length]
+            try:
+                record_type, t, payload = session_log.decode_record(body)
+            finally:
+                body.release()
+            yield offset, record_type, t, payload
+            offset += 4 + length
+    
+    def offset_for(self, t):
+        """File offset of the last index point at or before time t."""
+        i = bisect_right(self._index_times, t) - 1
+        if i < 0:
+            return self.data_start
+        return self.index[i][1]
+    
+    def records(self, offset=None):
+        """Yield (type, time, payload) with telemetry key ids resolved to names."""
+        if offset is None:
+            offset = self.data_start
+        for _, record_type, t, payload in self._iter_raw(offset):
+            if record_type == session_log.REC_KEY:
+                self.keys[payload[0]] = payload[1]
+                continue
+            if record_type == session_log.REC_TELEMETRY:
+                payload = (self.keys.get(payload[0], f"key{payload[0]}"), payload[1])
+            yield record_type, t, payload
+
+
+class ReplayRobotConnection(RobotConnection):
+    """RobotConnection stand-in fed from a session log.
+    
+    "Connecting" starts playback. Enable and mode come from the log, so
+    the window's controls do not change them.
+    """
+    
+    def __init__(self, team_number=0, history_capacity=131072):
+        super().__init__(team_number=team_number, history_capacity=history_capacity)
+        self.player = None
+    
+    def get_robot_address(self):
+        """Show the log being replayed instead of an address."""
+        return "session replay"
+    
+    def connect(self):
+        """Start playback."""
+        if self.connected:
+            return False
+        self.connected = True
+        self._set_state(ConnectionState.CONNECTED)
+        if self.on_connection_changed:
+            self.on_connection_changed(True)
+        if self.player:
+            self.player.play()
+        return True
+    
+    def disconnect(self):
+        """Pause playback."""
+        if self.player:
+            self.player.pause()
+        if not self.connected:
+            return
+        self.connected = False
+        self._set_state(ConnectionState.IDLE)
+        if self.on_connection_changed:
+            self.on_connection_changed(False)
+    
+    def is_connected(self):
+        """Connected while the replay is attached."""
+        return self.connected
+    
+    def set_enabled(self, enabled):
+        """Enable state is taken from the log."""
+        return False
+    
+    def set_mode(self, mode):
+        """Mode is taken from the log."""
+        return False
+    
+    def stop_now(self, pressed=None, estop=True):
+        """Nothing to stop during replay."""
+        return None
+    
+    def send_joystick_data(self, axes, buttons, captured=None, shaped=None):
+        """Nothing to send during replay."""
+        return
+    
+    def apply_state(self, enabled, mode):
+        """Apply an enable/mode record from the log."""
+        if enabled == self.enabled and mode == self.mode:
+            return
+        self.enabled = enabled
+        self.mode = mode
+        self._state_changed()
+
+
+class ReplayControllerManager:
+    """ControllerManager stand-in that exposes the recorded joystick frames."""
+    
+    def __init__(self):
+        self.axes = []  # One list per slot
+        self.buttons = []
+        self.timestamp = 0.0
+        self.sequence = 0
+        self.controller_name = "Replay"
+        self.event_thread = "input"
+        self.on_controller_changed = None
+        self.on_input_changed = None
+        self.on_controllers_changed = None
+    
+    def start(self):
+        """Nothing to start; frames are pushed by the player."""
+    
+    def stop(self):
+        """Nothing to stop."""
+    
+    def pump_events(self):
+        """No event queue during replay."""
+    
+    def apply_frame(self, slot, axes, buttons, timestamp=0.0):
+        """Apply a joystick record from the log."""
+        added = slot >= len(self.axes)
+        while slot >= len(self.axes):
+            self.axes.append([])
+            self.buttons.append([])
+        self.axes[slot] = axes
+        self.buttons[slot] = buttons
+        self.timestamp = timestamp
+        self.sequence += 1
+        if added and self.on_controllers_changed:
+            self.on_controllers_changed()
+    
+    def get_frame(self):
+        """Get the last recorded frame."""
+        return ControllerFrame(self.sequence, self.timestamp, list(self.axes), list(self.buttons))
+    
+    def get_axes(self, slot=0):
+        """Get the last recorded axis values of one slot."""
+        return self.axes[slot] if slot < len(self.axes) else []
+    
+    def get_buttons(self, slot=0):
+        """Get the last recorded button states of one slot."""
+        return self.buttons[slot] if slot < len(self.buttons) else []
+    
+    def is_connected(self):
+        """A controller is shown once the log has joystick frames."""
+        return bool(self.axes)
+    
+    def get_controller_name(self):
+        """Get the replay controller name."""
+        return self.controller_name
+    
+    def set_deadzone(self, deadzone, slot=None):
+        """Recorded frames already have the deadzone applied."""
+    
+    def get_available_controllers(self):
+        """One replay controller per recorded slot."""
+        return [(slot, self.controller_name) for slot in range(len(self.axes))]
+    
+    def assign_slot(self, slot, new_slot):
+        """Recorded frames keep the slots they were recorded in."""
+
+
+class ReplayPlayer:
+    """Plays a session log into replay stand-ins on a background thread.
+    
+    speed is a playback rate (1.0 = real time) or None to dispatch as fast
+    as possible, which makes a deterministic load generator for the GUI.
+    """
+    
+    def __init__(self, reader, robot, controller, speed=1.0):
+        self.reader = reader
+        self.robot = robot
+        self.controller = controller
+        self.speed = speed
+        self.playing = False
+        self.records_dispatched = 0
+        
+        self._position = 0.0
+        self._anchor_wall = time.monotonic()
+        self._anchor_position = 0.0
+        self._seek_target = 0.0
+        self._step_until = None
+        self._pending = None
+        self._records = None
+        self._running = False
+        self._thread = None
+        self._wake = Event()
+        self._lock = Lock()
+        
+        # Charts plot against session time instead of the wall clock
+        robot.telemetry.history.clock = self.get_position
+        robot.player = self
+    
+    def start(self):
+        """Start the playback thread (paused)."""
+        self._running = True
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the playback thread."""
+        self._running = False
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+    
+    def get_position(self):
+        """Current playback position in session seconds."""
+        with self._lock:
+            if self.playing and self.speed is not None:
+                elapsed = (time.monotonic() - self._anchor_wall) * self.speed
+                return min(self.reader.duration, self._anchor_position + elapsed)
+            return self._position
+    
+    def _reanchor(self):
+        """Restart the wall-clock mapping at the current position."""
+        self._anchor_wall = time.monotonic()
+        self._anchor_position = self._position
+    
+    def play(self):
+        """Resume playback."""
+        with self._lock:
+            self._reanchor()
+            self.playing = True
+        self._wake.set()
+    
+    def pause(self):
+        """Pause playback."""
+        position = self.get_position()
+        with self._lock:
+            self.playing = False
+            self._position = position
+        self._wake.set()
+    
+    def set_speed(self, speed):
+        """Change the playback rate (None = as fast as possible)."""
+        position = self.get_position()
+        with self._lock:
+            self._position = position
+            self.speed = speed
+            self._reanchor()
+        self._wake.set()
+    
+    def seek(self, t):
+        """Jump to session time t using the index."""
+        t = min(max(0.0, t), self.reader.duration)
+        with self._lock:
+            self._seek_target = t
+            self._position = t
+            self._reanchor()
+        self._wake.set()
+    
+    def step(self, seconds=0.1):
+        """Pause and advance by a fixed amount of session time."""
+        position = self.get_position()
+        with self._lock:
+            self.playing = False
+            self._position = position
+            self._step_until = position + seconds
+        self._wake.set()
+    
+    def _run(self):
+        """Playback loop."""
+        while self._running:
+            with self._lock:
+                seek_target = self._seek_target
+                self._seek_target = None
+            if seek_target is not None:
+                self._do_seek(seek_target)
+            
+            with self._lock:
+                stepping = self._step_until is not None
+                active = self.playing or stepping
+            if not active:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            
+            record = self._next_record()
+            if record is None:
+                # End of log
+                with self._lock:
+                    self._position = self.reader.duration
+                    self.playing = False
+                    self._step_until = None
+                continue
+            
+            t = record[1]
+            if stepping:
+                with self._lock:
+                    if t > self._step_until:
+                        self._position = self._step_until
+                        self._step_until = None
+                        continue
+            elif self.speed is not None:
+                # Wait until the record is due, unless play state changes
+                with self._lock:
+                    due = self._anchor_wall + (t - self._anchor_position) / self.speed
+                delay = due - time.monotonic()
+                if delay > 0:
+                    if self._wake.wait(delay):
+                        self._wake.clear()
+                        continue
+            
+            self._pending = None
+            self._dispatch(record)
+            with self._lock:
+                if not self.playing or self.speed is None:
+                    self._position = max(self._position, t)
+    
+    def _next_record(self):
+        """Peek the next record without consuming it."""
+        if self._pending is None:
+            if self._records is None:
+                self._records = self.reader.records()
+            self._pending = next(self._records, None)
+        return self._pending
+    
+    def _do_seek(self, target):
+        """Restart from the index point before target and catch up to it."""
+        history = self.robot.telemetry.history
+        history.clear()
+        self._records = self.reader.records(self.reader.offset_for(target))
+        self._pending = None
+        while True:
+            record = self._next_record()
+            if record is None or record[1] > target:
+                break
+            self._pending = None
+            self._dispatch(record)
+    
+    def _dispatch(self, record):
+        """Hand one record to the stand-ins."""
+        record_type, t, payload = record
+        if record_type == session_log.REC_TELEMETRY:
+            self.robot.telemetry.update(payload[0], payload[1], t)
+        elif record_type == session_log.REC_JOYSTICK:
+            self.controller.apply_frame(payload[0], payload[1], payload[2], t)
+        elif record_type == session_log.REC_STATE:
+            self.robot.apply_state(payload[0], payload[1])
+        self.records_dispatched += 1
@@ -0,0 +1,196 @@
+"""
+Binary session log format.
+
+A log is a fixed header followed by length-prefixed records:
+    
+    header:  magic "FRCDSLOG", u16 version, f64 wall-clock start time
+    record:  u32 body length, then the body
+    body:    u8 record type, f64 seconds since session start, payload
+
+Record payloads:
+    
+    KEY        u16 key id, u16 name length, UTF-8 name
+    TELEMETRY  u16 key id, u8 value kind, value
+    JOYSTICK   u8 slot, u8 axis count, f32 axes..., u8 button count, u64 button bitmask
+    STATE      u8 enabled, u8 mode code
+    INDEX      u32 entry count, (f64 time, u64 offset)..., u16 key count, (u16 id, u16 length, name)...
+
+Every index point is followed by a keyframe repeating the current state,
+the latest value of each telemetry key and the latest joystick frames.
+
+A cleanly closed log ends with a 16 byte trailer ("FRCDSIDX" and the u64
+offset of the INDEX record) so readers can seek without scanning. Logs
+that were not closed (crash, power loss) are still readable front to back.
+All integers are little-endian.
+"""
+
+import struct
+
+
+MAGIC = b"FRCDSLOG"
+TRAILER_MAGIC = b"FRCDSIDX"
+VERSION = 1
+
+HEADER = struct.Struct("<8sHd")
+LENGTH = struct.Struct("<I")
+RECORD_HEAD = struct.Struct("<Bd")
+TRAILER = struct.Struct("<8sQ")
+INDEX_ENTRY = struct.Struct("<dQ")
+
+# Record types
+REC_KEY = 0
+REC_TELEMETRY = 1
+REC_JOYSTICK = 2
+REC_STATE = 3
+REC_INDEX = 4
+
+# Telemetry value kinds
+VALUE_DOUBLE = 0
+VALUE_BOOLEAN = 1
+VALUE_STRING = 2
+VALUE_DOUBLE_ARRAY = 3
+
+MODES = ("teleop", "auto", "test")
+
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+_F64 = struct.Struct("<d")
+_KEY_HEAD = struct.Struct("<HH")
+_TELEMETRY_HEAD = struct.Struct("<HB")
+_STATE = struct.Struct("<BB")
+
+
+def encode_header(start_time):
+    """Encode the file header."""
+    return HEADER.pack(MAGIC, VERSION, start_time)
+
+
+def _frame(record_type, timestamp, payload):
+    """Wrap a payload with its type, timestamp and length prefix."""
+    body_length = RECORD_HEAD.size + len(payload)
+    return LENGTH.pack(body_length) + RECORD_HEAD.pack(record_type, timestamp) + payload
+
+
+def encode_key(timestamp, key_id, name):
+    """Encode a key definition record."""
+    name = name.encode("utf-8")
+    return _frame(REC_KEY, timestamp, _KEY_HEAD.pack(key_id, len(name)) + name)
+
+
+def encode_telemetry(timestamp, key_id, value):
+    """Encode a telemetry sample. Returns None for unsupported value types."""
+    if isinstance(value, bool):
+        payload = _TELEMETRY_HEAD.pack(key_id, VALUE_BOOLEAN) + _U8.pack(value)
+    elif isinstance(value, (int, float)):
+        payload = _TELEMETRY_HEAD.pack(key_id, VALUE_DOUBLE) + _F64.pack(value)
+    elif isinstance(value, str):
+        text = value.encode("utf-8")
+        payload = _TELEMETRY_HEAD.pack(key_id, VALUE_STRING) + _U16.pack(len(text)) + text
+    elif isinstance(value, (tuple, list)) and all(isinstance(v, (int, float)) for v in value):
+        payload = (_TELEMETRY_HEAD.pack(key_id, VALUE_DOUBLE_ARRAY) + _U16.pack(len(value)) +
+                   struct.pack(f"<{len(value)}d", *value))
+    else:
+        return None
+    return _frame(REC_TELEMETRY, timestamp, payload)
+
+
+def encode_joystick(timestamp, axes, buttons, slot=0):
+    """Encode a joystick frame (up to 255 axes and 64 buttons)."""
+    axes = axes[:255]
+    buttons = buttons[:64]
+    mask = 0
+    for i, pressed in enumerate(buttons):
+        if pressed:
+            mask |= 1 << i
+    payload = (struct.pack(f"<BB{len(axes)}f", slot, len(axes), *axes) +
+               struct.pack("<BQ", len(buttons), mask))
+    return _frame(REC_JOYSTICK, timestamp, payload)
+
+
+def encode_state(timestamp, enabled, mode):
+    """Encode an enable/mode state record."""
+    mode_code = MODES.index(mode) if mode in MODES else 0
+    return _frame(REC_STATE, timestamp, _STATE.pack(bool(enabled), mode_code))
+
+
+def encode_index(timestamp, entries, keys):
+    """Encode the index record (time/offset pairs plus the key table)."""
+    parts = [_U32.pack(len(entries))]
+    parts.extend(INDEX_ENTRY.pack(t, offset) for t, offset in entries)
+    parts.append(_U16.pack(len(keys)))
+    for key_id, name in keys.items():
+        name = name.encode("utf-8")
+        parts.append(_KEY_HEAD.pack(key_id, len(name)) + name)
+    return _frame(REC_INDEX, timestamp, b"".join(parts))
+
+
+def encode_trailer(index_offset):
+    """Encode the trailer pointing at the index record."""
+    return TRAILER.pack(TRAILER_MAGIC, index_offset)
+
+
+def decode_record(body):
+    """Decode a record body into (record type, timestamp, payload tuple)."""
+    record_type, timestamp = RECORD_HEAD.unpack_from(body, 0)
+    offset = RECORD_HEAD.size
+    
+    if record_type == REC_TELEMETRY:
+        key_id, kind = _TELEMETRY_HEAD.unpack_from(body, offset)
+        offset += _TELEMETRY_HEAD.size
+        if kind == VALUE_DOUBLE:
+            value = _F64.unpack_from(body, offset)[0]
+        elif kind == VALUE_BOOLEAN:
+            value = bool(body[offset])
+        elif kind == VALUE_STRING:
+            length = _U16.unpack_from(body, offset)[0]
+            value = bytes(body[offset + 2:offset + 2 + length]).decode("utf-8")
+        else:
+            count = _U16.unpack_from(body, offset)[0]
+            value = struct.unpack_from(f"<{count}d", body, offset + 2)
+        return record_type, timestamp, (key_id, value)
+    
+    if record_type == REC_JOYSTICK:
+        slot, axis_count = struct.unpack_from("<BB", body, offset)
+        offset += 2
+        axes = struct.unpack_from(f"<{axis_count}f", body, offset)
+        offset += 4 * axis_count
+        button_count, mask = struct.unpack_from("<BQ", body, offset)
+        buttons = [bool(mask & (1 << i)) for i in range(button_count)]
+        return record_type, timestamp, (slot, list(axes), buttons)
+    
+    if record_type == REC_STATE:
+        enabled, mode_code = _STATE.unpack_from(body, offset)
+        mode = MODES[mode_code] if mode_code < len(MODES) else "teleop"
+        return record_type, timestamp, (bool(enabled), mode)
+    
+    if record_type == REC_KEY:
+        key_id, length = _KEY_HEAD.unpack_from(body, offset)
+        offset += _KEY_HEAD.size
+        return record_type, timestamp, (key_id, bytes(body[offset:offset + length]).decode("utf-8"))
+    
+    if record_type == REC_INDEX:
+        return record_type, timestamp, decode_index_payload(body, offset)
+    
+    return record_type, timestamp, None
+
+
+def decode_index_payload(body, offset):
+    """Decode the payload of an INDEX record into (entries, keys)."""
+    count = _U32.unpack_from(body, offset)[0]
+    offset += _U32.size
+    entries = []
+    for _ in range(count):
+        entries.append(INDEX_ENTRY.unpack_from(body, offset))
+        offset += INDEX_ENTRY.size
+    
+    key_count = _U16.unpack_from(body, offset)[0]
+    offset += _U16.size
+    keys = {}
+    for _ in range(key_count):
+        key_id, length = _KEY_HEAD.unpack_from(body, offset)
+        offset += _KEY_HEAD.size
+        keys[key_id] = bytes(body[offset:offset + length]).decode("utf-8")
+        offset += length
+    return entries, keys
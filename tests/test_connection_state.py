@@ -0,0 +1,42 @@
+"""
+Tests for the reconnect backoff policy.
+"""
+
+import unittest
+
+from network.connection_state import BackoffPolicy
+
+
+class BackoffPolicyTest(unittest.TestCase):
+    
+    def test_delay_doubles_up_to_maximum(self):
+        policy = BackoffPolicy(initial=0.5, maximum=8.0, jitter=0.0)
+        delays = [policy.next_delay() for _ in range(7)]
+        self.assertEqual(delays, [0.5, 1.0, 2.0, 4.0, 8.0, 8.0, 8.0])
+    
+    def test_long_run_of_failed_attempts(self):
+        # Hours of a switched-off robot: the exponent must not overflow
+        policy = BackoffPolicy(initial=0.5, maximum=8.0, jitter=0.25)
+        for _ in range(100000):
+            delay = policy.next_delay()
+            self.assertLessEqual(delay, 8.0 * 1.25)
+        self.assertGreaterEqual(delay, 8.0 * 0.75)
+        self.assertLess(policy.attempts, 10)
+    
+    def test_zero_initial_delay(self):
+        # reconnect_backoff_initial = 0 retries at once and must not overflow either
+        policy = BackoffPolicy(initial=0.0, maximum=8.0, jitter=0.25)
+        for _ in range(5000):
+            self.assertEqual(policy.next_delay(), 0.0)
+        self.assertLessEqual(policy.attempts, 64)
+    
+    def test_reset_starts_over(self):
+        policy = BackoffPolicy(initial=0.5, maximum=8.0, jitter=0.0)
+        for _ in range(2000):
+            policy.next_delay()
+        policy.reset()
+        self.assertEqual(policy.next_delay(), 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+Tests for controller slot assignment.
+"""
+
+import unittest
+
+from controllers.controller_registry import ControllerRegistry
+from tools.fake_joysticks import FakePygame
+
+
+def registry_with(assigned_slots=None, controllers=3):
+    registry = ControllerRegistry(max_slots=6, assigned_slots=assigned_slots)
+    registry.pygame = FakePygame(controllers=controllers)
+    return registry
+
+
+class ControllerRegistryTest(unittest.TestCase):
+    
+    def test_plug_order_without_assignments(self):
+        registry = registry_with()
+        slots = [registry.device_added(i).slot for i in (2, 0, 1)]
+        self.assertEqual(slots, [0, 1, 2])
+    
+    def test_assigned_slots_win_over_plug_order(self):
+        registry = registry_with({"scripted-0": 1, "scripted-2": 0})
+        entries = [registry.device_added(i) for i in (1, 0, 2)]
+        self.assertEqual([(entry.guid, entry.slot) for entry in entries],
+                         [("scripted-1", 2), ("scripted-0", 1), ("scripted-2", 0)])
+    
+    def test_move_swaps_with_occupied_slot(self):
+        registry = registry_with()
+        first = registry.device_added(0)
+        second = registry.device_added(1)
+        moves = registry.move(first.instance_id, 1)
+        self.assertEqual([(old.slot, new.slot) for old, new in moves], [(0, 1), (1, 0)])
+        self.assertEqual(registry.by_slot(0).instance_id, second.instance_id)
+        self.assertEqual(registry.by_slot(1).instance_id, first.instance_id)
+        
+        # Replugged devices go back to the slots they were moved to
+        registry.device_removed(first.instance_id)
+        registry.device_removed(second.instance_id)
+        self.assertEqual(registry.device_added(1).slot, 0)
+        self.assertEqual(registry.device_added(0).slot, 1)
+    
+    def test_device_without_free_slot_is_closed(self):
+        registry = ControllerRegistry(max_slots=2)
+        registry.pygame = FakePygame(controllers=3)
+        registry.device_added(0)
+        registry.device_added(1)
+        self.assertIsNone(registry.device_added(2))
+        self.assertFalse(registry.pygame.sticks[2].opened)
+        self.assertTrue(registry.pygame.sticks[0].opened)
+    
+    def test_move_to_same_or_invalid_slot_does_nothing(self):
+        registry = registry_with()
+        entry = registry.device_added(0)
+        self.assertEqual(registry.move(entry.instance_id, 0), [])
+        self.assertEqual(registry.move(entry.instance_id, 6), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Tests for rate control levels and low-priority telemetry periods.
+"""
+
+import time
+import unittest
+
+from network.rate_controller import RateController, LEVELS
+
+try:
+    import ntcore
+except ImportError:
+    ntcore = None
+
+
+class StubStats:
+    
+    def snapshot(self):
+        return {"bytes_per_second": 0}
+
+
+class StubPublisher:
+    
+    def __init__(self):
+        self.quantization = 0.01
+        self.max_rate = None
+        self.stats = StubStats()
+
+
+class StubHeartbeat:
+    
+    def __init__(self):
+        self.table = None
+        self.rate = 10.0
+        self.rtt = None
+    
+    def snapshot(self):
+        return {"rtt_mean_ms": self.rtt}
+
+
+class RateControllerTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.heartbeat = StubHeartbeat()
+        self.controller = RateController(StubPublisher(), self.heartbeat,
+                                         ["BatteryVoltage", "Arm/Angle", "Vision/Targets"],
+                                         rtt_limit_ms=50.0, hold=1, recover=1)
+        self.periods = []
+        self.controller.on_telemetry_period = lambda keys, period: self.periods.append((keys, period))
+        self.controller.start(None, threaded=False)
+    
+    def step(self, rtt):
+        self.heartbeat.rtt = rtt
+        self.controller.evaluate()
+    
+    def test_throttled_levels_slow_down_low_priority_keys(self):
+        for _ in range(len(LEVELS) - 1):
+            self.step(200.0)
+        self.assertEqual(self.controller.level, len(LEVELS) - 1)
+        low_priority = ["Arm/Angle", "Vision/Targets"]
+        self.assertEqual(self.periods, [(low_priority, LEVELS[2].telemetry_period),
+                                        (low_priority, LEVELS[3].telemetry_period)])
+        
+        for _ in range(len(LEVELS) - 1):
+            self.step(1.0)
+        self.assertEqual(self.controller.level, 0)
+        self.assertEqual(self.periods[-1], (low_priority, None))
+        self.assertEqual(len(self.periods), 4)
+
+
+@unittest.skipIf(ntcore is None, "needs pyntcore")
+class NT4KeyPeriodTest(unittest.TestCase):
+    
+    def test_set_key_period_resubscribes_listeners(self):
+        from network.nt4_client import NT4Client
+        client = NT4Client(identity="test-key-period", port=5897)
+        client.initialize(listen_address="127.0.0.1")
+        try:
+            table = client.getTable("SmartDashboard")
+            values = []
+            listener = lambda source, key, value, is_new: values.append(value)
+            table.addEntryListener(listener, key="Arm")
+            
+            table.set_key_period("Arm", 0.5)
+            table.set_key_period("Arm", 0.5)  # Unchanged: no new subscription
+            self.assertEqual(table.key_periods, {"Arm": 0.5})
+            self.assertEqual(len(table._listeners[listener]), 1)
+            
+            # The listener still gets updates through the new subscription
+            table.putNumber("Arm", 1.5)
+            deadline = time.monotonic() + 2.0
+            while not values and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(values[-1:], [1.5])
+            
+            table.set_key_period("Arm", None)
+            self.assertEqual(table.key_periods, {})
+        finally:
+            client.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
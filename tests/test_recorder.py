@@ -0,0 +1,64 @@
+"""
+Tests for session log retention and recorder limits.
+"""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from recording.recorder import SessionRecorder, prune_sessions
+from recording.replay import SessionReader
+
+
+class RecorderLimitsTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name)
+    
+    def tearDown(self):
+        self.directory.cleanup()
+    
+    def test_prune_keeps_newest_sessions(self):
+        names = [f"session-20260101-0000{i:02d}.dslog" for i in range(5)]
+        for name in names + ["notes.txt"]:
+            (self.path / name).write_bytes(b"x")
+        prune_sessions(self.path, 2)
+        self.assertEqual(sorted(os.listdir(self.path)), ["notes.txt"] + names[3:])
+    
+    def test_create_in_leaves_room_for_the_new_session(self):
+        for i in range(5):
+            (self.path / f"session-20260101-0000{i:02d}.dslog").write_bytes(b"x")
+        recorder = SessionRecorder.create_in(self.path, keep_sessions=3)
+        recorder.start()
+        recorder.close()
+        self.assertEqual(len(list(self.path.glob("session-*.dslog"))), 3)
+    
+    def test_queue_is_bounded(self):
+        # No writer thread: nothing drains the queue
+        recorder = SessionRecorder(self.path / "session.dslog", max_queue=100)
+        recorder._running = True
+        for i in range(150):
+            recorder.record_joystick([0.0, 0.5], [1, 0])
+        self.assertEqual(recorder._queue.qsize(), 100)
+        self.assertEqual(recorder.dropped, 50)
+    
+    def test_session_stops_at_size_limit(self):
+        recorder = SessionRecorder(self.path / "session.dslog", max_bytes=20000)
+        recorder.start()
+        for i in range(5000):
+            recorder.record_joystick([i / 5000.0] * 6, [i & 1] * 16)
+        recorder.close()
+        self.assertTrue(recorder.full)
+        self.assertGreater(recorder.dropped, 0)
+        self.assertLess(recorder.path.stat().st_size, 20000 + recorder.flush_bytes)
+        
+        # Still a complete log
+        reader = SessionReader(recorder.path)
+        self.assertGreater(len(list(reader.records())), 0)
+        reader.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+Tests for the shared-memory state block.
+"""
+
+import time
+import unittest
+
+from core.shared_state import SharedState, SEQUENCE
+
+
+LOOP_STATS = {"ticks": 1, "overruns": 0, "skipped_ticks": 0,
+              "jitter_mean_ms": 0.1, "jitter_max_ms": 0.2, "tick_time_max_ms": 0.3}
+
+
+def write(shared, axes):
+    shared.write("connected", True, False, "teleop", False, True, LOOP_STATS, 5.0, None,
+                 axes, [[True]], [])
+
+
+class SharedStateTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.writer = SharedState(create=True)
+        self.reader = SharedState(self.writer.name)
+    
+    def tearDown(self):
+        self.reader.close()
+        self.writer.close()
+    
+    def test_read_before_and_after_write(self):
+        self.assertIsNone(self.reader.read())
+        write(self.writer, [[0.5, -0.25]])
+        snapshot = self.reader.read()
+        self.assertEqual(snapshot.axes, [[0.5, -0.25]])
+        self.assertEqual(snapshot.state, "connected")
+    
+    def test_writer_dying_mid_write_does_not_hang_reader(self):
+        write(self.writer, [[0.5]])
+        good = self.reader.read()
+        SEQUENCE.pack_into(self.writer.shm.buf, 0, 3)  # Odd: write left in progress
+        
+        started = time.monotonic()
+        self.assertIs(self.reader.read(), good)
+        self.assertIs(self.reader.read(), good)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(self.reader.failed_reads, 2)
+        
+        # A later complete write is read again
+        write(self.writer, [[0.75]])
+        self.assertEqual(self.reader.read().axes, [[0.75]])
+    
+    def test_close_removes_block_while_a_view_is_alive(self):
+        shared = SharedState(create=True)
+        view = shared.shm.buf[0:8]
+        shared.close()
+        view.release()
+        with self.assertRaises(FileNotFoundError):
+            SharedState(shared.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+"""
+Tests for latency timing of frames sent by the UDP control engine.
+"""
+
+import time
+import unittest
+
+from core.latency import LatencyTracker
+from network.udp_control import UdpControlEngine
+
+
+class FakeSocket:
+    """Collects packets instead of sending them."""
+    
+    def __init__(self):
+        self.packets = []
+    
+    def sendto(self, packet, address):
+        self.packets.append(packet)
+
+
+class UdpLatencyTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.engine = UdpControlEngine()
+        self.engine.address = "127.0.0.1"
+        self.engine._sock = FakeSocket()
+        self.engine.latency = LatencyTracker()
+    
+    def tick(self, axes, buttons, captured):
+        # One control loop tick followed by one 50 Hz packet
+        self.engine.set_joysticks(axes, buttons, captured, captured)
+        self.engine.send_now()
+    
+    def test_unchanged_frame_is_timed_once(self):
+        captured = time.monotonic()
+        for _ in range(5):
+            self.tick([[0.5, 0.0]], [[False]], captured)
+        self.assertEqual(len(self.engine._sock.packets), 5)
+        self.assertEqual(self.engine.latency.frames, 1)
+    
+    def test_new_frame_is_timed(self):
+        self.tick([[0.5, 0.0]], [[False]], time.monotonic())
+        self.tick([[0.5, 0.0]], [[False]], time.monotonic())
+        self.tick([[0.6, 0.0]], [[True]], time.monotonic())
+        self.assertEqual(self.engine.latency.frames, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
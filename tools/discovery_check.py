@@ -0,0 +1,82 @@
+"""
+Robot discovery check with local listeners.
+
+Starts a TCP listener on a separate loopback address for each candidate
+(127.0.0.2 stands in for mDNS, 127.0.0.3 for 10.TE.AM.2, 127.0.0.4 for USB,
+127.0.0.5 for localhost), each answering only after its own delay or not
+at all, and runs discovery against them a few times to show which one wins
+and how the cached winner is tried first.
+
+Run from the repository root (Linux, where all of 127.0.0.0/8 is local):
+    python tools/discovery_check.py [--delays 0.3,0.1,none,0.2]
+"""
+
+import argparse
+import os
+import socket
+import sys
+import time
+from threading import Thread
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from network.discovery import RobotDiscovery
+
+
+STAND_INS = (("mDNS", "127.0.0.2"), ("10.TE.AM.2", "127.0.0.3"),
+             ("USB", "127.0.0.4"), ("localhost", "127.0.0.5"))
+PORT = 18735
+
+
+def listen(address, delay):
+    """Start accepting connections on address after delay seconds."""
+    def serve():
+        time.sleep(delay)
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind((address, PORT))
+        server.listen(16)
+        while True:
+            connection, _ = server.accept()
+            connection.close()
+    
+    Thread(target=serve, daemon=True).start()
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Robot discovery check")
+    parser.add_argument("--delays", default="0.3,0.1,none,0.2",
+                        help="seconds until each stand-in (mDNS, static, USB, localhost) "
+                             "starts answering, 'none' to never answer")
+    parser.add_argument("--runs", type=int, default=3, help="discovery runs")
+    return parser.parse_args()
+
+
+def main():
+    """Race the stand-ins and print the outcome of each run."""
+    args = parse_args()
+    delays = [None if d.strip() == "none" else float(d) for d in args.delays.split(",")]
+    for (name, address), delay in zip(STAND_INS, delays):
+        if delay is not None:
+            listen(address, delay)
+        print(f"{name:>10} -> {address}: " + ("no listener" if delay is None else f"answers after {delay:g} s"))
+    
+    start = time.monotonic()
+    cache = {}
+    discovery = RobotDiscovery(port=PORT, cache=cache, candidates=[address for _, address in STAND_INS])
+    for run in range(args.runs):
+        found = discovery.discover(2026, timeout=3.0)
+        at = time.monotonic() - start
+        if found is None:
+            print(f"run {run + 1} (t={at:.2f} s): nothing answered")
+        else:
+            candidate, ip, elapsed = found
+            print(f"run {run + 1} (t={at:.2f} s): {candidate} won after {1000.0 * elapsed:.0f} ms, "
+                  f"cached first next time")
+        for candidate, result in discovery.results.items():
+            print(f"    {candidate}: {result}")
+
+
+if __name__ == "__main__":
+    main()
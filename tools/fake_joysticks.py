@@ -0,0 +1,161 @@
+"""
+Scripted joystick backend for benchmarks.
+
+FakePygame has the pygame calls ControllerManager makes (display and
+joystick init, event wait/get, Joystick objects and the event type
+constants), so it can be passed as its backend. Its controllers are
+attached at start-up and their sticks move on a fixed schedule: every
+1/rate seconds each one gets new axis values and an axis motion event,
+and its buttons show the tick number as a binary counter. The time each
+tick was emitted is kept, so a benchmark that reads the button bitmask
+back on the robot side can measure end-to-end latency.
+    
+    joysticks = FakePygame(controllers=4, rate=100)
+    manager = ControllerManager(event_thread="input", backend=joysticks)
+"""
+
+import math
+import time
+from collections import deque
+from threading import Condition
+
+
+# Event types, as in pygame
+NOEVENT = 0
+JOYAXISMOTION = 1536
+JOYBUTTONDOWN = 1539
+JOYBUTTONUP = 1540
+JOYDEVICEADDED = 1541
+JOYDEVICEREMOVED = 1542
+
+
+class FakeEvent:
+    """A pygame event: a type and attributes."""
+    
+    def __init__(self, type, **attributes):
+        self.type = type
+        self.__dict__.update(attributes)
+
+
+class ScriptedJoystick:
+    """A pygame.joystick.Joystick whose state is set by FakePygame."""
+    
+    def __init__(self, device_index, num_axes, num_buttons):
+        self.device_index = device_index
+        self.axes = [0.0] * num_axes
+        self.buttons = [0] * num_buttons
+        self.opened = False
+    
+    def init(self):
+        self.opened = True
+    
+    def quit(self):
+        self.opened = False
+    
+    def get_instance_id(self):
+        return 100 + self.device_index
+    
+    def get_guid(self):
+        return f"scripted-{self.device_index}"
+    
+    def get_name(self):
+        return f"Scripted Pad {self.device_index}"
+    
+    def get_numaxes(self):
+        return len(self.axes)
+    
+    def get_numbuttons(self):
+        return len(self.buttons)
+    
+    def get_axis(self, i):
+        return self.axes[i]
+    
+    def get_button(self, i):
+        return self.buttons[i]
+
+
+class _Namespace:
+    """Holds the functions of one pygame submodule."""
+    
+    def __init__(self, **functions):
+        self.__dict__.update(functions)
+
+
+class FakePygame:
+    """pygame stand-in with scripted controllers."""
+    
+    NOEVENT = NOEVENT
+    JOYAXISMOTION = JOYAXISMOTION
+    JOYBUTTONDOWN = JOYBUTTONDOWN
+    JOYBUTTONUP = JOYBUTTONUP
+    JOYDEVICEADDED = JOYDEVICEADDED
+    JOYDEVICEREMOVED = JOYDEVICEREMOVED
+    
+    class error(RuntimeError):
+        pass
+    
+    def __init__(self, controllers=1, rate=100.0, num_axes=6, num_buttons=16):
+        self.rate = rate
+        self.sticks = [ScriptedJoystick(i, num_axes, num_buttons) for i in range(controllers)]
+        self.tick = 0
+        self.tick_times = {}  # Tick number (mod 2 ** num_buttons) -> time.monotonic() emitted
+        self._tick_mask = (1 << num_buttons) - 1
+        self._next_tick = None
+        self._queue = deque()
+        self._condition = Condition()
+        
+        self.display = _Namespace(init=self._init_display)
+        self.joystick = _Namespace(init=lambda: None, Joystick=self._open)
+        self.event = _Namespace(wait=self.wait, get=self.get, Event=FakeEvent)
+    
+    def _init_display(self):
+        """Attach every controller and start the script."""
+        with self._condition:
+            self._queue.extend(FakeEvent(JOYDEVICEADDED, device_index=stick.device_index)
+                               for stick in self.sticks)
+            self._next_tick = time.monotonic()
+    
+    def _open(self, device_index):
+        return self.sticks[device_index]
+    
+    def _emit_ticks(self, now):
+        """Move the sticks for every tick that is due and queue their events."""
+        while self._next_tick is not None and now >= self._next_tick:
+            self.tick += 1
+            counter = self.tick & self._tick_mask
+            self.tick_times[counter] = self._next_tick
+            phase = self.tick / self.rate
+            for stick in self.sticks:
+                for i in range(len(stick.axes)):
+                    stick.axes[i] = math.sin(2.0 * phase + i + stick.device_index)
+                for i in range(len(stick.buttons)):
+                    stick.buttons[i] = (counter >> i) & 1
+                self._queue.append(FakeEvent(JOYAXISMOTION, instance_id=stick.get_instance_id(),
+                                             axis=0, value=stick.axes[0]))
+            self._next_tick += 1.0 / self.rate
+    
+    def wait(self, timeout=0):
+        """Next event, waiting up to timeout ms for the script; NOEVENT if none."""
+        deadline = time.monotonic() + timeout / 1000.0
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._emit_ticks(now)
+                if self._queue:
+                    return self._queue.popleft()
+                due = deadline if self._next_tick is None else min(deadline, self._next_tick)
+                if now >= deadline:
+                    return FakeEvent(NOEVENT)
+                self._condition.wait(max(0.0, due - now))
+    
+    def get(self):
+        """All pending events."""
+        with self._condition:
+            self._emit_ticks(time.monotonic())
+            events = list(self._queue)
+            self._queue.clear()
+            return events
+    
+    def emitted(self, mask):
+        """When the tick shown by a button bitmask was emitted, or None."""
+        return self.tick_times.get(int(mask))
@@ -0,0 +1,162 @@
+"""
+In-process NetworkTables stand-in for benchmarks.
+
+FakeNetworkTables has the NT3 instance calls RobotConnection uses, so it
+can be passed as its nt_backend. There is no server and no socket: the
+driver station and the "robot" (e.g. a HeartbeatEcho, or a benchmark
+listening for joystick frames) share the same tables. As with
+pynetworktables, entry and connection listeners run on a notifier thread
+of their own, and only for values that changed.
+    
+    nt = FakeNetworkTables()
+    robot = RobotConnection(robot_address="fake", nt_backend=nt)
+    HeartbeatEcho(nt.getTable("DriverStation"), nt.flush)
+"""
+
+import queue
+import time
+from threading import Thread, Lock
+
+
+class FakeTable:
+    """One table: values by key, write counts and entry listeners."""
+    
+    def __init__(self, instance, name):
+        self.instance = instance
+        self.name = name
+        self.values = {}
+        self.writes = 0  # Writes that changed a value
+        self.write_counts = {}  # Key -> writes that changed it
+        self._listeners = []  # (listener, key or None)
+        self._lock = Lock()
+    
+    def _put(self, key, value):
+        """Store a value and queue listener calls if it changed."""
+        with self._lock:
+            if self.values.get(key) == value:
+                return True
+            is_new = key not in self.values
+            self.values[key] = value
+            self.writes += 1
+            self.write_counts[key] = self.write_counts.get(key, 0) + 1
+            listeners = [listener for listener, only in self._listeners if only in (None, key)]
+        for listener in listeners:
+            self.instance._notify(listener, (self, key, value, is_new))
+        return True
+    
+    def putBoolean(self, key, value):
+        return self._put(key, bool(value))
+    
+    def putNumber(self, key, value):
+        return self._put(key, float(value))
+    
+    def putString(self, key, value):
+        return self._put(key, str(value))
+    
+    def putNumberArray(self, key, values):
+        return self._put(key, tuple(float(v) for v in values))
+    
+    def putBooleanArray(self, key, values):
+        return self._put(key, tuple(bool(v) for v in values))
+    
+    def putStringArray(self, key, values):
+        return self._put(key, tuple(str(v) for v in values))
+    
+    def _get(self, key, default):
+        return self.values.get(key, default)
+    
+    getBoolean = getNumber = getString = _get
+    getNumberArray = getBooleanArray = getStringArray = _get
+    
+    def addEntryListener(self, listener, immediateNotify=False, key=None, localNotify=True):
+        """Call listener(table, key, value, is_new) on changes (of one key)."""
+        with self._lock:
+            self._listeners.append((listener, key))
+            current = [(k, v) for k, v in self.values.items() if key in (None, k)]
+        if immediateNotify:
+            for k, v in current:
+                self.instance._notify(listener, (self, k, v, True))
+    
+    def removeEntryListener(self, listener):
+        with self._lock:
+            self._listeners = [(l, key) for l, key in self._listeners if l != listener]
+
+
+class FakeNetworkTables:
+    """NT3 instance stand-in, connected as soon as it is initialized."""
+    
+    def __init__(self, connect_delay=0.0):
+        self.connect_delay = connect_delay  # Seconds from initialize() to connected
+        self.server = None
+        self.connected = False
+        self.flushes = 0
+        self._tables = {}
+        self._connection_listeners = []
+        self._notifications = None
+        self._notifier = None
+        self._lock = Lock()
+    
+    def initialize(self, server=None):
+        """Start the notifier thread and "connect" to the server."""
+        self.server = server
+        self._notifications = queue.Queue()
+        self._notifier = Thread(target=self._run_notifier, args=(self._notifications,),
+                                name="fake-nt-notifier", daemon=True)
+        self._notifier.start()
+        if self.connect_delay:
+            time.sleep(self.connect_delay)
+        self._set_connected(True)
+        return True
+    
+    def shutdown(self):
+        """Disconnect and stop the notifier thread; listeners are dropped."""
+        if self._notifier is None:
+            return
+        self._set_connected(False)
+        self._notifications.put(None)
+        self._notifier.join(timeout=1.0)
+        self._notifier = None
+        self._connection_listeners = []
+        for table in self._tables.values():
+            table._listeners = []
+    
+    def isConnected(self):
+        return self.connected
+    
+    def addConnectionListener(self, listener, immediateNotify=False):
+        """Call listener(connected, info) when the connection changes."""
+        self._connection_listeners.append(listener)
+        if immediateNotify and self.connected:
+            self._notify(listener, (True, {"remote_ip": self.server}))
+    
+    def getTable(self, name):
+        with self._lock:
+            table = self._tables.get(name)
+            if table is None:
+                table = self._tables[name] = FakeTable(self, name)
+            return table
+    
+    def flush(self):
+        self.flushes += 1
+    
+    def _set_connected(self, connected):
+        self.connected = connected
+        for listener in list(self._connection_listeners):
+            self._notify(listener, (connected, {"remote_ip": self.server}))
+    
+    def _notify(self, listener, args):
+        """Queue a listener call for the notifier thread."""
+        if self._notifications is not None:
+            self._notifications.put((listener, args))
+    
+    def _run_notifier(self, notifications):
+        """Call listeners in order, like the pynetworktables notifier thread."""
+        while True:
+            item = notifications.get()
+            if item is None:
+                return
+            listener, args = item
+            try:
+                listener(*args)
+            except Exception as e:
+                print(f"Error in fake NetworkTables listener: {e}")
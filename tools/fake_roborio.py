@@ -0,0 +1,116 @@
+"""
+Loopback stand-in for the roboRIO side of the driver station UDP protocol.
+
+Listens for control packets, answers each with a status packet echoing its
+sequence number, and prints enable/mode/joystick changes. Point the driver
+station at it with "transport": "udp" and "robot_address": "127.0.0.1".
+
+Run from the repository root:
+    python tools/fake_roborio.py [--delay 0.01] [--drop 0.05] [--brownout-after 10]
+"""
+
+import argparse
+import os
+import random
+import socket
+import sys
+import time
+from threading import Timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from network import ds_protocol
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Fake roboRIO (driver station UDP protocol)")
+    parser.add_argument("--port", type=int, default=ds_protocol.ROBOT_PORT,
+                        help="port to receive control packets on")
+    parser.add_argument("--reply-port", type=int, default=ds_protocol.DS_PORT,
+                        help="driver station port to send status packets to")
+    parser.add_argument("--delay", type=float, default=0.0,
+                        help="extra seconds before each status reply")
+    parser.add_argument("--drop", type=float, default=0.0,
+                        help="fraction of control packets not answered (0-1)")
+    parser.add_argument("--brownout-after", type=float, default=None,
+                        help="report a brownout after this many seconds")
+    parser.add_argument("--duration", type=float, default=None,
+                        help="exit after this many seconds")
+    parser.add_argument("--quiet", action="store_true", help="only print the periodic summary")
+    return parser.parse_args()
+
+
+def send_reply(sock, reply, address):
+    """Send a status packet, ignoring a socket closed in the meantime."""
+    try:
+        sock.sendto(reply, address)
+    except OSError:
+        pass
+
+
+def main():
+    """Answer control packets until interrupted."""
+    args = parse_args()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("", args.port))
+    sock.settimeout(0.1)
+    print(f"Fake roboRIO listening on UDP {args.port}, replying to {args.reply_port}")
+    
+    start = time.monotonic()
+    last_report = start
+    received = 0
+    answered = 0
+    state = None
+    asked_for_date = False
+    
+    try:
+        while args.duration is None or time.monotonic() - start < args.duration:
+            now = time.monotonic()
+            if now - last_report >= 5.0:
+                print(f"Received {received} control packets, answered {answered}")
+                last_report = now
+            
+            try:
+                packet, (host, _) = sock.recvfrom(1500)
+            except socket.timeout:
+                continue
+            received += 1
+            sequence, enabled, mode, estop, request, station, joysticks, tags = \
+                ds_protocol.decode_control(packet)
+            
+            if (enabled, mode, estop) != state:
+                state = (enabled, mode, estop)
+                print(f"Enabled = {enabled}, Mode = {mode}, E-stop = {estop}, station {station}")
+            if not args.quiet and joysticks:
+                axes = ", ".join(f"{v:+.2f}" for v in joysticks[0][0][:4])
+                print(f"#{sequence} {len(joysticks)} joysticks, slot 0 axes {axes}")
+            if ds_protocol.TAG_DATE in tags:
+                print("Received date from driver station")
+            
+            if args.drop and random.random() < args.drop:
+                continue
+            
+            # Simulated battery sagging under load while enabled
+            battery = 12.6 - (0.8 if enabled else 0.0) - 0.2 * abs((now % 4.0) - 2.0)
+            brownout = args.brownout_after is not None and now - start > args.brownout_after
+            reply = ds_protocol.encode_status(
+                sequence, enabled and not estop, mode, battery, estop=estop, brownout=brownout,
+                request_date=not asked_for_date,
+                tags=(ds_protocol.encode_cpu(30.0 + 10.0 * random.random()),))
+            asked_for_date = True
+            
+            if args.delay:
+                Timer(args.delay, send_reply, (sock, reply, (host, args.reply_port))).start()
+            else:
+                send_reply(sock, reply, (host, args.reply_port))
+            answered += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Stand-in robot for testing without a roboRIO.
+
+Runs a NetworkTables server that publishes battery and roboRIO telemetry,
+echoes driver station heartbeats and prints enable/mode changes. Point the
+driver station at it with "robot_address": "127.0.0.1" in the config file.
+With --nt4 the server is an NT4 (pyntcore) server, which accepts both NT4
+and NT3 driver stations like a current roboRIO. --address serves on one
+loopback address only, so several stand-ins can run side by side (Linux).
+
+Run from the repository root:
+    python tools/stand_in_robot.py [--nt4] [--address 127.0.0.2] [--delay 0.02] [--drop 0.1]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from networktables import NetworkTables
+from network.heartbeat import HeartbeatEcho
+
+
+class StandInEcho(HeartbeatEcho):
+    """Heartbeat echo that can drop heartbeats and stop answering."""
+    
+    def __init__(self, table, flush=None, delay=0.0, drop=0.0):
+        self.drop = drop
+        self.paused = False
+        self.dropped = 0
+        super().__init__(table, flush, delay)
+    
+    def _on_heartbeat(self, table, key, value, is_new):
+        """Echo unless paused or randomly dropped."""
+        if self.paused:
+            return
+        if self.drop and random.random() < self.drop:
+            self.dropped += 1
+            return
+        super()._on_heartbeat(table, key, value, is_new)
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Stand-in robot (NetworkTables server)")
+    parser.add_argument("--delay", type=float, default=0.0,
+                        help="extra seconds before each heartbeat echo")
+    parser.add_argument("--drop", type=float, default=0.0,
+                        help="fraction of heartbeats not echoed (0-1)")
+    parser.add_argument("--stop-echo-after", type=float, default=None,
+                        help="stop echoing after this many seconds (tests the automatic disable)")
+    parser.add_argument("--nt4", action="store_true",
+                        help="run an NT4 server (ports 5810 and 1735) instead of NT3")
+    parser.add_argument("--address", default="",
+                        help="listen on this address only (default: all)")
+    parser.add_argument("--duration", type=float, default=None,
+                        help="exit after this many seconds")
+    return parser.parse_args()
+
+
+def main():
+    """Serve until interrupted."""
+    args = parse_args()
+    nt = NetworkTables
+    if args.nt4:
+        from network.nt4_client import NT4Client
+        nt = NT4Client()
+    nt.setNetworkIdentity("stand-in-robot")
+    if args.nt4:
+        nt.initialize(listen_address=args.address)  # No server address: run as the server
+    elif args.address:
+        persist = os.path.join(tempfile.gettempdir(), f"stand-in-robot-{args.address}.ini")
+        nt.startServer(persistFilename=persist, listenAddress=args.address)
+    else:
+        nt.initialize()
+    
+    ds_table = nt.getTable("DriverStation")
+    robot_table = nt.getTable("SmartDashboard")
+    echo = StandInEcho(ds_table, nt.flush, args.delay, args.drop)
+    
+    def on_ds_entry(table, key, value, is_new):
+        print(f"{key} = {value}")
+    
+    for key in ("Enabled", "Mode"):
+        ds_table.addEntryListener(on_ds_entry, immediateNotify=False, key=key)
+    
+    print("Stand-in robot serving NetworkTables " +
+          ("4 on ports 5810 and 1735" if args.nt4 else "3 on port 1735") +
+          (f" at {args.address}" if args.address else ""))
+    start = time.monotonic()
+    last_report = start
+    try:
+        while args.duration is None or time.monotonic() - start < args.duration:
+            now = time.monotonic()
+            robot_table.putNumber("BatteryVoltage", 12.4 - 0.3 * abs((now % 4.0) - 2.0))
+            robot_table.putNumber("RoboRIO/CPU", 35.0 + 5.0 * (now % 1.0))
+            robot_table.putNumber("RoboRIO/RAM", 48.0)
+            
+            if args.stop_echo_after is not None and not echo.paused \
+                    and now - start > args.stop_echo_after:
+                echo.paused = True
+                print("Stopped echoing heartbeats")
+            
+            if now - last_report >= 5.0:
+                print(f"Echoed {echo.echoed} heartbeats, dropped {echo.dropped}")
+                last_report = now
+            time.sleep(0.05)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        nt.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,39 @@ class Config:
             "alliance": "blue",  # "red" or "blue"
             "station": 1,  # 1, 2, or 3
             "controller_deadzone": 0.1,
+            "controller_deadzones": [],  # Per-slot overrides of controller_deadzone
+            "controller_profiles": {},  # Shaping/calibration by device GUID, name or "default"
+            "controller_max_rate": 100.0,  # Max joystick frames/s forwarded on input changes
+            "controller_event_thread": None,  # "input" or "main", None picks per platform
+            "controller_estop_button": None,  # [slot, button] that e-stops the robot, None for none
+            "controller_slots": {},  # Device GUID -> slot chosen in the window (0 driver, 1 operator, ...)
+            "control_loop_rate": 50.0,  # Joystick frames/s sent by the control loop (max 200)
+            "joystick_publish_mode": "legacy",  # "legacy" (per-key) or "packed" (Joystick/Packed)
+            "joystick_quantization": 0.01,  # Axis step size, 0 to disable
+            "transport": "networktables",  # "networktables" or "udp" (FRC driver station protocol)
+            "networktables_version": 3,  # 3 (pynetworktables) or 4 (pyntcore)
+            "nt4_telemetry_period": 0.05,  # Seconds between telemetry updates requested over NT4
+            "robot_address": None,  # Fixed robot address, skips discovery
+            "robot_address_cache": {},  # Team number -> address that answered last time
+            "discovery_candidates": None,  # Addresses to race instead of mDNS/10.TE.AM.2/USB/localhost
+            "robots": [],  # Several robots at once: one dict of setting overrides (and "name") each
+            "control_worker": False,  # Run controller sampling and the robot link in a separate process
+            "headless_socket": "~/.frc_driverstation.sock",  # Control socket of headless.py
+            "headless_port": 5741,  # Localhost TCP control port instead, where Unix sockets are missing
+            "heartbeat_rate": 10.0,  # Heartbeats/s sent to the robot for RTT and loss
+            "heartbeat_timeout": 0.5,  # Echo age (s) that disables the robot, 0 to never disable
+            "rate_control": True,  # Adapt joystick rate/quantization to the link
+            "rate_budget_bytes": 50000,  # Outgoing bytes/s before rate control steps down
+            "rate_rtt_limit_ms": 50.0,  # Heartbeat RTT before rate control steps down
+            "connect_timeout": 5.0,  # Seconds per connection attempt
+            "reconnect_backoff_initial": 0.5,  # Seconds before the first retry
+            "reconnect_backoff_max": 8.0,  # Upper bound for the retry delay
+            "telemetry_keys": [],  # Extra SmartDashboard keys to display
+            "telemetry_history_samples": 131072,  # Samples kept per channel for the charts
+            "record_sessions": True,  # Write a session log for every run
+            "recording_dir": str(Path.home() / ".frc_driverstation_logs"),
+            "recording_keep_sessions": 20,  # Older session logs are deleted when a session starts
+            "recording_max_session_mb": 200,  # A session stops recording at this size, 0 for no limit
             "window_geometry": None,  # (x, y, width, height)
         }
         
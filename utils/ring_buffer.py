@@ -0,0 +1,106 @@
+"""
+Fixed-memory, timestamped sample history backed by NumPy.
+Used to keep every telemetry sample for plotting without growing memory.
+"""
+
+import numpy as np
+from threading import Lock
+
+
+class RingBuffer:
+    """Preallocated ring of (timestamp, value) samples.
+
+    Once full, the oldest samples are overwritten. Timestamps must be
+    appended in non-decreasing order, which holds for monotonic receive
+    times.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        self._times = np.zeros(self.capacity, dtype=np.float64)
+        self._values = np.zeros(self.capacity, dtype=np.float64)
+        self._head = 0  # Next index to write
+        self._count = 0
+        self._lock = Lock()
+
+    def __len__(self):
+        return self._count
+
+    def append(self, timestamp, value):
+        """Store one sample, overwriting the oldest one when full."""
+        with self._lock:
+            self._times[self._head] = timestamp
+            self._values[self._head] = value
+            self._head = (self._head + 1) % self.capacity
+            if self._count < self.capacity:
+                self._count += 1
+
+    def clear(self):
+        """Drop all samples (memory stays allocated)."""
+        with self._lock:
+            self._head = 0
+            self._count = 0
+
+    def oldest_time(self):
+        """Timestamp of the oldest stored sample, or None when empty."""
+        if self._count == 0:
+            return None
+        return float(self._times[(self._head - self._count) % self.capacity])
+
+    def latest(self):
+        """Most recent (timestamp, value) sample, or None when empty."""
+        if self._count == 0:
+            return None
+        index = (self._head - 1) % self.capacity
+        return float(self._times[index]), float(self._values[index])
+
+    def window(self, start=None, end=None):
+        """Copy the samples with start <= timestamp <= end, oldest first."""
+        with self._lock:
+            if self._count == 0:
+                empty = np.empty(0, dtype=np.float64)
+                return empty, empty.copy()
+
+            first = (self._head - self._count) % self.capacity
+            if first + self._count <= self.capacity:
+                times = self._times[first:first + self._count]
+                values = self._values[first:first + self._count]
+                lo = 0 if start is None else np.searchsorted(times, start, side="left")
+                hi = len(times) if end is None else np.searchsorted(times, end, side="right")
+                return times[lo:hi].copy(), values[lo:hi].copy()
+
+            # Wrapped: search both segments, then join only what is needed
+            older = slice(first, self.capacity)
+            newer = slice(0, self._head)
+            times = np.concatenate((self._times[older], self._times[newer]))
+            values = np.concatenate((self._values[older], self._values[newer]))
+
+        lo = 0 if start is None else np.searchsorted(times, start, side="left")
+        hi = len(times) if end is None else np.searchsorted(times, end, side="right")
+        return times[lo:hi], values[lo:hi]
+
+    def decimate_minmax(self, start, end, bins):
+        """Reduce the samples between start and end to per-bin min and max.
+
+        Returns (mins, maxs) arrays of length bins; bins without samples
+        hold NaN. The cost depends on the samples in the window and the
+        number of bins, not on how the result is drawn.
+        """
+        mins = np.full(bins, np.nan)
+        maxs = np.full(bins, np.nan)
+        if bins <= 0 or end <= start:
+            return mins, maxs
+
+        times, values = self.window(start, end)
+        if len(times) == 0:
+            return mins, maxs
+
+        edges = np.searchsorted(times, np.linspace(start, end, bins + 1), side="left")
+        edges[-1] = len(times)
+        starts = edges[:-1]
+        filled = edges[1:] > starts
+        if filled.any():
+            offsets = starts[filled]
+            mins[filled] = np.minimum.reduceat(values, offsets)
+            maxs[filled] = np.maximum.reduceat(values, offsets)
+        return mins, maxs
@@ -0,0 +1,81 @@
+"""
+Startup timing.
+Records when each startup phase was reached (window shown, controllers
+ready, first control frame) and how long the heavy imports took,
+including the ones deferred to background threads, measured from the
+moment this module was first imported.
+"""
+
+import json
+import sys
+import time
+from contextlib import contextmanager
+from threading import current_thread
+
+
+class StartupTimer:
+    """Phase marks and import times since the process started."""
+    
+    def __init__(self, started=None):
+        self.started = started or time.monotonic()
+        self.phases = {}  # Phase name -> seconds since start, first time only
+        self.imports = []  # (label, seconds, new modules, thread name)
+    
+    def elapsed(self):
+        """Seconds since start."""
+        return time.monotonic() - self.started
+    
+    def mark(self, phase):
+        """Record reaching a phase; later marks of the same phase are ignored."""
+        if phase not in self.phases:
+            self.phases[phase] = self.elapsed()
+    
+    @contextmanager
+    def importing(self, label):
+        """Time the imports in a with block.
+        
+        Nothing is recorded when they were all loaded already.
+        """
+        modules = len(sys.modules)
+        started = time.monotonic()
+        yield
+        added = len(sys.modules) - modules
+        if added:
+            self.imports.append((label, time.monotonic() - started, added, current_thread().name))
+    
+    def as_dict(self):
+        """Phases and imports in ms, for saving as JSON.
+        
+        started is the time.monotonic() of the start, which other processes
+        on the same machine can compare with their own clock.
+        """
+        return {
+            "started": self.started,
+            "phases": {phase: round(1000.0 * at, 2) for phase, at in self.phases.items()},
+            "imports": [{"label": label, "ms": round(1000.0 * seconds, 2), "modules": added,
+                         "thread": thread}
+                        for label, seconds, added, thread in self.imports],
+        }
+    
+    def report(self):
+        """Phases and imports as printable lines."""
+        lines = ["Startup timing (ms since start):"]
+        for phase, at in sorted(self.phases.items(), key=lambda item: item[1]):
+            lines.append(f"  {phase:<24} {1000.0 * at:>8.1f}")
+        lines.append("Imports:")
+        for label, seconds, added, thread in self.imports:
+            lines.append(f"  {label:<24} {1000.0 * seconds:>8.1f}  {added:>4} modules  ({thread})")
+        return "\n".join(lines)
+    
+    def write(self, path):
+        """Print the report, or save it as JSON when a path is given."""
+        if not path or path == "-":
+            print(self.report())
+            return
+        with open(path, "w") as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+
+# Shared by every module; main.py imports this first so the clock starts
+# with the process
+startup = StartupTimer()